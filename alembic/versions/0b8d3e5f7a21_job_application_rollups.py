@@ -0,0 +1,38 @@
+"""Daily rollups for /applications/timeseries
+
+Revision ID: 0b8d3e5f7a21
+Revises: f19a6c2d8b47
+Create Date: 2026-10-18 15:48:31.550274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.crud.stats_crud import backfill_rollups
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b8d3e5f7a21'
+down_revision: Union[str, None] = 'f19a6c2d8b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_application_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('metric', sa.String(length=12), nullable=False),
+    sa.Column('key', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'metric', 'key')
+    )
+    # Daily status counts of the applications that already exist (no transitions: there's no history of them)
+    backfill_rollups(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('job_application_rollups')
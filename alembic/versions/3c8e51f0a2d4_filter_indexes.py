@@ -0,0 +1,29 @@
+"""Composite index for filtering job applications by status, sorted by applied date
+
+Revision ID: 3c8e51f0a2d4
+Revises: 94f66eb0ae2b
+Create Date: 2026-10-18 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e51f0a2d4'
+down_revision: Union[str, None] = '94f66eb0ae2b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_job_applications_status_applied_date_id', 'job_applications',
+                    ['status', 'applied_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_applications_status_applied_date_id', table_name='job_applications')
@@ -0,0 +1,33 @@
+"""Full-text search index for job applications
+
+Revision ID: 7a1f4c9e2b60
+Revises: 3c8e51f0a2d4
+Create Date: 2026-10-18 10:41:07.118290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.search import get_search_backend
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1f4c9e2b60'
+down_revision: Union[str, None] = '3c8e51f0a2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Creates the dialect's index structures (FTS5 table + sync triggers on SQLite)
+    # and indexes the rows that already exist
+    connection = op.get_bind()
+    get_search_backend(connection.dialect.name).rebuild(connection)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    connection = op.get_bind()
+    get_search_backend(connection.dialect.name).uninstall(connection)
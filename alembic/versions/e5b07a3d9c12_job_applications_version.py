@@ -0,0 +1,29 @@
+"""Row version on job_applications (ETags, optimistic updates)
+
+Revision ID: e5b07a3d9c12
+Revises: c42d9e7b1f03
+Create Date: 2026-10-18 14:21:09.418302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b07a3d9c12'
+down_revision: Union[str, None] = 'c42d9e7b1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_applications', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('job_applications') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,37 @@
+"""Precomputed job application counters for /applications/stats
+
+Revision ID: f19a6c2d8b47
+Revises: e5b07a3d9c12
+Create Date: 2026-10-18 15:02:44.207931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.crud.stats_crud import rebuild_stats
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19a6c2d8b47'
+down_revision: Union[str, None] = 'e5b07a3d9c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_application_stats',
+    sa.Column('dimension', sa.String(length=20), nullable=False),
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'key')
+    )
+    # Count the applications that already exist
+    rebuild_stats(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('job_application_stats')
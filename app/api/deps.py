@@ -1,4 +1,12 @@
-from app.db.database import SessionLocal, AsyncSessionLocal
+import math
+
+from fastapi import Query
+
+from app.core.config import get_settings
+from app.core.metrics import current_request
+from app.crud.batch import IN_CHUNK_SIZE
+from app.db.database import async_session_factory, session_factory
+from app.exceptions import AppBaseException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -8,7 +16,7 @@ def get_db():
         Yields a normal Session, then closes it.
         Use in `def` endpoints.
     """
-    db = SessionLocal()
+    db = session_factory()()
     try:
         yield db
     finally:
@@ -21,9 +29,60 @@ async def get_async_db():
         Yields an AsyncSession, then closes it.
         Use in `async def` endpoints.
     """
-    async with AsyncSessionLocal() as session:
+    async with async_session_factory()() as session:
         try:
             yield session
         finally:
             # ensure all cleanup is done
             await session.close()
+
+
+def get_async_sessionmaker():
+    """
+        AsyncSession factory dependency.
+        For streaming responses: FastAPI closes `get_async_db` sessions before the response body is sent,
+        so a streaming endpoint opens (and closes) its own session from this factory instead.
+    """
+    return async_session_factory()
+
+
+def query_budget(max_statements: int):
+    """
+        Route dependency capping the SQL statements one request may run, e.g.
+        `dependencies=[Depends(query_budget(3))]`. Enforced by MetricsMiddleware (see QUERY_BUDGET_ACTION).
+    """
+    async def set_budget():
+        stats = current_request.get()
+        if stats is not None:
+            stats.budget = max_statements
+    return set_budget
+
+
+async def batch_query_budget():
+    """
+        query_budget() of the batch endpoints: one IN query per IN_CHUNK_SIZE ids, for up to BATCH_MAX_IDS of them.
+        Read when a request comes in, so importing the routes reads no settings.
+    """
+    await query_budget(math.ceil(get_settings().batch_max_ids / IN_CHUNK_SIZE))()
+
+
+def extend_query_budget(extra_statements: int) -> None:
+    """
+        Lets the current request run `extra_statements` more SQL statements than its route's query_budget(),
+        for work a route only does on some requests (e.g. an optional total).
+    """
+    stats = current_request.get()
+    if stats is not None and stats.budget is not None:
+        stats.budget += extra_statements
+
+
+def batch_ids(ids: list[str] = Query(..., description="Ids to fetch, comma-separated and/or repeated (ids=1,2&ids=3)")):
+    """
+        The `ids` of a batch endpoint as a flat list of strings, in the order given.
+        More than BATCH_MAX_IDS of them is a 413, like oversized bulk requests.
+    """
+    flat = [part.strip() for value in ids for part in value.split(",") if part.strip()]
+    max_ids = get_settings().batch_max_ids
+    if len(flat) > max_ids:
+        raise AppBaseException(status_code=413, detail=f"A batch request can ask for at most {max_ids} ids.")
+    return flat
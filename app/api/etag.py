@@ -0,0 +1,45 @@
+# ETags for conditional GETs (If-None-Match -> 304 Not Modified).
+#
+# Single applications are tagged with their row version. Lists are tagged with a hash of the
+# normalized query + the table generation counter (see job_crud.filter_cache_key), so checking
+# a list tag costs no query at all.
+# Generation counters live in each worker process, so list tags also carry a per-process nonce
+# (a tag from another worker or before a restart never matches) and the query-cache TTL window
+# (a write made on another worker is picked up within QUERY_CACHE_TTL_SECONDS, like cached results).
+# List tags follow QUERY_CACHE_ENABLED: without the query cache there are none.
+import hashlib
+import secrets
+import time
+
+from fastapi import Request, Response
+
+from app.core.config import get_settings
+
+_PROCESS_NONCE = secrets.token_hex(8)
+
+
+def job_etag(job_id: int, version: int) -> str:
+    return f'"job-{job_id}-v{version}"'
+
+
+def list_etag(key: tuple) -> str | None:
+    if not get_settings().query_cache_enabled:
+        return None
+    window = int(time.monotonic() // max(get_settings().query_cache_ttl_seconds, 1))
+    digest = hashlib.sha1(repr((_PROCESS_NONCE, window, key)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists `etag` (weak comparison, as RFC 9110 asks for GETs)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,49 @@
+# Row-by-row serializers for /applications/export.
+# Rows are serialized one at a time and flushed in chunks of `chunk_rows`,
+# so memory stays flat however many rows are exported.
+import csv
+import io
+from typing import AsyncIterator
+
+from app.schemas.job_schemas import JobAppOut
+
+EXPORT_COLUMNS = list(JobAppOut.model_fields)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def ndjson_chunks(jobs: AsyncIterator, chunk_rows: int) -> AsyncIterator[bytes]:
+    buffer = []
+    async for job in jobs:
+        buffer.append(JobAppOut.model_validate(job).model_dump_json())
+        if len(buffer) >= chunk_rows:
+            yield ("\n".join(buffer) + "\n").encode()
+            buffer.clear()
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode()
+
+
+async def csv_chunks(jobs: AsyncIterator, chunk_rows: int) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    rows = 0
+    async for job in jobs:
+        data = JobAppOut.model_validate(job).model_dump(mode="json")
+        writer.writerow(["" if data[column] is None else data[column] for column in EXPORT_COLUMNS])
+        rows += 1
+        if rows % chunk_rows == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+SERIALIZERS = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+}
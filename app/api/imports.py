@@ -0,0 +1,69 @@
+# Incremental parsers for /applications/import.
+# They pull the request body chunk by chunk and yield one record (dict) at a time,
+# so an upload is never held in memory as a whole.
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+
+from app.crud.import_crud import InvalidRecord
+
+MEDIA_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # utf-8-sig drops the BOM spreadsheet exports like to start with
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict | InvalidRecord]:
+    """The first row is the header. Empty cells become None so optional fields stay optional."""
+    header = None
+    record_lines, quotes = [], 0
+    async for line in iter_lines(chunks):
+        record_lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue  # inside a quoted field that spans lines
+        text = "\n".join(record_lines)
+        record_lines, quotes = [], 0
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield {name: value if value != "" else None for name, value in zip(header, values)}
+
+    if record_lines:
+        yield InvalidRecord("Unterminated quoted field at end of file")
+
+
+async def ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict | InvalidRecord]:
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield InvalidRecord(f"Invalid JSON: {e.msg}")
+
+
+PARSERS = {
+    "csv": csv_records,
+    "ndjson": ndjson_records,
+}
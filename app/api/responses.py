@@ -0,0 +1,40 @@
+# Fast JSON responses for the list endpoints.
+#
+# With a response_model, FastAPI validates whatever the endpoint returns against it, dumps the result
+# back to Python objects and then json.dumps() those: three passes in Python over every row. A route
+# returning RowsJSONResponse skips all of that: the rows (SQLAlchemy Rows or any objects with the
+# schema's attributes) are validated once and serialized straight to JSON bytes by pydantic-core.
+# Rows go in as dicts: validating a dict is about twice as fast as reading the same fields as attributes.
+# The routes keep their response_model for the OpenAPI schema.
+from functools import lru_cache
+from typing import Iterable
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+
+
+@lru_cache
+def list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter(list[schema]), built once per schema (building one compiles a validator)."""
+    return TypeAdapter(list[schema])
+
+
+class RowsJSONResponse(Response):
+    media_type = "application/json"
+
+    def __init__(self, rows: Iterable, schema: type[BaseModel], status_code: int = 200, headers=None):
+        adapter = list_adapter(schema)
+        items = [row._asdict() if isinstance(row, Row) else row for row in rows]
+        body = adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+        super().__init__(body, status_code=status_code, headers=headers)
+
+
+# The same for a single row (detail endpoints whose response model is picked per request)
+class RowJSONResponse(Response):
+    media_type = "application/json"
+
+    def __init__(self, row, schema: type[BaseModel], status_code: int = 200, headers=None):
+        item = row._asdict() if isinstance(row, Row) else row
+        body = schema.model_validate(item, from_attributes=True).model_dump_json().encode()
+        super().__init__(body, status_code=status_code, headers=headers)
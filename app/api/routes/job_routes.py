@@ -1,38 +1,193 @@
-from typing import Optional
+from datetime import date
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, Body, Response, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.crud import job_crud
-from app.api.deps import get_async_db
-from app.schemas import job_schemas
+from fastapi import APIRouter, Depends, Body, Response, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.crud import job_crud, import_crud, stats_crud
+from app.api.deps import batch_ids, batch_query_budget, extend_query_budget, get_async_db, get_async_sessionmaker, query_budget
+from app.api.etag import etag_matches, job_etag, list_etag, not_modified
+from app.api.export import MEDIA_TYPES, SERIALIZERS
+from app.api.imports import MEDIA_TYPE_FORMATS, PARSERS
+from app.api.responses import RowJSONResponse, RowsJSONResponse
+from app.core.config import get_settings
+from app.exceptions import AppBaseException
+from app.crud.pagination import next_cursor
+from app.schemas import job_schemas, import_schemas
 
 router = APIRouter(
     tags=["Applications"]
 )
 
+FIELDS_DESCRIPTION = (
+    "Comma-separated JobAppOut fields to return (e.g. id,company,status), only those columns are read. "
+    "Defaults to all fields."
+)
+
+
+# Response model of a request: JobAppOut, or the cut-down model of its sparse fieldset
+def response_schema(fields: Optional[tuple[str, ...]]):
+    return job_schemas.job_app_fields_model(fields) if fields else job_schemas.JobAppOut
 
-@router.post("/", response_model=job_schemas.JobAppOut, status_code=201)
+
+@router.post("/", response_model=job_schemas.JobAppOut, status_code=201, dependencies=[Depends(query_budget(3))])
 async def create_application(job: job_schemas.JobAppCreate, db: AsyncSession = Depends(get_async_db)):
     return await job_crud.create_job_app(db=db, job=job)
 
 
-@router.get("/", response_model=list[job_schemas.JobAppOut])
-async def read_applications(skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_async_db)):
-    return await job_crud.get_job_apps(db, skip=skip, limit=limit)
+# Bulk create: each item is validated on its own, so invalid or conflicting items are
+# reported in `errors` (by position) while the rest are still written.
+@router.post("/bulk", response_model=job_schemas.BulkCreateResult, status_code=201)
+async def bulk_create_applications(
+        items: list[dict[str, Any]] = Body(...),
+        db: AsyncSession = Depends(get_async_db)
+):
+    max_items = get_settings().bulk_max_items
+    if len(items) > max_items:
+        raise AppBaseException(status_code=413, detail=f"A bulk request can hold at most {max_items} items.")
+    return await job_crud.bulk_create_job_apps(db, items)
+
+
+# Bulk update / delete: one set-based statement for every row matching `ids` and/or `filter`.
+# Returns how many rows were affected, plus their ids when `returning` is true.
+@router.patch("/bulk", response_model=job_schemas.BulkWriteResult)
+async def bulk_update_applications(
+        request: job_schemas.BulkUpdateRequest,
+        db: AsyncSession = Depends(get_async_db)
+):
+    return await job_crud.bulk_update_jobs(db, request)
+
+
+@router.delete("/bulk", response_model=job_schemas.BulkWriteResult)
+async def bulk_delete_applications(
+        selector: job_schemas.BulkSelector,
+        db: AsyncSession = Depends(get_async_db)
+):
+    return await job_crud.bulk_delete_jobs(db, selector)
+
+
+# Counts per status, company and applied month, from counters kept up to date on every write
+@router.get("/stats", response_model=job_schemas.JobAppStats, dependencies=[Depends(query_budget(1))])
+async def read_stats(db: AsyncSession = Depends(get_async_db)):
+    return await stats_crud.get_stats(db)
+
+
+# Applications sent per day/week/month in a date range, with their current statuses and the
+# status changes they went through - summed from daily rollups, never a scan of the applications
+@router.get("/timeseries", response_model=job_schemas.JobAppTimeseries, dependencies=[Depends(query_budget(1))])
+async def read_timeseries(
+        bucket: str = Query("day", pattern="^(day|week|month)$"),
+        applied_from: Optional[date] = Query(None),
+        applied_to: Optional[date] = Query(None),
+        db: AsyncSession = Depends(get_async_db)
+):
+    return await stats_crud.get_timeseries(db, bucket, applied_from, applied_to)
+
+
+# Streams every application matching the /applications/filter filters as NDJSON or CSV.
+# Rows are read through a server-side cursor and written out as they arrive, so memory stays flat.
+@router.get("/export")
+async def export_applications(
+        export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+        company: Optional[str] = Query(None),
+        status: Optional[str] = Query(None),
+        search_query: Optional[str] = Query(None, alias="q"),
+        applied_from: Optional[date] = Query(None),
+        applied_to: Optional[date] = Query(None),
+        session_factory: async_sessionmaker = Depends(get_async_sessionmaker)
+):
+    batch_size = get_settings().export_batch_size
+    jobs = job_crud.stream_job_apps(
+        session_factory,
+        company=company,
+        status=status,
+        search_query=search_query,
+        applied_from=applied_from,
+        applied_to=applied_to,
+        batch_size=batch_size
+    )
+    return StreamingResponse(
+        SERIALIZERS[export_format](jobs, batch_size),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="applications.{export_format}"'}
+    )
+
+
+# Streamed import: send the CSV (header row first) or NDJSON file as the raw request body.
+# It's parsed as it arrives and committed in chunks, bad rows are reported without stopping the import.
+# Pass your own `import_id` to follow progress on GET /applications/import/{import_id} while it runs,
+# and re-upload the same file with the same id to resume after a failure.
+@router.post("/import", response_model=import_schemas.ImportJobOut)
+async def import_applications(
+        request: Request,
+        import_format: Optional[import_schemas.ImportFormat] = Query(
+            None, alias="format", description="csv or ndjson, defaults to the Content-Type"
+        ),
+        import_id: Optional[str] = Query(None, max_length=36, description="Id to track / resume this import"),
+        db: AsyncSession = Depends(get_async_db)
+):
+    if import_format is None:
+        media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        if media_type not in MEDIA_TYPE_FORMATS:
+            raise AppBaseException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass ?format=.")
+        import_format = import_schemas.ImportFormat(MEDIA_TYPE_FORMATS[media_type])
+
+    records = PARSERS[import_format.value](request.stream())
+    return await import_crud.run_import(db, records, import_format.value, import_id)
+
 
+@router.get("/import/{import_id}", response_model=import_schemas.ImportJobOut)
+async def read_import(import_id: str, db: AsyncSession = Depends(get_async_db)):
+    return await import_crud.get_import_job(db, import_id)
 
-@router.get("/filter", response_model=list[job_schemas.JobAppOut])
+
+# List endpoints page by cursor: the next page's cursor comes back in the
+# X-Next-Cursor header (absent on the last page). `skip` only remains for old clients.
+@router.get("/", response_model=list[job_schemas.JobAppOut], dependencies=[Depends(query_budget(1))])
+async def read_applications(
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+        db: AsyncSession = Depends(get_async_db)
+):
+    selected = job_schemas.parse_fields(fields)
+    jobs = await job_crud.get_job_apps(db, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    next_page = next_cursor(jobs, limit, "id", "id")
+    headers = {"X-Next-Cursor": next_page} if next_page else None
+    return RowsJSONResponse(jobs, response_schema(selected), headers=headers)
+
+
+# Send the ETag of the previous response in If-None-Match to get a 304 (no body) while nothing changed.
+# include_total=true adds X-Total-Count (matches over all pages) and X-Total-Count-Exact: "false" when
+# an exact count would have taken longer than COUNT_TIME_BUDGET_MS and the total is an estimate.
+# Budget: the page; requests asking for the total get the statements counting it can take on top.
+@router.get("/filter", response_model=list[job_schemas.JobAppOut], dependencies=[Depends(query_budget(1))])
 async def filter_job_apps(
+        request: Request,
         company: Optional[str] = Query(None),
         status: Optional[str] = Query(None),
-        sort_by: str = Query("applied_date", regex="^(applied_date|updated_at|status)$"),
+        # "relevance" ranks full-text matches for `q` (best first) and pages with skip only
+        sort_by: str = Query("applied_date", regex="^(applied_date|updated_at|status|relevance)$"),
         order: str = Query("desc", regex="^(asc|desc)$"),
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
         db: AsyncSession = Depends(get_async_db),
-        search_query: Optional[str] = Query(None, alias="q")
+        search_query: Optional[str] = Query(None, alias="q"),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+        applied_from: Optional[date] = Query(None, description="Only applications applied on or after this date"),
+        applied_to: Optional[date] = Query(None, description="Only applications applied on or before this date"),
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+        include_total: bool = Query(False, description="Send the number of matches in X-Total-Count")
 ):
-    return await job_crud.filter_job_apps(
+    selected = job_schemas.parse_fields(fields)
+    etag = list_etag((*job_crud.filter_cache_key(
+        company, status, sort_by, order, skip, limit, search_query, cursor, applied_from, applied_to, selected
+    ), include_total))
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+
+    jobs = await job_crud.filter_job_apps(
         db=db,
         company=company,
         status=status,
@@ -40,17 +195,63 @@ async def filter_job_apps(
         order=order,
         skip=skip,
         limit=limit,
-        search_query=search_query
+        search_query=search_query,
+        cursor=cursor,
+        applied_from=applied_from,
+        applied_to=applied_to,
+        fields=selected
     )
+    headers = {"ETag": etag} if etag else {}
+    if sort_by != "relevance":
+        next_page = next_cursor(jobs, limit, job_crud.sort_attribute(sort_by), sort_by, order)
+        if next_page:
+            headers["X-Next-Cursor"] = next_page
+    if include_total:
+        extend_query_budget(job_crud.COUNT_MAX_STATEMENTS)
+        total, exact = await job_crud.count_job_apps(db, company, status, search_query, applied_from, applied_to)
+        headers["X-Total-Count"] = str(total)
+        headers["X-Total-Count-Exact"] = "true" if exact else "false"
+    return RowsJSONResponse(jobs, response_schema(selected), headers=headers)
 
 
-@router.get("/{id}", response_model=job_schemas.JobAppOut)
-async def read_jobs_by_id(id: int, db: AsyncSession = Depends(get_async_db)):
-    job_app = await job_crud.get_job_app_by_id(db, id)
+# Many applications in one call: GET /applications/batch?ids=3,1,2. Items keep the order of `ids`,
+# ids that don't exist are listed in `missing` instead of failing the request.
+# Budget: one IN query per IN_CHUNK_SIZE ids, for up to BATCH_MAX_IDS of them.
+@router.get("/batch", response_model=job_schemas.JobAppBatch, dependencies=[Depends(batch_query_budget)])
+async def read_applications_batch(ids: list[str] = Depends(batch_ids), db: AsyncSession = Depends(get_async_db)):
+    try:
+        job_ids = [int(job_id) for job_id in ids]
+    except ValueError:
+        raise AppBaseException(status_code=400, detail="Application ids must be integers.")
+    items, missing = await job_crud.get_job_apps_by_ids(db, job_ids)
+    return {"items": items, "missing": missing}
+
+
+# Conditional GET: with a matching If-None-Match only the row version is read, and a 304 is returned.
+# The ETag follows the row version, whatever `fields` asks for.
+@router.get("/{id}", response_model=job_schemas.JobAppOut, dependencies=[Depends(query_budget(2))])
+async def read_jobs_by_id(
+        id: int,
+        request: Request,
+        response: Response,
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+        db: AsyncSession = Depends(get_async_db)
+):
+    selected = job_schemas.parse_fields(fields)
+    if request.headers.get("if-none-match"):
+        version = await job_crud.get_job_version(db, id)
+        if version is not None and etag_matches(request, job_etag(id, version)):
+            return not_modified(job_etag(id, version))
+
+    job_app = await job_crud.get_job_app_by_id(db, id, fields=selected)
+    etag = job_etag(job_app.id, job_app.version)
+    if selected:
+        return RowJSONResponse(job_app, response_schema(selected), headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return job_app
 
 
-@router.put("/{id}", response_model=job_schemas.JobAppOut, status_code=200)
+@router.put("/{id}", response_model=job_schemas.JobAppOut, status_code=200, dependencies=[Depends(query_budget(4))])
 async def update_jobs_by_id(
         id: int,
         # This injects a SQLAlchemy database session using FastAPIs dependency injection system.
@@ -63,7 +264,7 @@ async def update_jobs_by_id(
     return await job_crud.update_job(db, id, updated_data)
 
 
-@router.delete("/{id}", response_model=None, status_code=204)
+@router.delete("/{id}", response_model=None, status_code=204, dependencies=[Depends(query_budget(3))])
 async def delete_jobs_by_id(id: int, db: AsyncSession = Depends(get_async_db)):
     await job_crud.delete_job(db, id)
     return
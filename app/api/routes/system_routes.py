@@ -0,0 +1,39 @@
+# Operational endpoints (not part of the public API)
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.cache import cache_stats, generation_stats
+from app.core.metrics import render_prometheus
+from app.db.database import created_engines
+from app.db.pool import pool_stats
+
+router = APIRouter(
+    tags=["System"]
+)
+
+
+# Hit/miss counters and sizes of this worker's in-process caches
+@router.get("/cache/stats")
+async def get_cache_stats():
+    return {"caches": cache_stats(), "generations": generation_stats()}
+
+
+# Occupancy and checkout wait times of this worker's connection pools, for tuning DB_POOL_SIZE / DB_MAX_OVERFLOW
+@router.get("/db/pool/stats")
+async def get_pool_stats():
+    return _all_pool_stats()
+
+
+# Request counts, latency histograms and DB timings per route, in Prometheus text format
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(render_prometheus(_all_pool_stats()), media_type="text/plain; version=0.0.4")
+
+
+def _all_pool_stats() -> dict[str, dict]:
+    # only engines that exist: asking for stats shouldn't create a pool
+    return {
+        "async" if isinstance(engine, AsyncEngine) else "sync": pool_stats(engine.pool)
+        for engine in created_engines()
+    }
@@ -1,11 +1,12 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Response, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_async_db
+from app.api.deps import batch_ids, batch_query_budget, get_async_db, query_budget
 
 from app.schemas import user_schemas
 from app.crud import user_crud
+from app.crud.pagination import next_cursor
 
 router = APIRouter(
     tags=["Users"]
@@ -13,25 +14,49 @@ router = APIRouter(
 
 
 # Register a user
-@router.post("/register", response_model=user_schemas.User, status_code=201)
+@router.post("/register", response_model=user_schemas.User, status_code=201, dependencies=[Depends(query_budget(1))])
 async def create_user(user: user_schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     return await user_crud.create_user(db, user)
 
 
-@router.get("/", response_model=list[user_schemas.User])
-async def read_users(skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_async_db)):
-    return await user_crud.get_users(db, skip=skip, limit=limit)
+# The cursor for the next page comes back in the X-Next-Cursor header (absent on the last page)
+@router.get("/", response_model=list[user_schemas.User], dependencies=[Depends(query_budget(1))])
+async def read_users(
+        response: Response,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: str | None = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+        db: AsyncSession = Depends(get_async_db)
+):
+    users = await user_crud.get_users(db, skip=skip, limit=limit, cursor=cursor)
+    next_page = next_cursor(users, limit, "id", "id")
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
+    return users
+
+
+# Many users in one call: GET /users/batch?ids=<uuid>,<uuid>. Items keep the order of `ids`,
+# ids that don't exist are listed in `missing` instead of failing the request.
+# Budget: one IN query per IN_CHUNK_SIZE ids, for up to BATCH_MAX_IDS of them.
+@router.get("/batch", response_model=user_schemas.UserBatch, dependencies=[Depends(batch_query_budget)])
+async def get_users_batch(ids: list[str] = Depends(batch_ids), db: AsyncSession = Depends(get_async_db)):
+    try:
+        user_ids = [str(UUID(user_id)) for user_id in ids]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid UUID format.")
+    items, missing = await user_crud.get_users_by_ids(db, user_ids)
+    return {"items": items, "missing": missing}
 
 
 # GET /users/username/{username} for user-friendly URLs
-@router.get("/username/{username}", response_model=user_schemas.UserBase)
+@router.get("/username/{username}", response_model=user_schemas.UserBase, dependencies=[Depends(query_budget(1))])
 async def get_user_by_username(username: str, db: AsyncSession = Depends(get_async_db)):
     user = await user_crud.get_user_by_username(db, username)
     return user
 
 
 # GET /users/{user_id} for internal logic (auth, DB operations)
-@router.get("/{user_id}", response_model=user_schemas.User)
+@router.get("/{user_id}", response_model=user_schemas.User, dependencies=[Depends(query_budget(1))])
 async def get_user_by_id(user_id: str, db: AsyncSession = Depends(get_async_db)):
     try:
         _ = UUID(user_id)  # Just to validate the UUID format because SQLite stores uuid as text
@@ -42,13 +67,13 @@ async def get_user_by_id(user_id: str, db: AsyncSession = Depends(get_async_db))
 
 
 # Update user
-@router.put("/{user_id}", response_model=user_schemas.User, status_code=200)
+@router.put("/{user_id}", response_model=user_schemas.User, status_code=200, dependencies=[Depends(query_budget(2))])
 async def update_user(user_id: str, user_update: user_schemas.UserUpdate, db: AsyncSession = Depends(get_async_db)):
     return await user_crud.update_user(db, user_id, user_update)
 
 
 # Delete user
-@router.delete("/{user_id}", status_code=204)
+@router.delete("/{user_id}", status_code=204, dependencies=[Depends(query_budget(1))])
 async def delete_user(user_id: str, db: AsyncSession = Depends(get_async_db)):
     await user_crud.delete_user(db, user_id)
     return
@@ -0,0 +1,69 @@
+# Maintenance commands, run from the project root:
+#     python -m app.cli <command>
+import argparse
+from datetime import date
+
+from sqlalchemy import func, select
+
+from app.crud import stats_crud
+from app.db import Base
+from app.db.database import get_engine
+from app.models import JobApplication
+from app.search import get_search_backend
+
+
+def create_schema() -> None:
+    """Create every table (and the search index) that doesn't exist yet. Alembic migrations are the alternative."""
+    engine = get_engine()
+    Base.metadata.create_all(bind=engine)
+    print(f"🏗️ Created missing tables in {engine.url.render_as_string(hide_password=True)}")
+
+
+def rebuild_search() -> None:
+    """Re-index every job application in the full-text search index."""
+    engine = get_engine()
+    backend = get_search_backend(engine.dialect.name)
+    with engine.begin() as connection:
+        backend.rebuild(connection)
+    print(f"🔎 Rebuilt search index ({backend.name})")
+
+
+def rebuild_stats() -> None:
+    """Recompute the /applications/stats counters from job_applications."""
+    engine = get_engine()
+    with engine.begin() as connection:
+        total = stats_crud.rebuild_stats(connection)
+    print(f"📊 Rebuilt application stats ({total} applications)")
+
+
+def backfill_rollups() -> None:
+    """Recompute the daily /applications/timeseries rollups from job_applications, one year per transaction."""
+    engine = get_engine()
+    with engine.connect() as connection:
+        first, last = connection.execute(
+            select(func.min(JobApplication.applied_date), func.max(JobApplication.applied_date))
+        ).one()
+    total = 0
+    for year in range(first.year, last.year + 1) if first is not None else []:
+        with engine.begin() as connection:
+            total += stats_crud.backfill_rollups(connection, date(year, 1, 1), date(year, 12, 31))
+    print(f"📈 Backfilled timeseries rollups ({total} applications)")
+
+
+COMMANDS = {
+    "create-schema": create_schema,
+    "rebuild-search": rebuild_search,
+    "rebuild-stats": rebuild_stats,
+    "backfill-rollups": backfill_rollups,
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Job Application Tracker maintenance")
+    parser.add_argument("command", choices=sorted(COMMANDS), help="what to run")
+    args = parser.parse_args(argv)
+    COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# In-process caches.
+#
+# LRUCache is a bounded LRU with a per-entry TTL, size accounting and hit/miss counters.
+# It's per process (every worker has its own) and not thread-safe: it's only touched from the
+# event loop, and never across an `await`.
+# A read that fills the cache does span an await (the SELECT), during which a write in this process may
+# store a newer value or drop the key: take write_token() before the SELECT and store the row with
+# fill(), which leaves the cache alone if the key was written or dropped since.
+# Caches are created on first use from the settings and looked up by name with get_cache().
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from sqlalchemy import Row, inspect
+
+from app.core.config import get_settings
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Rough deep size in bytes of plain data (dicts, lists, tuples, SQLAlchemy Rows, scalars)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, Row):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+def snapshot(obj) -> dict:
+    """Column values of an ORM object, safe to keep after its session is gone."""
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+class LRUCache:
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float, max_bytes: int | None = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+        # write counter, the last write of recently written keys, and the last write older ones are forgotten at
+        self._writes = 0
+        self._written: OrderedDict[Hashable, int] = OrderedDict()
+        self._written_floor = 0
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default=None):
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, size: int | None = None) -> None:
+        """Stores a value fresh from a write (write-through). Reads store theirs with fill()."""
+        if self.max_entries <= 0:
+            return
+        self._mark_written(key)
+        self._store(key, value, size)
+
+    def write_token(self) -> int:
+        """Take before reading a value from the database, and hand it to fill() with that value."""
+        return self._writes
+
+    def changed_since(self, key: Hashable, token: int) -> bool:
+        return max(self._written.get(key, 0), self._written_floor) > token
+
+    def fill(self, key: Hashable, value: Any, token: int, version_field: str | None = None) -> bool:
+        """
+            Stores a value read from the database, unless it may be stale: `key` was set or deleted since
+            `token` was taken, or (with `version_field`) the cached value has a newer version.
+        """
+        if self.max_entries <= 0 or self.changed_since(key, token):
+            return False
+        if version_field is not None:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2][version_field] > value[version_field]:
+                return False
+        self._store(key, value)
+        return True
+
+    def _mark_written(self, key: Hashable) -> None:
+        self._writes += 1
+        self._written[key] = self._writes
+        self._written.move_to_end(key)
+        while len(self._written) > max(self.max_entries, 1):
+            _, forgotten = self._written.popitem(last=False)
+            self._written_floor = max(self._written_floor, forgotten)
+
+    def _store(self, key: Hashable, value: Any, size: int | None = None) -> None:
+        size = estimate_size(value) if size is None else size
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self.current_bytes += size
+        while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.current_bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._mark_written(key)
+        self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+        self._writes += 1
+        self._written.clear()
+        self._written_floor = self._writes
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+_caches: dict[str, LRUCache] = {}
+
+# Caches holding query results (rather than single rows) and their byte budget
+QUERY_CACHES = ("filter_results",)
+
+
+def _build(name: str) -> LRUCache:
+    settings = get_settings()
+    if name in QUERY_CACHES:
+        max_entries = settings.query_cache_max_entries if settings.query_cache_enabled else 0
+        return LRUCache(name, max_entries, settings.query_cache_ttl_seconds, settings.query_cache_max_bytes)
+    max_entries = settings.entity_cache_max_entries if settings.entity_cache_enabled else 0
+    return LRUCache(name, max_entries, settings.entity_cache_ttl_seconds)
+
+
+def get_cache(name: str) -> LRUCache:
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches[name] = _build(name)
+    return cache
+
+
+def cache_stats() -> dict[str, dict]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+# Per-table generation counters. Every write to a table bumps its counter, and query-result cache keys
+# include the counter, so one increment invalidates every cached result for that table at once
+# (the old entries are simply never looked up again and age out of the LRU).
+_generations: dict[str, int] = {}
+
+
+def get_generation(table: str) -> int:
+    return _generations.get(table, 0)
+
+
+def bump_generation(table: str) -> int:
+    _generations[table] = _generations.get(table, 0) + 1
+    return _generations[table]
+
+
+def generation_stats() -> dict[str, int]:
+    return dict(_generations)
+
+
+def clear_caches() -> None:
+    """Empties every cache - for writes that bypass the CRUD layer (tests, maintenance scripts)."""
+    for cache in _caches.values():
+        cache.clear()
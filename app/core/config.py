@@ -1 +1,134 @@
 # load env vars
+#
+# Typed application settings. Every field can be overridden with an environment variable
+# of the same name in upper case (e.g. BULK_INSERT_CHUNK_SIZE=1000), or in the .env file.
+# Set APP_ENV (e.g. APP_ENV=production) to also read .env.production, which wins over .env;
+# real environment variables win over both.
+import json
+import os
+import types
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+
+from dotenv import find_dotenv, load_dotenv
+
+
+def _parse(raw: str, kind):
+    # `int | None` style fields: an empty value means None, anything else is parsed as the real type
+    if isinstance(kind, types.UnionType):
+        if raw.strip() == "":
+            return None
+        kind = next(arg for arg in kind.__args__ if arg is not type(None))
+    if kind is bool:
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    if kind is dict:
+        return json.loads(raw) if raw.strip() else {}
+    return kind(raw)
+
+
+# WEB_CONCURRENCY is the worker process count uvicorn and gunicorn take their default --workers from
+def _single_worker() -> bool:
+    return int(os.getenv("WEB_CONCURRENCY") or 1) <= 1
+
+
+@dataclass(frozen=True)
+class Settings:
+    # SQLAlchemy URL of the database (sync driver, the async engine swaps in the async one)
+    db_url: str | None = None
+    # Connection pool of each engine (ignored for in-memory SQLite, which lives in a single connection)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Seconds to wait for a free connection before giving up with a TimeoutError
+    db_pool_timeout: float = 30.0
+    # Replace connections older than this many seconds (-1: never), so servers don't drop idle ones under us
+    db_pool_recycle: int = 1800
+    # Ping every connection on checkout and transparently replace dead ones
+    db_pool_pre_ping: bool = True
+    # Log every SQL statement
+    db_echo: bool = False
+    # Server-side statement timeout in milliseconds (PostgreSQL, MySQL); empty means no limit
+    db_statement_timeout_ms: int | None = None
+    # Log statements slower than this many milliseconds (SQL, parameters, time, route); empty disables the log
+    db_slow_query_ms: float | None = 200.0
+    # Longest repr of the parameters a slow query log line keeps
+    db_slow_query_max_param_chars: int = 500
+    # SQL statements a request may run (routes can set their own with query_budget(n)); empty means no limit
+    query_budget: int | None = None
+    # What going over the budget does: "warn" logs a warning, "raise" raises QueryBudgetExceeded once the
+    # response is sent (for tests and CI, where it fails the test that made the request)
+    query_budget_action: str = "warn"
+    # Connections the app opens at startup, so the first requests don't wait for them
+    db_pool_warmup: int = 1
+    # Extra DBAPI connect() arguments as a JSON object, e.g. DB_CONNECT_ARGS='{"timeout": 10}'
+    db_connect_args: dict = field(default_factory=dict)
+    # SQLite PRAGMA profile for every connection: "wal" (default), "wal-fast" or "none" (see app/db/sqlite.py).
+    # The SQLITE_* settings below override single pragmas of the profile.
+    sqlite_profile: str = "wal"
+    sqlite_journal_mode: str | None = None
+    sqlite_synchronous: str | None = None
+    sqlite_busy_timeout_ms: int | None = None
+    sqlite_cache_size_kib: int | None = None
+    sqlite_mmap_size: int | None = None
+    sqlite_temp_store: str | None = None
+    # Rows written per multi-row INSERT (and per transaction) by bulk creates
+    bulk_insert_chunk_size: int = 500
+    # Max number of items accepted by a single bulk request
+    bulk_max_items: int = 50_000
+    # Max number of ids accepted by /applications/batch and /users/batch
+    batch_max_ids: int = 1000
+    # Rows validated and committed per transaction by /applications/import
+    import_chunk_size: int = 1000
+    # How many row errors an import keeps (the rest are only counted)
+    import_max_errors: int = 100
+    # Worker pool that runs bcrypt off the event loop: "thread" or "process".
+    # Threads only run in parallel with the loop when the hash releases the GIL, which the `bcrypt`
+    # package does; use "process" if passlib falls back to another backend.
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 4
+    # Calls allowed to wait for a free worker before new ones are rejected with 503
+    password_hash_queue_depth: int = 64
+    # In-process LRU cache in front of job/user lookups by id/username (per worker process)
+    entity_cache_enabled: bool = True
+    entity_cache_max_entries: int = 10_000
+    entity_cache_ttl_seconds: float = 30.0
+    # Cache of /applications/filter results (and its list ETags), invalidated by a generation bump on every
+    # job write. Generations are counted per worker process: a write only invalidates the worker that made it,
+    # the others keep serving their old results for up to QUERY_CACHE_TTL_SECONDS. That's why it defaults to
+    # off when WEB_CONCURRENCY says there's more than one worker; turn it on there only if that lag is fine.
+    query_cache_enabled: bool = field(default_factory=_single_worker)
+    query_cache_max_entries: int = 1_000
+    query_cache_max_bytes: int = 16 * 1024 * 1024
+    query_cache_ttl_seconds: float = 60.0
+    # Time /applications/filter?include_total=true may spend on an exact COUNT(*) before settling for an estimate
+    count_time_budget_ms: float = 200.0
+    # Rows sampled (in id ranges spread over the table) for that estimate
+    count_estimate_sample_rows: int = 20_000
+    # Rows fetched per round trip (yield_per) and serialized per chunk by /applications/export
+    export_batch_size: int = 1000
+    # Level of the app's logger
+    log_level: str = "INFO"
+    # Keep 1 in N of the high-volume read log lines ("Fetched jobs", ...); 1 keeps all, 0 drops them
+    log_read_sample_every: int = 1
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        overrides = {}
+        for setting in fields(cls):
+            raw = os.getenv(setting.name.upper())
+            if raw is not None:
+                overrides[setting.name] = _parse(raw, setting.type)
+        return cls(**overrides)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """
+        Settings are read once per process and cached; call get_settings.cache_clear() to re-read them.
+    """
+    # Neither file overrides variables that are already set, so the first one loaded wins
+    app_env = os.getenv("APP_ENV")
+    for filename in ([f".env.{app_env}"] if app_env else []) + [".env"]:
+        path = find_dotenv(filename)
+        if path:
+            load_dotenv(path)
+    return Settings.from_env()
@@ -1,9 +1,49 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Logging never touches the disk (or the console) on the calling thread: the app's logger only puts
+# records on a queue, and a QueueListener thread hands them to the real handlers. The listener starts
+# with the first record (or configure_logging(), called by the app's lifespan), so importing this
+# module starts no thread and creates no file.
+# Log with %-style arguments - logger.info("Fetched %s", job_id) - so disabled levels cost no formatting.
+
+
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """Opens the log file (creating its directory) on the first record, not when the module is imported."""
+
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, delay=True, **kwargs)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class SamplingFilter(logging.Filter):
+    """Lets one record in every `every` through (1: all of them, 0: none)."""
+
+    def __init__(self, every: int = 1):
+        super().__init__()
+        self.every = every
+        self._seen = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every <= 0:
+            return False
+        self._seen += 1
+        return (self._seen - 1) % self.every == 0
+
+
+class _StartingQueueHandler(QueueHandler):
+    def emit(self, record: logging.LogRecord) -> None:
+        if not _listener_running:
+            start_logging()
+        super().emit(record)
 
-# Create logs directory if it doesn't exist
-os.makedirs("logs", exist_ok=True)
 
 # Define log format
 log_format = logging.Formatter(
@@ -17,13 +57,53 @@ console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(log_format)
 
 # File handler — rotates at 5MB, keeps 3 backups
-file_handler = RotatingFileHandler("logs/app.log", maxBytes=5_000_000, backupCount=3)
+file_handler = LazyRotatingFileHandler("logs/app.log", maxBytes=5_000_000, backupCount=3)
 file_handler.setLevel(logging.INFO)
 file_handler.setFormatter(log_format)
 
+# Records go through this queue to the listener thread, which owns the real handlers
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = _StartingQueueHandler(log_queue)
+_listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+_listener_running = False
+_listener_lock = threading.Lock()
+
 # Create the logger
 logger = logging.getLogger("JobApplicationTracker")
 logger.setLevel(logging.INFO)
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+logger.addHandler(queue_handler)
 logger.propagate = False  # prevent double logging
+
+# High-volume read lines ("Fetched jobs", ...) go through this child logger so they can be sampled
+# (LOG_READ_SAMPLE_EVERY); its records still end up in the handlers above.
+read_logger = logger.getChild("reads")
+read_sampler = SamplingFilter()
+read_logger.addFilter(read_sampler)
+
+
+def start_logging() -> None:
+    """Starts the listener thread (no-op if it's running)."""
+    global _listener_running
+    with _listener_lock:
+        if _listener_running:
+            return
+        _listener.start()
+        _listener_running = True
+    atexit.register(stop_logging)
+
+
+def configure_logging(settings) -> None:
+    """Applies the LOG_* settings and starts the listener - called by the app's lifespan."""
+    logger.setLevel(settings.log_level.upper())
+    read_sampler.every = settings.log_read_sample_every
+    start_logging()
+
+
+def stop_logging() -> None:
+    """Writes out everything still queued and stops the listener thread (the next record restarts it)."""
+    global _listener_running
+    with _listener_lock:
+        if not _listener_running:
+            return
+        _listener.stop()
+        _listener_running = False
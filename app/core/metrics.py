@@ -0,0 +1,296 @@
+# In-process request and DB metrics, exposed in Prometheus text format at GET /metrics.
+#
+# MetricsMiddleware (a plain ASGI middleware, no per-request objects beyond a contextvar token) counts
+# requests per route template and status and keeps a latency histogram per route. SQLAlchemy cursor
+# hooks time every statement and charge it to the request being served. Everything is plain ints and
+# floats bumped from the event loop thread, no locks: one worker process = one set of numbers.
+#
+# The same hooks write statements slower than DB_SLOW_QUERY_MS to the slow query log, and the middleware
+# holds every request to a statement budget (QUERY_BUDGET, or query_budget(n) on a route): over budget
+# is a warning, or a QueryBudgetExceeded error with QUERY_BUDGET_ACTION=raise (what the tests run with).
+# Values bound to credential columns (passwords, hashes, tokens) are masked in that log.
+import re
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import Settings, get_settings
+from app.core.logger import logger
+from app.exceptions import QueryBudgetExceeded
+
+# Upper bounds (seconds) of the latency histogram buckets, +Inf is implied
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the statements-per-request histogram
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot: above every bound
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(le, cumulative count) pairs as Prometheus expects them, ending with +Inf."""
+        running, pairs = 0, []
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            pairs.append((repr(float(bound)), running))
+        pairs.append(("+Inf", running + self.counts[-1]))
+        return pairs
+
+
+class RequestStats:
+    """What the DB hooks charge to the request currently being served."""
+    __slots__ = ("scope", "queries", "query_seconds", "budget")
+
+    def __init__(self, scope: dict | None = None, budget: int | None = None):
+        self.scope = scope
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.budget = budget
+
+
+class RouteSeries:
+    """Everything recorded for one (method, route template)."""
+    __slots__ = ("latency", "queries", "db_seconds", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = 0.0
+        self.statuses: dict[int, int] = {}
+
+
+_routes: dict[tuple[str, str], RouteSeries] = {}
+# every statement, in or out of a request
+_query_latency = Histogram(LATENCY_BUCKETS)
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+slow_query_logger = logger.getChild("slow_sql")
+
+
+class _Limits:
+    """The slow query / budget settings, read once (configure_metrics() re-reads them)."""
+    __slots__ = ("slow_query_seconds", "max_param_chars", "budget", "action")
+
+    def __init__(self, settings: Settings):
+        slow_ms = settings.db_slow_query_ms
+        self.slow_query_seconds = slow_ms / 1000 if slow_ms is not None else None
+        self.max_param_chars = settings.db_slow_query_max_param_chars
+        self.budget = settings.query_budget
+        self.action = settings.query_budget_action
+
+
+_limits: _Limits | None = None
+
+
+def configure_metrics(settings: Settings | None = None) -> _Limits:
+    global _limits
+    _limits = _Limits(settings or get_settings())
+    return _limits
+
+
+def route_label(scope: dict) -> str:
+    # The route template ("/applications/{id}"), never the raw path: that would be one series per id
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def record_request(method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+    series = _routes.get((method, route))
+    if series is None:
+        series = _routes[(method, route)] = RouteSeries()
+    series.latency.observe(elapsed)
+    series.queries.observe(stats.queries)
+    series.db_seconds += stats.query_seconds
+    series.statuses[status] = series.statuses.get(status, 0) + 1
+
+
+def check_budget(method: str, route: str, stats: RequestStats, action: str) -> None:
+    if stats.budget is None or stats.queries <= stats.budget:
+        return
+    if action == "raise":
+        raise QueryBudgetExceeded(f"{method} {route}", stats.queries, stats.budget)
+    logger.warning("🧮 %s %s ran %s SQL statements, over its budget of %s", method, route, stats.queries, stats.budget)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limits = _limits or configure_metrics()
+        status = 500  # if the app raises before sending a response
+        stats = RequestStats(scope, limits.budget)
+        token = current_request.set(stats)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_label(scope)
+            record_request(scope["method"], route, status, time.perf_counter() - start, stats)
+            current_request.reset(token)
+        # only once the response is out: in raise mode the error fails the caller (a test), not the response
+        check_budget(scope["method"], route, stats, limits.action)
+
+
+# DB hooks, on every Engine (the async engines run them on their sync engine).
+# The start time rides on the statement's execution context, so nothing is left behind when it fails.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    _query_latency.observe(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+    if _limits is not None and _limits.slow_query_seconds is not None and elapsed >= _limits.slow_query_seconds:
+        log_slow_query(statement, parameters, elapsed, stats, context)
+
+
+# Bind parameter names (column keys, e.g. hashed_password / hashed_password_1) whose values never get logged
+SENSITIVE_PARAMS = re.compile(r"password|secret|token", re.IGNORECASE)
+_REDACTED = "<redacted>"
+
+
+def _redact_row(row, names):
+    if isinstance(row, dict):
+        return {name: _REDACTED if SENSITIVE_PARAMS.search(str(name)) else value for name, value in row.items()}
+    if not names:
+        return row
+    # a multi-row INSERT binds each row's parameters in turn, so the names repeat
+    return tuple(
+        _REDACTED if SENSITIVE_PARAMS.search(names[i % len(names)]) else value for i, value in enumerate(row)
+    )
+
+
+def redact_parameters(statement: str, parameters, context=None):
+    """The statement's parameters with the values bound to credential columns replaced by <redacted>."""
+    if not parameters or not SENSITIVE_PARAMS.search(statement):
+        return parameters
+    names = list(getattr(getattr(context, "compiled", None), "positiontup", None) or ())
+    rows = parameters if isinstance(parameters, list) else [parameters]
+    positional = [row for row in rows if not isinstance(row, dict)]
+    if positional and (not names or any(len(row) % len(names) for row in positional)):
+        return _REDACTED  # can't tell which value is which: keep them all out
+    redacted = [_redact_row(row, names) for row in rows]
+    return redacted if isinstance(parameters, list) else redacted[0]
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else f"{text[:limit]}... ({len(text)} chars)"
+
+
+def log_slow_query(statement: str, parameters, elapsed: float, stats: RequestStats | None, context=None) -> None:
+    where = "outside a request"
+    if stats is not None and stats.scope is not None:
+        where = f"{stats.scope['method']} {route_label(stats.scope)}"
+    slow_query_logger.warning(
+        "🐢 Slow query (%.1f ms, %s): %s | params: %s",
+        elapsed * 1000, where, " ".join(statement.split()),
+        _truncate(repr(redact_parameters(statement, parameters, context)), _limits.max_param_chars),
+    )
+
+
+def reset_metrics() -> None:
+    global _query_latency
+    _routes.clear()
+    _query_latency = Histogram(LATENCY_BUCKETS)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, histogram: Histogram, **labels) -> list[str]:
+    lines = [f"{name}_bucket{_labels(**labels, le=le)} {count}" for le, count in histogram.cumulative()]
+    suffix = _labels(**labels) if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.total}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+def render_prometheus(pool_gauges: dict[str, dict] | None = None) -> str:
+    """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+    lines = [
+        "# HELP http_requests_total Requests served, by route template and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    routes = sorted(_routes.items())
+    for (method, route), series in routes:
+        for status, count in sorted(series.statuses.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency, by route template.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), series in routes:
+        lines += _histogram_lines("http_request_duration_seconds", series.latency, method=method, route=route)
+
+    lines += [
+        "# HELP http_request_db_queries SQL statements executed per request, by route template.",
+        "# TYPE http_request_db_queries histogram",
+    ]
+    for (method, route), series in routes:
+        lines += _histogram_lines("http_request_db_queries", series.queries, method=method, route=route)
+
+    lines += [
+        "# HELP http_request_db_seconds_total Time spent in SQL statements while serving requests, by route template.",
+        "# TYPE http_request_db_seconds_total counter",
+    ]
+    for (method, route), series in routes:
+        lines.append(f"http_request_db_seconds_total{_labels(method=method, route=route)} {series.db_seconds}")
+
+    lines += [
+        "# HELP db_query_duration_seconds Time spent in each SQL statement.",
+        "# TYPE db_query_duration_seconds histogram",
+    ]
+    lines += _histogram_lines("db_query_duration_seconds", _query_latency)
+
+    # pool_stats() of each engine, one gauge per numeric field
+    gauges: dict[str, list[str]] = {}
+    for engine_name, stats in (pool_gauges or {}).items():
+        for key, value in stats.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                gauges.setdefault(key, []).append(f"db_pool_{key}{_labels(engine=engine_name)} {value}")
+    for key, samples in gauges.items():
+        lines.append(f"# TYPE db_pool_{key} gauge")
+        lines += samples
+    return "\n".join(lines) + "\n"
@@ -1,6 +1,12 @@
 # importing the security toolbox that handles hashing passwords
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
+from app.core.config import get_settings
+from app.exceptions import PasswordHashingBusyException
+
 # setting up the rules for how passwords will be hashed.
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -14,3 +20,54 @@ def hash_password(password: str) -> str:
 # This function is used during login
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+# bcrypt burns ~200ms of CPU per call. Run inline in an `async def`, that freezes the event loop
+# and every other request with it, so async code uses the awaitable versions below: they run on a
+# bounded worker pool (PASSWORD_HASH_WORKERS threads or processes, see PASSWORD_HASH_EXECUTOR).
+# At most PASSWORD_HASH_QUEUE_DEPTH calls wait for a worker, beyond that callers get a 503
+# instead of piling up behind each other.
+_executor: Executor | None = None
+_in_flight = 0
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        settings = get_settings()
+        if settings.password_hash_executor == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
+            )
+    return _executor
+
+
+async def _run_in_pool(func, *args):
+    global _in_flight
+    settings = get_settings()
+    if _in_flight >= settings.password_hash_workers + settings.password_hash_queue_depth:
+        raise PasswordHashingBusyException()
+
+    _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+    finally:
+        _in_flight -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+
+def shutdown_password_pool() -> None:
+    """Stops the worker pool (it's recreated on next use)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
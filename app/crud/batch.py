@@ -0,0 +1,29 @@
+# Reading many rows by primary key at once (GET /applications/batch, /users/batch).
+#
+# The ids go into `WHERE id IN (...)`, one statement per IN_CHUNK_SIZE ids: databases and drivers cap
+# the bound parameters of a statement (999 on SQLite builds before 3.32, 32767 on PostgreSQL), and
+# huge IN lists stop using the primary key index well before that anyway.
+from typing import Hashable, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+IN_CHUNK_SIZE = 500
+
+
+def unique_ids(ids: Iterable[Hashable]) -> list:
+    """`ids` without repeats, in the order they were first given."""
+    return list(dict.fromkeys(ids))
+
+
+async def fetch_by_ids(db: AsyncSession, columns, id_column, ids: list, chunk_size: int = IN_CHUNK_SIZE) -> dict:
+    """
+        id -> column values (a dict of `columns`) of the rows among `ids` that exist.
+        Issues one SELECT per `chunk_size` ids; ids that aren't found are simply absent.
+    """
+    found = {}
+    for start in range(0, len(ids), chunk_size):
+        result = await db.execute(select(*columns).where(id_column.in_(ids[start:start + chunk_size])))
+        for row in result.mappings():
+            found[row[id_column.name]] = dict(row)
+    return found
@@ -0,0 +1,87 @@
+# Row counts for pagers that can't afford an unbounded COUNT(*).
+#
+# count_within() runs a COUNT(*) query but gives up once it has run for longer than a time budget,
+# and the database really stops working on it:
+#   SQLite      - a progress handler on the connection aborts the statement past its deadline
+#   PostgreSQL  - SET LOCAL statement_timeout inside a savepoint (rolled back afterwards, so the
+#                 timeout and a cancelled statement leave the request's transaction as it was)
+#   others      - no budget, the count runs to completion
+# estimate_count() is the fallback: it counts the matching rows in a few id windows spread over the
+# table (primary key range scans, so its cost is bounded by the sample size) and scales that up.
+import time
+
+from sqlalchemy import and_, case, func, or_, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# SQLite VM instructions between two deadline checks
+_PROGRESS_STEPS = 10_000
+# PostgreSQL's error code for a statement cancelled by statement_timeout
+_QUERY_CANCELED = "57014"
+
+
+async def count_within(db: AsyncSession, query, budget_seconds: float) -> int | None:
+    """The result of `query` (a SELECT count(*) ...), or None if it didn't finish within `budget_seconds`."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return await _count_sqlite(db, query, budget_seconds)
+    if dialect == "postgresql":
+        return await _count_postgresql(db, query, budget_seconds)
+    return await db.scalar(query)
+
+
+async def _count_sqlite(db: AsyncSession, query, budget_seconds: float) -> int | None:
+    connection = await db.connection()
+    driver = (await connection.get_raw_connection()).driver_connection  # aiosqlite, runs the handler in its thread
+    deadline = time.monotonic() + budget_seconds
+    await driver.set_progress_handler(lambda: time.monotonic() > deadline, _PROGRESS_STEPS)
+    try:
+        return await db.scalar(query)
+    except DBAPIError as error:
+        if "interrupted" in str(error.orig):
+            return None
+        raise
+    finally:
+        await driver.set_progress_handler(None, _PROGRESS_STEPS)
+
+
+async def _count_postgresql(db: AsyncSession, query, budget_seconds: float) -> int | None:
+    savepoint = await db.begin_nested()
+    try:
+        await db.execute(text(f"SET LOCAL statement_timeout = {max(int(budget_seconds * 1000), 1)}"))
+        return await db.scalar(query)
+    except DBAPIError as error:
+        if getattr(error.orig, "sqlstate", None) == _QUERY_CANCELED:
+            return None
+        raise
+    finally:
+        await savepoint.rollback()  # read only: this just drops the timeout (and clears a cancelled statement)
+
+
+async def estimate_count(db: AsyncSession, id_column, conditions: list, sample_rows: int, windows: int = 4) -> int:
+    """
+        Estimated number of rows matching `conditions`, from the matches among about `sample_rows` ids
+        taken in `windows` evenly spaced ranges between the lowest and the highest id.
+        Gaps in the ids don't skew it, matches bunched up in one part of the id range do.
+    """
+    table = id_column.table
+    low = select(func.min(id_column)).scalar_subquery()
+    high = select(func.max(id_column)).scalar_subquery()
+    span = high - low + 1
+    width = max(sample_rows // windows, 1)
+    starts = [low + span * i // windows for i in range(windows)]
+    result = await db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0),
+            span,
+        )
+        .select_from(table)
+        .where(or_(*(and_(id_column >= start, id_column < start + width) for start in starts)))
+    )
+    sampled, matched, span = result.one()
+    if not sampled:
+        return 0
+    step = span // windows
+    covered = min(span, (windows - 1) * min(step, width) + width)
+    return round(matched * span / covered)
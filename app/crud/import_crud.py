@@ -0,0 +1,184 @@
+# Streamed import of job applications (POST /applications/import).
+#
+# Records are read incrementally and written in chunks of IMPORT_CHUNK_SIZE rows. Every commit also
+# records how far the import got (import_jobs.rows_processed) in the same transaction, so after a
+# failure the same file can be re-uploaded with the import id and picks up after the last committed chunk.
+from typing import AsyncIterator
+from uuid import uuid4
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models.import_models as models
+import app.schemas.job_schemas as job_schemas
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.crud import job_crud
+from app.exceptions import AppBaseException, ImportJobNotFoundException
+from app.schemas.import_schemas import ImportStatus
+
+
+class InvalidRecord:
+    """Stands in for a record the parser couldn't read, so it's reported as a row error."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+
+class _Progress:
+    """
+        In-memory copy of the import_jobs counters, written out with every commit.
+        save() writes what the counters will be once a commit is in, committed() moves them on after it went
+        through: a commit that fails (and is retried row by row) doesn't count its rows twice.
+    """
+
+    def __init__(self, job: models.ImportJob, max_errors: int):
+        self.rows_processed = job.rows_processed
+        self.rows_inserted = job.rows_inserted
+        self.rows_failed = job.rows_failed
+        self.errors = list(job.errors or [])
+        self.max_errors = max_errors
+        # row errors found by validation that no commit has covered yet
+        self.pending_errors: list[job_schemas.BulkItemError] = []
+
+    def _advanced(self, next_index: int, inserted: int, errors: list[job_schemas.BulkItemError]) -> dict:
+        """The counters after a commit covering rows up to `next_index` (exclusive), without changing them."""
+        covered = sorted(
+            [error for error in self.pending_errors if error.index < next_index] + list(errors),
+            key=lambda error: error.index,
+        )
+        room = max(self.max_errors - len(self.errors), 0)
+        return {
+            "rows_processed": max(self.rows_processed, next_index),
+            "rows_inserted": self.rows_inserted + inserted,
+            "rows_failed": self.rows_failed + len(covered),
+            "errors": self.errors + [error.model_dump() for error in covered[:room]],
+        }
+
+    async def save(
+            self, db: AsyncSession, job_id: str, next_index: int, inserted: int = 0,
+            errors: list[job_schemas.BulkItemError] = (),
+    ) -> None:
+        """Writes the counters up to `next_index` into the current transaction (the caller commits)."""
+        await db.execute(
+            update(models.ImportJob)
+            .where(models.ImportJob.id == job_id)
+            .values(**self._advanced(next_index, inserted, errors))
+        )
+
+    def committed(self, next_index: int, inserted: int = 0, errors: list[job_schemas.BulkItemError] = ()) -> None:
+        """Takes on what save() wrote with the same arguments, once its transaction committed."""
+        for name, value in self._advanced(next_index, inserted, errors).items():
+            setattr(self, name, value)
+        self.pending_errors = [error for error in self.pending_errors if error.index >= next_index]
+
+
+async def get_import_job(db: AsyncSession, import_id: str) -> models.ImportJob:
+    # populate_existing: progress is written with Core UPDATEs, refresh any copy already in the session
+    result = await db.execute(
+        select(models.ImportJob)
+        .where(models.ImportJob.id == import_id)
+        .execution_options(populate_existing=True)
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise ImportJobNotFoundException(import_id)
+    return job
+
+
+async def _start_or_resume(db: AsyncSession, import_id: str | None, import_format: str) -> models.ImportJob:
+    job = None
+    if import_id:
+        result = await db.execute(select(models.ImportJob).where(models.ImportJob.id == import_id))
+        job = result.scalar_one_or_none()
+
+    if job is None:
+        job = models.ImportJob(id=import_id or str(uuid4()), format=import_format, errors=[])
+        db.add(job)
+    elif job.format != import_format:
+        raise AppBaseException(status_code=400, detail=f"Import {import_id} was started as {job.format}.")
+    else:
+        logger.info("⏯️ Resuming import %s after row %s", job.id, job.rows_processed)
+
+    job.status = ImportStatus.RUNNING.value
+    job.detail = None
+    await db.commit()
+    return job
+
+
+async def _write_batch(db: AsyncSession, job_id: str, progress: _Progress, batch: list[tuple[int, object]]) -> None:
+    parsed, unparsable = [], []
+    for index, record in batch:
+        if isinstance(record, InvalidRecord):
+            unparsable.append(job_schemas.BulkItemError(index=index, errors=[{"msg": record.reason}]))
+        else:
+            parsed.append((index, record))
+
+    valid, invalid = job_crud.validate_bulk_items(parsed)
+    progress.pending_errors = sorted(unparsable + invalid, key=lambda error: error.index)
+
+    async def on_commit(db: AsyncSession, next_index: int, created: list[tuple[int, int]], errors: list) -> None:
+        await progress.save(db, job_id, next_index, len(created), errors)
+
+    def after_commit(next_index: int, created: list[tuple[int, int]], errors: list) -> None:
+        progress.committed(next_index, len(created), errors)
+
+    # the whole batch is one chunk, i.e. one INSERT and one transaction (unless a row fails in the DB)
+    await job_crud.insert_job_rows(
+        db, valid, chunk_size=len(batch), on_commit=on_commit, after_commit=after_commit
+    )
+
+    # covers invalid rows after the last inserted one (or a batch with nothing valid in it)
+    next_index = batch[-1][0] + 1
+    await progress.save(db, job_id, next_index)
+    await db.commit()
+    progress.committed(next_index)
+
+
+async def run_import(
+        db: AsyncSession,
+        records: AsyncIterator,
+        import_format: str,
+        import_id: str | None = None,
+) -> models.ImportJob:
+    settings = get_settings()
+    job = await _start_or_resume(db, import_id, import_format)
+    job_id, skip = job.id, job.rows_processed
+    progress = _Progress(job, settings.import_max_errors)
+
+    batch = []
+    index = 0
+    try:
+        async for record in records:
+            if index >= skip:
+                batch.append((index, record))
+                if len(batch) >= settings.import_chunk_size:
+                    await _write_batch(db, job_id, progress, batch)
+                    logger.info("📥 Import %s: %s rows processed", job_id, progress.rows_processed)
+                    batch = []
+            index += 1
+        if batch:
+            await _write_batch(db, job_id, progress, batch)
+    except Exception as e:
+        await db.rollback()
+        await db.execute(
+            update(models.ImportJob)
+            .where(models.ImportJob.id == job_id)
+            .values(status=ImportStatus.FAILED.value, detail=f"{type(e).__name__}: {e}"[:500])
+        )
+        await db.commit()
+        logger.error("❌ Import %s failed after %s rows: %s", job_id, progress.rows_processed, e)
+        raise AppBaseException(
+            status_code=500,
+            detail=f"Import {job_id} failed after {progress.rows_processed} rows; "
+                   f"upload the same file with import_id={job_id} to resume."
+        )
+
+    await db.execute(
+        update(models.ImportJob)
+        .where(models.ImportJob.id == job_id)
+        .values(status=ImportStatus.COMPLETED.value)
+    )
+    await db.commit()
+    logger.info("✅ Import %s completed: %s inserted, %s failed", job_id, progress.rows_inserted, progress.rows_failed)
+    return await get_import_job(db, job_id)
@@ -1,28 +1,75 @@
 # Contains DB logic.
 
-from sqlalchemy import select, or_
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from collections import Counter
+from datetime import date
+from typing import Any, Iterable
+
+from pydantic import ValidationError
+from sqlalchemy import Row, delete, func, insert, select, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 import app.models.job_models as models
 import app.schemas.job_schemas as schemas
-from app.core.logger import logger
-from app.exceptions import JobApplicationNotFoundException, AppBaseException
+from app.core.cache import bump_generation, get_cache, get_generation, snapshot
+from app.core.config import get_settings
+from app.core.logger import logger, read_logger
+from app.crud import stats_crud
+from app.crud.batch import fetch_by_ids, unique_ids
+from app.crud.counting import count_within, estimate_count
+from app.crud.pagination import decode_cursor, keyset_predicate, order_by_keyset
+from app.db.database import supports_returning
+from app.exceptions import (
+    JobApplicationNotFoundException, AppBaseException, InvalidCursorException, WriteConflictException
+)
+from app.search import SearchBackend, get_search_backend, tokenize
+
+# Columns that /applications/filter can sort (and therefore keyset-paginate) by
+SORTABLE_COLUMNS = ("applied_date", "status")
+
+# Values the `status` filter can match (the ones the status counters are kept for)
+STATUS_VALUES = frozenset(status.value for status in schemas.ApplicationStatus)
+
+# What the list endpoints select: plain columns, so results are lightweight Rows (attribute access,
+# `row.company`) instead of ORM objects tracked in the session's identity map. They're read-only.
+JOB_COLUMNS = tuple(models.JobApplication.__table__.columns)
+
+
+# The columns of a sparse fieldset (JobAppOut field names, see schemas.parse_fields) plus the ones the
+# caller needs itself (keyset cursors read the sort column and id), in table order. None selects them all.
+def job_columns(fields: Iterable[str] | None = None, *required: str) -> tuple:
+    if fields is None:
+        return JOB_COLUMNS
+    wanted = set(fields).union(required)
+    return tuple(column for column in JOB_COLUMNS if column.name in wanted)
+
+
+# Turns a validated JobAppCreate into the column values stored in job_applications
+def job_values(job: schemas.JobAppCreate) -> dict:
+    job_data_dict = job.model_dump()
+
+    if "link" in job_data_dict and job_data_dict["link"] is not None:
+        job_data_dict["link"] = str(job_data_dict["link"])
+    return job_data_dict
 
 
 # Handle creating a new row in the job_applications table.
+# Where the dialect can, INSERT ... RETURNING hands back the stored row (id, server defaults) in the
+# same round trip, so there's no refresh SELECT after the commit.
 async def create_job_app(db: AsyncSession, job: schemas.JobAppCreate):
     try:
-        job_data_dict = job.model_dump()
-
-        if "link" in job_data_dict and job_data_dict["link"] is not None:
-            job_data_dict["link"] = str(job_data_dict["link"])
-
-        db_job = models.JobApplication(**job_data_dict)
-        db.add(db_job)
+        values = job_values(job)
+        if supports_returning(db, "insert"):
+            db_job = await db.scalar(insert(models.JobApplication).values(**values).returning(models.JobApplication))
+        else:
+            db_job = models.JobApplication(**values)
+            db.add(db_job)
+            await db.flush()
+            await db.refresh(db_job)
+        await stats_crud.apply_deltas(db, stats_crud.stat_deltas(added=[values]))
         await db.commit()
-        await db.refresh(db_job)
-        logger.info(f"✅ Created job application: {db_job.id} at {db_job.company}")
+        jobs_changed()
+        logger.info("✅ Created job application: %s at %s", db_job.id, db_job.company)
         return db_job
     except IntegrityError:
         await db.rollback()
@@ -32,18 +79,158 @@ async def create_job_app(db: AsyncSession, job: schemas.JobAppCreate):
         raise AppBaseException(status_code=500, detail="Unexpected error during creation.")
 
 
-# List jobs with pagination
-async def get_job_apps(db: AsyncSession, skip: int = 0, limit: int = 100):
+# Validates raw (index, item) pairs as JobAppCreate. Returns the valid ones as (index, column values)
+# plus one BulkItemError per invalid item, so a bad item never fails the whole batch.
+def validate_bulk_items(items: Iterable[tuple[int, Any]]) -> tuple[list[tuple[int, dict]], list[schemas.BulkItemError]]:
+    valid, errors = [], []
+    for index, item in items:
+        try:
+            valid.append((index, job_values(schemas.JobAppCreate.model_validate(item))))
+        except ValidationError as e:
+            errors.append(schemas.BulkItemError(
+                index=index,
+                errors=e.errors(include_url=False, include_context=False, include_input=False)
+            ))
+    return valid, errors
+
+
+# Writes already-validated rows in chunks: one multi-row INSERT ... RETURNING id and one commit per chunk.
+# Returns (index, id) pairs for the rows written; sort_by_parameter_order keeps RETURNING in the order of the
+# parameter sets, which a multi-row INSERT doesn't promise otherwise.
+# If a chunk hits a DB error it's retried row by row, so only the offending rows are reported.
+# `on_commit(db, next_index, created, errors)` runs right before each commit, inside the same transaction,
+# with what that commit covers (rows up to `next_index`, exclusive) - used to record import progress.
+# `after_commit(next_index, created, errors)` gets the same once the commit went through (not for a chunk
+# whose commit failed and is retried row by row).
+async def insert_job_rows(
+        db: AsyncSession,
+        rows: list[tuple[int, dict]],
+        chunk_size: int | None = None,
+        on_commit=None,
+        after_commit=None,
+) -> tuple[list[tuple[int, int]], list[schemas.BulkItemError]]:
+    chunk_size = chunk_size or get_settings().bulk_insert_chunk_size
+    stmt = insert(models.JobApplication).returning(models.JobApplication.id, sort_by_parameter_order=True)
+    created, errors = [], []
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            result = await db.execute(stmt, [values for _, values in chunk])
+            chunk_created = list(zip((index for index, _ in chunk), result.scalars()))
+            await stats_crud.apply_deltas(db, stats_crud.stat_deltas(added=[values for _, values in chunk]))
+            if on_commit:
+                await on_commit(db, chunk[-1][0] + 1, chunk_created, [])
+            await db.commit()
+            jobs_changed()
+            if after_commit:
+                after_commit(chunk[-1][0] + 1, chunk_created, [])
+            created.extend(chunk_created)
+        except DBAPIError:
+            await db.rollback()
+            logger.warning(
+                "⚠️ Bulk insert chunk at %s failed, retrying its %s rows one by one", chunk[0][0], len(chunk)
+            )
+            for index, values in chunk:
+                row_created, row_errors = [], []
+                try:
+                    result = await db.execute(stmt, [values])
+                    row_created.append((index, result.scalar_one()))
+                    await stats_crud.apply_deltas(db, stats_crud.stat_deltas(added=[values]))
+                except DBAPIError:
+                    await db.rollback()
+                    row_errors.append(schemas.BulkItemError(
+                        index=index,
+                        errors=[{"msg": "Database integrity error: Duplicate or invalid data."}]
+                    ))
+                if on_commit:
+                    await on_commit(db, index + 1, row_created, row_errors)
+                await db.commit()
+                jobs_changed()
+                if after_commit:
+                    after_commit(index + 1, row_created, row_errors)
+                created.extend(row_created)
+                errors.extend(row_errors)
+    return created, errors
+
+
+# Bulk create: validate everything in one pass, then insert the valid items in chunks
+async def bulk_create_job_apps(db: AsyncSession, items: list[dict], chunk_size: int | None = None):
+    valid, errors = validate_bulk_items(enumerate(items))
+    created, insert_errors = await insert_job_rows(db, valid, chunk_size)
+    errors = sorted(errors + insert_errors, key=lambda error: error.index)
+    logger.info("📦 Bulk created %s job applications, %s rejected", len(created), len(errors))
+    return schemas.BulkCreateResult(
+        created=[schemas.BulkCreatedItem(index=index, id=job_id) for index, job_id in created],
+        errors=errors,
+    )
+
+
+# List jobs with pagination, as Rows of JOB_COLUMNS (only id and `fields` for a sparse fieldset).
+# Pass the `cursor` from the previous page to page by keyset (id), `skip` is kept for old clients.
+async def get_job_apps(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        fields: tuple[str, ...] | None = None,
+) -> list[Row]:
+    id_column = models.JobApplication.id
+    query = select(*job_columns(fields, "id")).order_by(*order_by_keyset(id_column, id_column))
+
+    if cursor:
+        _, last_id = decode_cursor(cursor, "id", "asc")
+        query = query.where(keyset_predicate(id_column, id_column, last_id, last_id))
+    else:
+        query = query.offset(skip)
+
     try:
-        result = await db.execute(
-            select(models.JobApplication).offset(skip).limit(limit)
-        )
-        logger.info(f"📄 Fetched jobs: skip={skip}, limit={limit}")
-        return result.scalars().all()
+        result = await db.execute(query.limit(limit))
+        read_logger.info("📄 Fetched jobs: skip=%s, limit=%s, cursor=%s", skip, limit, cursor)
+        return result.all()
     except Exception:
         raise AppBaseException(status_code=500, detail="Internal server error while fetching job applications.")
 
 
+# Maps the `sort_by` query value to the attribute the rows are ordered by
+# (unknown values such as "updated_at" fall back to applied_date)
+def sort_attribute(sort_by: str) -> str:
+    return sort_by if sort_by in SORTABLE_COLUMNS else "applied_date"
+
+
+# Full-text search backend for the dialect this session talks to (FTS5 on SQLite, ILIKE elsewhere)
+def search_backend_for(db: AsyncSession) -> SearchBackend:
+    return get_search_backend(db.get_bind().dialect.name)
+
+
+# Builds the WHERE conditions shared by everything that filters job applications.
+# applied_from / applied_to are inclusive and become a range scan on the (status, applied_date, id) index.
+# search_query goes through the full-text backend, so it needs `search_backend` when set.
+def filter_conditions(
+        company: str | None = None,
+        status: str | None = None,
+        search_query: str | None = None,
+        applied_from: date | None = None,
+        applied_to: date | None = None,
+        search_backend: SearchBackend | None = None,
+) -> list:
+    conditions = []
+
+    if company:
+        conditions.append(models.JobApplication.company.ilike(f"%{company}%"))
+    if status:
+        conditions.append(models.JobApplication.status == status)
+    if applied_from:
+        conditions.append(models.JobApplication.applied_date >= applied_from)
+    if applied_to:
+        conditions.append(models.JobApplication.applied_date <= applied_to)
+
+    if search_query and tokenize(search_query):
+        matches = search_backend.matches(search_query)
+        conditions.append(models.JobApplication.id.in_(select(matches.c.id)))
+    return conditions
+
+
 async def filter_job_apps(
         db: AsyncSession,
         company: str | None = None,
@@ -52,76 +239,412 @@ async def filter_job_apps(
         order: str = "desc",
         skip: int = 0,
         limit: int = 10,
-        search_query: str | None = None
-):
-    try:
-        query = select(models.JobApplication)
-
-        if company:
-            query = query.filter(models.JobApplication.company.ilike(f"%{company}%"))
-        if status:
-            query = query.filter(models.JobApplication.status == status)
-
-        if search_query:
-            query = query.filter(
-                or_(
-                    models.JobApplication.position.ilike(f"%{search_query}%"),
-                    models.JobApplication.company.ilike(f"%{search_query}%"),
-                    models.JobApplication.notes.ilike(f"%{search_query}%")
-                )
-            )
+        search_query: str | None = None,
+        cursor: str | None = None,
+        applied_from: date | None = None,
+        applied_to: date | None = None,
+        fields: tuple[str, ...] | None = None,
+) -> list[Row]:
+    cache_key = filter_cache_key(
+        company, status, sort_by, order, skip, limit, search_query, cursor, applied_from, applied_to, fields
+    )
+    cached = filter_cache().get(cache_key)
+    if cached is not None:
+        return cached  # Rows are immutable, the cached list is handed out as is
+
+    jobs = await _query_job_apps(
+        db, company, status, sort_by, order, skip, limit, search_query, cursor, applied_from, applied_to, fields
+    )
+    filter_cache().set(cache_key, jobs)
+    return jobs
+
+
+# Normalized /applications/filter parameters + the table generation: any job write makes old keys unreachable.
+# Keys the result cache, and the list ETag is derived from it.
+def filter_cache_key(company, status, sort_by, order, skip, limit, search_query, cursor, applied_from,
+                     applied_to, fields=None) -> tuple:
+    return (
+        get_generation(models.JobApplication.__tablename__),
+        company.lower() if company else None,  # ILIKE: case does not change the result
+        status,
+        sort_by if sort_by == "relevance" else sort_attribute(sort_by),
+        order,
+        skip if not cursor else 0,
+        limit,
+        tuple(tokenize(search_query)) if search_query else (),
+        cursor,
+        applied_from,
+        applied_to,
+        fields,
+    )
+
 
-        # Dynamic ordering
-        sort_column = getattr(models.JobApplication, sort_by, models.JobApplication.applied_date)
+# Most statements count_job_apps() runs: the estimate after a COUNT(*) that ran out of time, which on
+# PostgreSQL also takes a savepoint, SET LOCAL statement_timeout and the rollback to the savepoint
+COUNT_MAX_STATEMENTS = 5
 
-        if order == "desc":
-            sort_column = sort_column.desc()
+
+# Total number of applications matching the /applications/filter filters (across all pages), as (total, exact):
+#   no filter or only a status  - the maintained status counters, exact at the cost of one counter row
+#   dates (and maybe a status)  - the daily status rollups summed over the date range, exact too
+#   company and/or q            - COUNT(*) within COUNT_TIME_BUDGET_MS, else an estimate from a sample of rows
+# The estimate samples id windows, which would badly skew a date range (applied_date grows with id), hence
+# the rollups for those.
+# Cached in the filter result cache, so it's computed once per filter until the next job write.
+async def count_job_apps(
+        db: AsyncSession,
+        company: str | None = None,
+        status: str | None = None,
+        search_query: str | None = None,
+        applied_from: date | None = None,
+        applied_to: date | None = None,
+) -> tuple[int, bool]:
+    terms = tuple(tokenize(search_query)) if search_query else ()
+    cache_key = (
+        "total", get_generation(models.JobApplication.__tablename__), company.lower() if company else None, status,
+        terms, applied_from, applied_to,
+    )
+    cached = filter_cache().get(cache_key)
+    if cached is not None:
+        return cached
+
+    if not (company or terms) and (status is None or status in STATUS_VALUES):
+        if applied_from or applied_to:
+            total = (await stats_crud.count_from_rollups(db, status, applied_from, applied_to), True)
+        else:
+            total = (await stats_crud.count_by_status(db, status), True)
+    else:
+        settings = get_settings()
+        conditions = filter_conditions(company, status, search_query, applied_from, applied_to, search_backend_for(db))
+        query = select(func.count()).select_from(models.JobApplication).where(*conditions)
+        count = await count_within(db, query, settings.count_time_budget_ms / 1000)
+        if count is not None:
+            total = (count, True)
         else:
-            sort_column = sort_column.asc()
+            estimate = await estimate_count(
+                db, models.JobApplication.id, conditions, settings.count_estimate_sample_rows
+            )
+            total = (estimate, False)
+            read_logger.info("⏱️ Count over its time budget, estimated %s: %s", estimate, cache_key[2:])
+
+    filter_cache().set(cache_key, total)
+    return total
 
-        query = query.order_by(sort_column).offset(skip).limit(limit)
 
-        result = await db.execute(query)
-        logger.info(f"🔍 Filtered jobs fetched with skip={skip}, limit={limit}, sort_by={sort_by}, order={order}")
-        return result.scalars().all()
+async def _query_job_apps(db, company, status, sort_by, order, skip, limit, search_query, cursor, applied_from,
+                          applied_to, fields=None):
+    backend = search_backend_for(db)
+    id_column = models.JobApplication.id
+    columns = job_columns(fields, "id", sort_attribute(sort_by))
+
+    if sort_by == "relevance" and search_query and tokenize(search_query):
+        # Ranked search: join the matches and order by score (best first), id breaks ties.
+        # Scores aren't stable keyset positions, so ranked results page with `skip` only.
+        if cursor:
+            raise InvalidCursorException("relevance ordering pages with skip, not cursors")
+        matches = backend.matches(search_query)
+        query = (
+            select(*columns)
+            .join(matches, matches.c.id == id_column)
+            .where(*filter_conditions(company, status, None, applied_from, applied_to))
+            .order_by(matches.c.score, id_column)
+            .offset(skip)
+        )
+    else:
+        query = select(*columns).where(
+            *filter_conditions(company, status, search_query, applied_from, applied_to, backend)
+        )
+
+        # Dynamic ordering, id breaks ties so the keyset position is unique
+        sort_column = getattr(models.JobApplication, sort_attribute(sort_by))
+        query = query.order_by(*order_by_keyset(sort_column, id_column, order))
+
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort_by, order)
+            query = query.where(keyset_predicate(sort_column, id_column, value, last_id, order))
+        else:
+            query = query.offset(skip)
+
+    try:
+        result = await db.execute(query.limit(limit))
+        read_logger.info(
+            "🔍 Filtered jobs fetched with skip=%s, limit=%s, sort_by=%s, order=%s", skip, limit, sort_by, order
+        )
+        return result.all()
 
     except Exception as e:
-        logger.error(f"❌ Error filtering jobs: {e}")
+        logger.error("❌ Error filtering jobs: %s", e)
         raise AppBaseException(status_code=500, detail="Internal server error while filtering job applications.")
 
 
-# Delete a job by ID
+# WHERE conditions for the rows picked by a BulkSelector (ids and filter must both match).
+# An empty selector would hit every row, so it's rejected instead of touching the whole table.
+def selector_conditions(selector: schemas.BulkSelector, search_backend: SearchBackend) -> list:
+    conditions = []
+    if selector.ids is not None:
+        conditions.append(models.JobApplication.id.in_(selector.ids))
+    if selector.filter:
+        f = selector.filter
+        conditions += filter_conditions(f.company, f.status, f.q, f.applied_from, f.applied_to, search_backend)
+    if not conditions:
+        raise AppBaseException(status_code=400, detail="Bulk writes need `ids` or at least one filter.")
+    return conditions
+
+
+# The rows a bulk write is about to touch, grouped by the columns the stats counters are keyed on
+# (mappings with the STAT_COLUMNS + "count"). Read in the write's own transaction, right before it, with
+# the rows locked (FOR UPDATE, where the dialect has it) so none of them can change or go before the write.
+# Rows that start matching in between (inserts, other updates) aren't locked: _execute_bulk_write compares
+# the rows it wrote with the rows counted here and refuses to commit when they differ.
+async def _stat_groups(db: AsyncSession, conditions: list) -> list[dict]:
+    locked = (
+        select(*(getattr(models.JobApplication, name) for name in stats_crud.STAT_COLUMNS))
+        .where(*conditions)
+        .with_for_update()
+        .subquery()
+    )
+    columns = [locked.c[name] for name in stats_crud.STAT_COLUMNS]
+    result = await db.execute(select(*columns, func.count().label("count")).group_by(*columns))
+    return [dict(row) for row in result.mappings()]
+
+
+# Runs one set-based UPDATE/DELETE, applies its stats deltas and commits it.
+# With `returning`, affected ids come from RETURNING, or from a SELECT in the same transaction
+# on dialects that can't return from this statement.
+# `expected` is the number of rows the deltas were computed from (see _stat_groups): if the write touched
+# any other number, the deltas would be wrong, so it's a WriteConflictException instead.
+async def _execute_bulk_write(
+        db: AsyncSession,
+        stmt,
+        conditions: list,
+        returning: bool,
+        can_return: bool,
+        deltas: Counter | None = None,
+        expected: int | None = None,
+):
+    stmt = stmt.execution_options(synchronize_session=False)
+    ids = None
+    if returning and can_return:
+        result = await db.execute(stmt.returning(models.JobApplication.id))
+        ids = list(result.scalars())
+        affected = len(ids)
+    else:
+        if returning:
+            ids = list((await db.execute(select(models.JobApplication.id).where(*conditions))).scalars())
+        result = await db.execute(stmt)
+        affected = result.rowcount
+    if expected is not None and affected != expected:
+        raise WriteConflictException(f"{affected - expected:+d} rows started or stopped matching during the bulk write")
+    if deltas:
+        await stats_crud.apply_deltas(db, deltas)
+    await db.commit()
+    jobs_changed()
+    return schemas.BulkWriteResult(affected=affected, ids=ids)
+
+
+# Bulk update: a single `UPDATE job_applications SET ... WHERE <selector>`
+async def bulk_update_jobs(db: AsyncSession, request: schemas.BulkUpdateRequest):
+    update_fields = request.changes.model_dump(exclude_unset=True)
+    if not update_fields:
+        raise AppBaseException(status_code=400, detail="Bulk update needs at least one field in `changes`.")
+    conditions = selector_conditions(request, search_backend_for(db))
+    stat_changes = {key: value for key, value in update_fields.items() if key in stats_crud.STAT_COLUMNS}
+    stmt = (
+        update(models.JobApplication)
+        .where(*conditions)
+        .values(**update_fields, version=models.JobApplication.version + 1)
+    )
+
+    try:
+        deltas, expected = None, None
+        if stat_changes:
+            groups = await _stat_groups(db, conditions)
+            updated = [{**group, **stat_changes} for group in groups]
+            deltas = stats_crud.stat_deltas(added=updated, removed=groups)
+            deltas.update(stats_crud.transition_deltas(zip(groups, updated)))
+            expected = sum(group["count"] for group in groups)
+        result = await _execute_bulk_write(
+            db, stmt, conditions, request.returning, db.get_bind().dialect.update_returning, deltas, expected
+        )
+        job_cache().clear()
+        logger.info("✏️ Bulk updated %s jobs with fields: %s", result.affected, list(update_fields.keys()))
+        return result
+    except WriteConflictException:
+        await db.rollback()
+        raise
+    except IntegrityError:
+        await db.rollback()
+        raise AppBaseException(status_code=409, detail="Database integrity error during bulk update.")
+    except Exception:
+        await db.rollback()
+        raise AppBaseException(status_code=500, detail="Unexpected error during bulk update.")
+
+
+# Bulk delete: a single `DELETE FROM job_applications WHERE <selector>`
+async def bulk_delete_jobs(db: AsyncSession, selector: schemas.BulkSelector):
+    conditions = selector_conditions(selector, search_backend_for(db))
+    stmt = delete(models.JobApplication).where(*conditions)
+
+    try:
+        groups = await _stat_groups(db, conditions)
+        result = await _execute_bulk_write(
+            db, stmt, conditions, selector.returning, db.get_bind().dialect.delete_returning,
+            stats_crud.stat_deltas(removed=groups), sum(group["count"] for group in groups)
+        )
+        job_cache().clear()
+        logger.info("🗑️ Bulk deleted %s jobs", result.affected)
+        return result
+    except WriteConflictException:
+        await db.rollback()
+        raise
+    except Exception:
+        await db.rollback()
+        raise AppBaseException(status_code=500, detail="Unexpected error during bulk deletion.")
+
+
+# Streams every job application matching the filters, in id order, without loading them all:
+# a server-side cursor fetches `batch_size` rows per round trip (yield_per).
+# Opens its own session so it can outlive the request's dependencies (see get_async_sessionmaker).
+async def stream_job_apps(
+        session_factory: async_sessionmaker,
+        company: str | None = None,
+        status: str | None = None,
+        search_query: str | None = None,
+        applied_from: date | None = None,
+        applied_to: date | None = None,
+        batch_size: int | None = None,
+):
+    batch_size = batch_size or get_settings().export_batch_size
+    async with session_factory() as db:
+        query = (
+            select(models.JobApplication)
+            .where(*filter_conditions(company, status, search_query, applied_from, applied_to, search_backend_for(db)))
+            .order_by(models.JobApplication.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await db.stream_scalars(query)
+        exported = 0
+        async for job in result:
+            exported += 1
+            yield job
+        logger.info("📤 Exported %s jobs", exported)
+
+
+# Delete a job by ID: a single DELETE ... RETURNING where the dialect has it (the returned row
+# feeds the stats deltas), SELECT + DELETE elsewhere
 async def delete_job(db: AsyncSession, job_id: int):
     try:
-        job = await fetch_one(db, select(models.JobApplication).where(models.JobApplication.id == job_id))
+        if supports_returning(db, "delete"):
+            job = await db.scalar(
+                delete(models.JobApplication)
+                .where(models.JobApplication.id == job_id)
+                .returning(models.JobApplication)
+                .execution_options(populate_existing=True)
+            )
+        else:
+            job = await fetch_one(db, select(models.JobApplication).where(models.JobApplication.id == job_id))
+            if job:
+                await db.delete(job)
         if not job:
             raise JobApplicationNotFoundException(job_id)
-        await db.delete(job)
+        await stats_crud.apply_deltas(db, stats_crud.stat_deltas(removed=[snapshot(job)]))
         await db.commit()
-        logger.info(f"🗑️ Deleted job ID {job_id}")
+        jobs_changed()
+        job_cache().delete(job_id)
+        logger.info("🗑️ Deleted job ID %s", job_id)
         return job
+    except JobApplicationNotFoundException:
+        await db.rollback()
+        raise
     except Exception:
         await db.rollback()
         raise AppBaseException(status_code=500, detail="Unexpected error during deletion.")
 
 
-# Accepts a DB session, job ID, and partial update data using a Pydantic schema
+# Accepts a DB session, job ID, and partial update data using a Pydantic schema.
+# Where the dialect has UPDATE ... RETURNING the row is written and read back in one statement; the old
+# values are only read first when a stats column (company, status, applied_date) changes, since the
+# counters have to move from the old key to the new one. That read takes the row version, and the
+# UPDATE only applies to that version: if another write got in between, it's a 409 rather than
+# counters moved from values the row no longer had.
 async def update_job(db: AsyncSession, job_id: int, updated_data: schemas.JobAppUpdate):
+    update_fields = updated_data.model_dump(exclude_unset=True)
+    if not update_fields or not supports_returning(db, "update"):
+        return await _update_job_orm(db, job_id, update_fields)
+
+    try:
+        before = None
+        stmt = update(models.JobApplication).where(models.JobApplication.id == job_id)
+        if any(key in stats_crud.STAT_COLUMNS for key in update_fields):
+            columns = [getattr(models.JobApplication, name) for name in (*stats_crud.STAT_COLUMNS, "version")]
+            result = await db.execute(select(*columns).where(models.JobApplication.id == job_id))
+            before = result.mappings().one_or_none()
+            if before is None:
+                raise JobApplicationNotFoundException(job_id)
+            stmt = stmt.where(models.JobApplication.version == before["version"])
+
+        job = await db.scalar(
+            stmt
+            .values(**update_fields, version=models.JobApplication.version + 1)
+            .returning(models.JobApplication)
+            # an instance already in the session takes the returned values
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        if job is None:
+            if before is not None and await get_job_version(db, job_id) is not None:
+                raise WriteConflictException(f"Job Application with id {job_id} was changed by another request")
+            raise JobApplicationNotFoundException(job_id)
+
+        if before is not None:
+            after = snapshot(job)
+            deltas = stats_crud.stat_deltas(added=[after], removed=[before])
+            deltas.update(stats_crud.transition_deltas([(before, after)]))
+            await stats_crud.apply_deltas(db, deltas)
+        await db.commit()
+        jobs_changed()
+        job_cache().set(job_id, snapshot(job))
+        logger.info("✏️ Updated job ID %s with fields: %s", job_id, list(update_fields.keys()))
+        return job
+
+    except (JobApplicationNotFoundException, WriteConflictException) as e:
+        await db.rollback()
+        raise e
+
+    except IntegrityError:
+        await db.rollback()
+        raise AppBaseException(status_code=409, detail="Database integrity error during update.")
+
+    except Exception:
+        await db.rollback()
+        raise AppBaseException(status_code=500, detail="Unexpected error during update.")
+
+
+# update_job on dialects without UPDATE ... RETURNING (and for empty updates): load, modify, flush, refresh
+async def _update_job_orm(db: AsyncSession, job_id: int, update_fields: dict):
     try:
-        #  Fetch the job entry from the database
-        job = await get_job_app_by_id(db, job_id)
+        #  Fetch the job entry from the database (never from the cache, it's about to be written)
+        job = await fetch_one(db, select(models.JobApplication).where(models.JobApplication.id == job_id))
+        if not job:
+            raise JobApplicationNotFoundException(job_id)
 
-        update_fields = updated_data.model_dump(exclude_unset=True)
+        before = snapshot(job)
 
         #  Update only the fields that were actually passed in the request
         for key, value in update_fields.items():
             setattr(job, key, value)
+        #  Move the stats counters in the same transaction
+        after = snapshot(job)
+        deltas = stats_crud.stat_deltas(added=[after], removed=[before])
+        deltas.update(stats_crud.transition_deltas([(before, after)]))
+        await stats_crud.apply_deltas(db, deltas)
         #  Save and refresh the changes in the DB
         await db.commit()
+        jobs_changed()
         await db.refresh(job)
+        #  Write-through: the next read gets the new values from the cache
+        job_cache().set(job_id, snapshot(job))
         #  Log what got updated
-        logger.info(
-            f"✏️ Updated job ID {job_id} with fields: {list(update_fields.keys())}")
+        logger.info("✏️ Updated job ID %s with fields: %s", job_id, list(update_fields.keys()))
         #  Return the fully updated model
         return job
 
@@ -137,14 +660,77 @@ async def update_job(db: AsyncSession, job_id: int, updated_data: schemas.JobApp
         raise AppBaseException(status_code=500, detail="Unexpected error during update.")
 
 
-async def get_job_app_by_id(db: AsyncSession, job_id: int):
+# Every committed write to job_applications calls this: cached filter results keyed on the old
+# generation can no longer be hit.
+def jobs_changed() -> None:
+    bump_generation(models.JobApplication.__tablename__)
+
+
+# Cache of /applications/filter results (lists of column values), bounded by QUERY_CACHE_MAX_BYTES
+def filter_cache():
+    return get_cache("filter_results")
+
+
+# Cache of job applications by id (column values), kept current by update_job/delete_job
+# and dropped wholesale by bulk writes
+def job_cache():
+    return get_cache("jobs")
+
+
+# Served from the entity cache when possible. A cache hit is a detached copy of the row:
+# read it, don't modify it (writes go through update_job).
+# With `fields` (a sparse fieldset) a cache miss reads only those columns plus id and version (for the
+# ETag) into a Row, which isn't cached: the entity cache only holds whole rows.
+async def get_job_app_by_id(db: AsyncSession, job_id: int, fields: tuple[str, ...] | None = None):
+    cached = job_cache().get(job_id)
+    if cached is not None:
+        return models.JobApplication(**cached)
+
+    if fields is not None:
+        query = select(*job_columns(fields, "id", "version")).where(models.JobApplication.id == job_id)
+        row = (await db.execute(query)).one_or_none()
+        read_logger.info("🔎 Fetched job ID: %s (fields: %s)", job_id, ",".join(fields))
+        if row is None:
+            raise JobApplicationNotFoundException(job_id)
+        return row
+
+    token = job_cache().write_token()
     job = await fetch_one(db, select(models.JobApplication).where(models.JobApplication.id == job_id))
-    logger.info(f"🔎 Fetched job ID: {job_id}")
+    read_logger.info("🔎 Fetched job ID: %s", job_id)
     if not job:
         raise JobApplicationNotFoundException(job_id)
+    # not over a newer version a write stored (or a delete dropped) while the SELECT ran
+    job_cache().fill(job_id, snapshot(job), token, version_field="version")
     return job
 
 
+# Many applications by id: (column values of the ones found, ids that don't exist), both in the order
+# asked for, repeats dropped. Cached applications come from the entity cache, the rest are read with
+# IN queries and cached in turn.
+async def get_job_apps_by_ids(db: AsyncSession, ids: Iterable[int]) -> tuple[list[dict], list[int]]:
+    ids = unique_ids(ids)
+    found = {}
+    for job_id in ids:
+        cached = job_cache().get(job_id)
+        if cached is not None:
+            found[job_id] = cached
+
+    token = job_cache().write_token()
+    fetched = await fetch_by_ids(db, JOB_COLUMNS, models.JobApplication.id, [i for i in ids if i not in found])
+    for job_id, data in fetched.items():
+        job_cache().fill(job_id, data, token, version_field="version")
+    found.update(fetched)
+
+    read_logger.info("📚 Fetched %s of %s jobs by id (%s from the database)", len(found), len(ids), len(fetched))
+    return [found[i] for i in ids if i in found], [i for i in ids if i not in found]
+
+
+# Just the row version (for ETag checks) - no ORM object is built. None if the job doesn't exist.
+async def get_job_version(db: AsyncSession, job_id: int) -> int | None:
+    result = await db.execute(select(models.JobApplication.version).where(models.JobApplication.id == job_id))
+    return result.scalar_one_or_none()
+
+
 async def fetch_one(db: AsyncSession, stmt) -> models.JobApplication | None:
     """
         Executes the provided SQLAlchemy select() statement and returns a single ORM object or None.
@@ -0,0 +1,115 @@
+# Keyset (cursor) pagination helpers shared by the CRUD modules.
+#
+# Instead of `.offset(skip)` (which makes the DB scan and throw away every earlier row),
+# a page remembers the sort value + id of its last row, and the next page starts
+# right after it: `WHERE (sort_col, id) > (last_value, last_id)`.
+# The cursor handed to clients is an opaque base64 string of that position.
+
+import base64
+import json
+from datetime import date, datetime
+from enum import Enum
+
+from sqlalchemy import and_, or_
+
+from app.exceptions import InvalidCursorException
+
+
+def encode_cursor(sort_by: str, order: str, value, last_id) -> str:
+    """
+        Packs the position of the last row of a page into an opaque, URL-safe string.
+    """
+    if isinstance(value, Enum):
+        value = value.value
+    elif isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    payload = {"s": sort_by, "o": order, "v": value, "id": last_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> tuple:
+    """
+        Unpacks a cursor made by encode_cursor() and returns (value, last_id).
+        A cursor is only valid for the same sort column and direction it was created with.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort_by or payload["o"] != order:
+            raise InvalidCursorException("cursor does not match the requested sort order")
+        return payload["v"], payload["id"]
+    except InvalidCursorException:
+        raise
+    except Exception:
+        raise InvalidCursorException("cursor is malformed")
+
+
+def order_by_keyset(column, id_column, order: str = "asc") -> list:
+    """
+        ORDER BY clause matching keyset_predicate(): sort column, then id as a tiebreaker.
+        NULLs are pinned (first for asc, last for desc) so every dialect pages the same way.
+    """
+    if column is id_column:
+        return [id_column.desc() if order == "desc" else id_column.asc()]
+    if order == "desc":
+        return [column.desc().nulls_last(), id_column.desc()]
+    return [column.asc().nulls_first(), id_column.asc()]
+
+
+def _coerce(column, value):
+    # Cursor values travel as JSON, turn them back into what the column type expects
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type in (date, datetime):
+        return python_type.fromisoformat(value)
+    if issubclass(python_type, Enum):
+        return python_type(value)
+    return value
+
+
+def keyset_predicate(column, id_column, value, last_id, order: str = "asc"):
+    """
+        WHERE clause selecting the rows that come strictly after (value, last_id)
+        in the ordering produced by order_by_keyset().
+    """
+    try:
+        value = _coerce(column, value)
+    except (TypeError, ValueError):
+        raise InvalidCursorException("cursor value does not match the sort column")
+
+    if column is id_column:
+        return id_column < last_id if order == "desc" else id_column > last_id
+
+    if order == "desc":
+        # ... value DESC, id DESC, then the NULLs
+        if value is None:
+            return and_(column.is_(None), id_column < last_id)
+        return or_(
+            column < value,
+            and_(column == value, id_column < last_id),
+            column.is_(None),
+        )
+
+    # NULLs first, then value ASC, id ASC
+    if value is None:
+        return or_(
+            and_(column.is_(None), id_column > last_id),
+            column.is_not(None),
+        )
+    return or_(
+        column > value,
+        and_(column == value, id_column > last_id),
+    )
+
+
+def next_cursor(items, limit: int, sort_attr: str, sort_by: str, order: str = "asc") -> str | None:
+    """
+        Cursor for the page after `items`, or None when this was the last page.
+        `sort_attr` is the attribute holding the sort value on each row.
+    """
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(sort_by, order, getattr(last, sort_attr), last.id)
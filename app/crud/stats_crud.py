@@ -0,0 +1,232 @@
+# Incrementally maintained job application counters (GET /applications/stats and /applications/timeseries).
+#
+# Every job write turns the rows it adds/removes into +/- deltas and applies them before its commit,
+# so the counters move in the same transaction as the rows. Deltas are keyed either
+#   (dimension, key)       -> job_application_stats, e.g. ("status", "applied"), ("month", "2025-04")
+#   (metric, day, key)     -> job_application_rollups, e.g. ("status", date(2025, 4, 1), "applied")
+# Reading the stats is then a scan of a few hundred counter rows instead of a GROUP BY over every job.
+# Writes that bypass the job CRUD functions leave the counters behind: rebuild_stats() / backfill_rollups()
+# (or `python -m app.cli rebuild-stats` / `backfill-rollups`) recompute them from job_applications.
+from collections import Counter
+from datetime import date, timedelta
+from typing import Iterable, Mapping
+
+from sqlalchemy import Connection, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.schemas.job_schemas as schemas
+from app.models.job_models import JobApplication
+from app.models.stats_models import JobApplicationRollup, JobApplicationStat
+
+# Columns a counter key is derived from - writes that touch none of them leave the counters alone
+STAT_COLUMNS = ("company", "status", "applied_date")
+
+_DIMENSION_FIELDS = {"status": "by_status", "company": "by_company", "month": "by_month"}
+
+
+def status_key(status) -> str:
+    if status is None:
+        return "none"
+    return getattr(status, "value", status)
+
+
+def month_key(applied_date: date) -> str:
+    return f"{applied_date.year:04d}-{applied_date.month:02d}"
+
+
+def stat_keys(row: Mapping) -> list[tuple]:
+    """The counters one job application counts towards."""
+    status = status_key(row.get("status"))
+    return [
+        ("status", status),
+        ("company", row["company"]),
+        ("month", month_key(row["applied_date"])),
+        ("status", row["applied_date"], status),
+    ]
+
+
+def stat_deltas(added: Iterable[Mapping] = (), removed: Iterable[Mapping] = ()) -> Counter:
+    """
+        Counter changes for rows going in and out of job_applications.
+        Each row is a mapping with the STAT_COLUMNS, plus an optional "count" when it stands for a group of rows.
+    """
+    deltas = Counter()
+    for rows, sign in ((added, 1), (removed, -1)):
+        for row in rows:
+            weight = row.get("count", 1) * sign
+            for key in stat_keys(row):
+                deltas[key] += weight
+    return Counter({key: delta for key, delta in deltas.items() if delta})
+
+
+def transition_deltas(changes: Iterable[tuple[Mapping, Mapping]]) -> Counter:
+    """Status transitions for (before, after) row pairs, counted on the day the application was sent."""
+    deltas = Counter()
+    for before, after in changes:
+        old, new = status_key(before.get("status")), status_key(after.get("status"))
+        if old != new:
+            deltas[("transition", after["applied_date"], f"{old}>{new}")] += before.get("count", 1)
+    return deltas
+
+
+def _upsert(dialect_name: str, table):
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=list(table.primary_key.columns),
+        set_={"count": table.c.count + stmt.excluded["count"]},
+    )
+
+
+def _counter_rows(deltas: Counter) -> dict:
+    """Splits deltas into parameter rows per counter table."""
+    rows = {JobApplicationStat.__table__: [], JobApplicationRollup.__table__: []}
+    for key, count in deltas.items():
+        if len(key) == 2:
+            rows[JobApplicationStat.__table__].append({"dimension": key[0], "key": key[1], "count": count})
+        else:
+            rows[JobApplicationRollup.__table__].append({"metric": key[0], "day": key[1], "key": key[2], "count": count})
+    return rows
+
+
+async def apply_deltas(db: AsyncSession, deltas: Counter) -> None:
+    """Adds `deltas` to the counters inside the caller's transaction (the caller commits)."""
+    for table, params in _counter_rows(deltas).items():
+        if not params:
+            continue
+        stmt = _upsert(db.get_bind().dialect.name, table)
+        if stmt is not None:
+            await db.execute(stmt, params)
+            continue
+
+        # No upsert on this dialect: bump existing counters, insert the missing ones
+        for param in params:
+            result = await db.execute(
+                update(table)
+                .where(*(column == param[column.name] for column in table.primary_key.columns))
+                .values(count=table.c.count + param["count"])
+            )
+            if result.rowcount == 0:
+                await db.execute(insert(table).values(**param))
+
+
+# One pass over job_applications, grouped finely enough to fold into every counter
+def _live_counts_query(*conditions):
+    return (
+        select(JobApplication.company, JobApplication.status, JobApplication.applied_date, func.count().label("count"))
+        .where(*conditions)
+        .group_by(JobApplication.company, JobApplication.status, JobApplication.applied_date)
+    )
+
+
+async def count_live(db: AsyncSession) -> Counter:
+    """The counters computed on the fly with GROUP BY over job_applications (what the summary tables replace)."""
+    return stat_deltas((await db.execute(_live_counts_query())).mappings())
+
+
+def rebuild_stats(connection: Connection) -> int:
+    """Recomputes the /applications/stats counters from job_applications. Returns the number of applications counted."""
+    counts = stat_deltas(connection.execute(_live_counts_query()).mappings())
+    params = _counter_rows(counts)[JobApplicationStat.__table__]
+    connection.execute(delete(JobApplicationStat))
+    if params:
+        connection.execute(insert(JobApplicationStat), params)
+    return sum(param["count"] for param in params if param["dimension"] == "status")
+
+
+def backfill_rollups(connection: Connection, date_from: date | None = None, date_to: date | None = None) -> int:
+    """
+        Recomputes the daily status rollups for applications applied in [date_from, date_to] (both optional).
+        Recorded transitions are kept. Returns the number of applications counted.
+    """
+    job_conditions, day_conditions = [], []
+    if date_from:
+        job_conditions.append(JobApplication.applied_date >= date_from)
+        day_conditions.append(JobApplicationRollup.day >= date_from)
+    if date_to:
+        job_conditions.append(JobApplication.applied_date <= date_to)
+        day_conditions.append(JobApplicationRollup.day <= date_to)
+    counts = stat_deltas(connection.execute(_live_counts_query(*job_conditions)).mappings())
+
+    params = _counter_rows(counts)[JobApplicationRollup.__table__]
+    connection.execute(delete(JobApplicationRollup).where(JobApplicationRollup.metric == "status", *day_conditions))
+    if params:
+        connection.execute(insert(JobApplicationRollup), params)
+    return sum(param["count"] for param in params)
+
+
+def to_stats(counts: Iterable[tuple[str, str, int]]) -> schemas.JobAppStats:
+    grouped = {field: {} for field in _DIMENSION_FIELDS.values()}
+    for dimension, key, count in counts:
+        if count > 0 and dimension in _DIMENSION_FIELDS:
+            grouped[_DIMENSION_FIELDS[dimension]][key] = count
+    return schemas.JobAppStats(total=sum(grouped["by_status"].values()), **grouped)
+
+
+async def get_stats(db: AsyncSession) -> schemas.JobAppStats:
+    result = await db.execute(
+        select(JobApplicationStat.dimension, JobApplicationStat.key, JobApplicationStat.count)
+        .order_by(JobApplicationStat.dimension, JobApplicationStat.key)
+    )
+    return to_stats(result.tuples())
+
+
+async def count_by_status(db: AsyncSession, status: str | None = None) -> int:
+    """Number of applications with `status` (all of them when None), read from the status counters."""
+    query = select(func.coalesce(func.sum(JobApplicationStat.count), 0)).where(JobApplicationStat.dimension == "status")
+    if status is not None:
+        query = query.where(JobApplicationStat.key == status_key(status))
+    return await db.scalar(query)
+
+
+async def count_from_rollups(
+        db: AsyncSession, status: str | None = None, date_from: date | None = None, date_to: date | None = None
+) -> int:
+    """Number of applications applied in [date_from, date_to] (both optional) with `status`, from the daily rollups."""
+    query = select(func.coalesce(func.sum(JobApplicationRollup.count), 0)).where(JobApplicationRollup.metric == "status")
+    if status is not None:
+        query = query.where(JobApplicationRollup.key == status_key(status))
+    if date_from:
+        query = query.where(JobApplicationRollup.day >= date_from)
+    if date_to:
+        query = query.where(JobApplicationRollup.day <= date_to)
+    return await db.scalar(query)
+
+
+# First day of the bucket a day falls in (weeks start on Monday)
+BUCKET_STARTS = {
+    "day": lambda day: day,
+    "week": lambda day: day - timedelta(days=day.weekday()),
+    "month": lambda day: day.replace(day=1),
+}
+
+
+async def get_timeseries(
+        db: AsyncSession, bucket: str = "day", date_from: date | None = None, date_to: date | None = None
+) -> schemas.JobAppTimeseries:
+    """Application counts and status transitions per bucket, summed from the daily rollups (empty buckets are left out)."""
+    query = select(JobApplicationRollup.day, JobApplicationRollup.metric, JobApplicationRollup.key,
+                   JobApplicationRollup.count).where(JobApplicationRollup.count != 0)
+    if date_from:
+        query = query.where(JobApplicationRollup.day >= date_from)
+    if date_to:
+        query = query.where(JobApplicationRollup.day <= date_to)
+
+    bucket_start = BUCKET_STARTS[bucket]
+    buckets: dict[date, schemas.TimeseriesBucket] = {}
+    for day, metric, key, count in (await db.execute(query)).tuples():
+        start = bucket_start(day)
+        entry = buckets.get(start)
+        if entry is None:
+            entry = buckets[start] = schemas.TimeseriesBucket(start=start)
+        if metric == "status":
+            entry.applications += count
+            entry.by_status[key] = entry.by_status.get(key, 0) + count
+        else:
+            entry.transitions[key] = entry.transitions.get(key, 0) + count
+    return schemas.JobAppTimeseries(bucket=bucket, buckets=[buckets[start] for start in sorted(buckets)])
@@ -1,23 +1,27 @@
 from datetime import datetime
+from typing import Iterable
 from uuid import uuid4
 
-from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import app.models.user_models as models
 import app.schemas.user_schemas as schemas
-from app.core.logger import logger
+from app.core.cache import get_cache, snapshot
+from app.core.logger import logger, read_logger
+from app.core.security import hash_password_async
+from app.crud.batch import fetch_by_ids, unique_ids
+from app.crud.pagination import decode_cursor, keyset_predicate, order_by_keyset
+from app.db.database import supports_returning
 from app.exceptions import AppBaseException, UserNotFoundException, DuplicateUsernameException, DuplicateEmailException
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
+# One INSERT ... RETURNING where the dialect has it, so there's no refresh SELECT after the commit
 async def create_user(db: AsyncSession, user: schemas.UserCreate):
     try:
-        hashed_pw = pwd_context.hash(user.password)
-        db_user = models.User(
+        hashed_pw = await hash_password_async(user.password)
+        values = dict(
             id=str(uuid4()),
             email=user.email,
             username=user.username,
@@ -27,64 +31,156 @@ async def create_user(db: AsyncSession, user: schemas.UserCreate):
             created_at=datetime.now(),
             last_login=None,
         )
-        db.add(db_user)
-        await db.commit()
-        await db.refresh(db_user)
-        logger.info(f"✅ Created user: {db_user.username} with ID {db_user.id}")
+        if supports_returning(db, "insert"):
+            db_user = await db.scalar(insert(models.User).values(**values).returning(models.User))
+            await db.commit()
+        else:
+            db_user = models.User(**values)
+            db.add(db_user)
+            await db.commit()
+            await db.refresh(db_user)
+        logger.info("✅ Created user: %s with ID %s", db_user.username, db_user.id)
 
     except IntegrityError as e:
         await db.rollback()
         # Peek into error message string to figure out which unique constraint failed
         err_msg = str(e.orig).lower()
         if "username" in err_msg:
-            raise DuplicateUsernameException(db_user.username)
+            raise DuplicateUsernameException(user.username)
         elif "email" in err_msg:
-            raise DuplicateEmailException(db_user.email)
+            raise DuplicateEmailException(user.email)
         else:
             raise AppBaseException(status_code=409, detail="Database integrity error.")
     return db_user
 
 
-async def get_user_by_id(db: AsyncSession, user_id: str):
+# Cache of users by ("id", id) and ("username", username), both holding the user's column values.
+# update_user writes through, delete_user drops both keys.
+def user_cache():
+    return get_cache("users")
+
+
+def _cache_user(user: models.User) -> None:
+    data = snapshot(user)
+    user_cache().set(("id", data["id"]), data)
+    user_cache().set(("username", data["username"]), data)
+
+
+# Caches a row read from the database, unless a write in this process touched either of its keys since
+# `token` (user_cache().write_token()) was taken - the read may then be older than the write.
+def _fill_user_cache(data: dict, token: int) -> None:
+    keys = (("id", data["id"]), ("username", data["username"]))
+    if any(user_cache().changed_since(key, token) for key in keys):
+        return
+    for key in keys:
+        user_cache().fill(key, data, token)
+
+
+def _forget_user(user_id: str, username: str) -> None:
+    user_cache().delete(("id", user_id))
+    user_cache().delete(("username", username))
+
+
+# A cache hit is a detached copy of the row: read it, don't modify it.
+# Pass use_cache=False to get the session-attached row you're about to write.
+async def get_user_by_id(db: AsyncSession, user_id: str, use_cache: bool = True):
+    if use_cache:
+        cached = user_cache().get(("id", user_id))
+        if cached is not None:
+            return models.User(**cached)
+
+    token = user_cache().write_token()
     user = await fetch_user(db, select(models.User).where(models.User.id == user_id))
     if not user:
         # invoking custom exception
         raise UserNotFoundException(str(user_id))
+    _fill_user_cache(snapshot(user), token)
     return user
 
 
+# Many users by id: (column values of the ones found, ids that don't exist), both in the order asked for,
+# repeats dropped. Cached users come from the entity cache, the rest are read with IN queries and cached.
+async def get_users_by_ids(db: AsyncSession, user_ids: Iterable[str]) -> tuple[list[dict], list[str]]:
+    user_ids = unique_ids(user_ids)
+    found = {}
+    for user_id in user_ids:
+        cached = user_cache().get(("id", user_id))
+        if cached is not None:
+            found[user_id] = cached
+
+    token = user_cache().write_token()
+    fetched = await fetch_by_ids(
+        db, models.User.__table__.columns, models.User.id, [i for i in user_ids if i not in found]
+    )
+    for data in fetched.values():
+        _fill_user_cache(data, token)
+    found.update(fetched)
+
+    read_logger.info(
+        "📚 Fetched %s of %s users by id (%s from the database)", len(found), len(user_ids), len(fetched)
+    )
+    return [found[i] for i in user_ids if i in found], [i for i in user_ids if i not in found]
+
+
+# A single DELETE ... RETURNING where the dialect has it (the returned row names the cache keys to drop)
 async def delete_user(db: AsyncSession, user_id: str):
     try:
-        user = await fetch_user(db, select(models.User).where(models.User.id == user_id))
+        if supports_returning(db, "delete"):
+            user = await db.scalar(
+                delete(models.User).where(models.User.id == user_id).returning(models.User)
+                .execution_options(populate_existing=True)
+            )
+        else:
+            user = await fetch_user(db, select(models.User).where(models.User.id == user_id))
+            if user:
+                await db.delete(user)
         if not user:
-            raise UserNotFoundException
-        await db.delete(user)
+            raise UserNotFoundException(str(user_id))
         await db.commit()
-        logger.info(f"🗑️ Deleted user with ID {user_id}")
+        _forget_user(user.id, user.username)
+        logger.info("🗑️ Deleted user with ID %s", user_id)
         return user
     except Exception as e:
         await db.rollback()
-        logger.error(f"Error deleting user {user_id}: {e}")
+        logger.error("Error deleting user %s: %s", user_id, e)
         raise  # re-raise original error so you don't mask it
 
 
+# Where the dialect has UPDATE ... RETURNING the row is written and read back in one statement.
+# The old row is only read first when the username changes, to drop its old cache key.
 async def update_user(db: AsyncSession, user_id, updated_data: schemas.UserUpdate):
     try:
-        #  Fetch the user entry from the database
-        user = await get_user_by_id(db, user_id)
         update_fields = updated_data.model_dump(exclude_unset=True)
 
-        #  Update only the fields that were actually passed in the request
-        for key, value in update_fields.items():
-            setattr(user, key, value)
-        #  Save and refresh the changes in the DB
+        #  A new password is stored as its hash, never as plain text
+        if "password" in update_fields:
+            password = update_fields.pop("password")
+            if password:
+                update_fields["hashed_password"] = await hash_password_async(password)
+
+        if not update_fields or not supports_returning(db, "update"):
+            return await _update_user_orm(db, user_id, update_fields)
+
+        old_username = None
+        if "username" in update_fields:
+            old_username = (await get_user_by_id(db, user_id, use_cache=False)).username
+        user = await db.scalar(
+            update(models.User).where(models.User.id == user_id).values(**update_fields).returning(models.User)
+            # an instance already in the session takes the returned values
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        if user is None:
+            raise UserNotFoundException(str(user_id))
         await db.commit()
-        await db.refresh(user)
-        #  Log what got updated
-        logger.info(
-            f"✏️ Updated user with ID {user_id} with fields: {list(update_fields.keys())}")
-        #  Return the fully updated model
+        #  Write-through, and drop the old username key if it changed
+        if old_username is not None:
+            _forget_user(user.id, old_username)
+        _cache_user(user)
+        logger.info("✏️ Updated user with ID %s with fields: %s", user_id, list(update_fields.keys()))
         return user
+    except UserNotFoundException:
+        await db.rollback()
+        raise
     except IntegrityError:
         await db.rollback()
         raise AppBaseException(status_code=409, detail="Database integrity error during update.")
@@ -93,19 +189,55 @@ async def update_user(db: AsyncSession, user_id, updated_data: schemas.UserUpdat
         raise AppBaseException(status_code=500, detail="Unexpected error during update.")
 
 
+# update_user on dialects without UPDATE ... RETURNING (and for empty updates): load, modify, commit, refresh
+async def _update_user_orm(db: AsyncSession, user_id, update_fields: dict):
+    #  Fetch the user entry from the database
+    user = await get_user_by_id(db, user_id, use_cache=False)
+    old_username = user.username
+
+    #  Update only the fields that were actually passed in the request
+    for key, value in update_fields.items():
+        setattr(user, key, value)
+    #  Save and refresh the changes in the DB
+    await db.commit()
+    await db.refresh(user)
+    #  Write-through, and drop the old username key if it changed
+    _forget_user(user.id, old_username)
+    _cache_user(user)
+    #  Log what got updated
+    logger.info("✏️ Updated user with ID %s with fields: %s", user_id, list(update_fields.keys()))
+    #  Return the fully updated model
+    return user
+
+
 async def get_user_by_username(db: AsyncSession, username: str):
+    cached = user_cache().get(("username", username))
+    if cached is not None:
+        return models.User(**cached)
+
+    token = user_cache().write_token()
     user = await fetch_user(db, select(models.User).where(models.User.username == username))
     if not user:
         raise UserNotFoundException(username)
+    _fill_user_cache(snapshot(user), token)
     return user
 
 
-async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
+# List users ordered by id. Pass the `cursor` from the previous page to page by keyset,
+# `skip` is kept for old clients.
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str | None = None):
+    id_column = models.User.id
+    query = select(models.User).order_by(*order_by_keyset(id_column, id_column))
+
+    if cursor:
+        _, last_id = decode_cursor(cursor, "id", "asc")
+        query = query.where(keyset_predicate(id_column, id_column, last_id, last_id))
+    else:
+        query = query.offset(skip)
+
     try:
-        result = await db.execute(
-            select(models.User).offset(skip).limit(limit)
-        )
-        logger.info(f"📄 Fetched users: skip={skip}, limit={limit}")
+        result = await db.execute(query.limit(limit))
+        read_logger.info("📄 Fetched users: skip=%s, limit=%s, cursor=%s", skip, limit, cursor)
         return result.scalars().all()
     except Exception:
         raise AppBaseException(status_code=500, detail="Internal server error while fetching users.")
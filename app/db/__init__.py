@@ -1,7 +1,16 @@
 from .base import Base
-from .database import SessionLocal, engine
+from . import database
+from .database import get_engine, get_async_engine, session_factory, async_session_factory
+
+__all__ = ["Base", "get_engine", "get_async_engine", "session_factory", "async_session_factory"]
+
+
+def __getattr__(name: str):
+    # `from app.db import engine` / `SessionLocal` still work, the engine is only built when asked for
+    if name in ("engine", "SessionLocal"):
+        return getattr(database, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = ["Base", "SessionLocal", "engine"]
 
 # Import all the models to make sure they're registered with Base
-from app.models import job_models
\ No newline at end of file
+from app.models import job_models
@@ -1,43 +1,164 @@
 # Connects to the DB and manages sessions.
-import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-# Load environment variables from .env
-load_dotenv()
-
-# Grab the DB URL from the environment
-SQLALCHEMY_DATABASE_URL = os.getenv("DB_URL")
-
-# Derive your sync & async URLs - declare as constants
-SYNC_DB_URL = SQLALCHEMY_DATABASE_URL
-ASYNC_DB_URL = SYNC_DB_URL.replace("sqlite://", "sqlite+aiosqlite://")
-
-# Create the engine — with special SQLite handling
-engine = create_engine(
-    SYNC_DB_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in SYNC_DB_URL else {}
-)
-
-# Create the async engine
-async_engine = create_async_engine(
-    ASYNC_DB_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in ASYNC_DB_URL else {},
-)
-
-# Session makers
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine)
-
-# AsyncSession factory
-AsyncSessionLocal = sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-    autocommit=False,
-)
+from app.core.config import Settings, get_settings
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
+from app.db.sqlite import install_sqlite_pragmas, sqlite_pragmas
+
+
+# Whether this session's dialect can return rows from an "insert", "update" or "delete"
+def supports_returning(db: AsyncSession, statement: str) -> bool:
+    return getattr(db.get_bind().dialect, f"{statement}_returning", False)
+
+
+def is_memory_sqlite(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and (
+            url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+
+
+def _statement_timeout_args(url: str, timeout_ms: int) -> dict:
+    # How each driver sets a per-session statement timeout when the connection is opened
+    url = make_url(url)
+    backend, driver = url.get_backend_name(), url.get_driver_name()
+    if backend == "postgresql" and driver == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(timeout_ms)}}
+    if backend == "postgresql":
+        return {"options": f"-c statement_timeout={timeout_ms}"}
+    if backend in ("mysql", "mariadb"):
+        return {"init_command": f"SET SESSION max_execution_time={timeout_ms}"}
+    return {}  # SQLite has no server to time statements out
+
+
+def engine_options(url: str, settings: Settings, is_async: bool = False) -> dict:
+    """
+        create_engine()/create_async_engine() keyword arguments for `url`, built from the DB_* settings.
+    """
+    connect_args = dict(settings.db_connect_args)
+    if make_url(url).get_backend_name() == "sqlite":
+        # sessions may be used from another thread than the one that opened the connection
+        connect_args.setdefault("check_same_thread", False)
+    if settings.db_statement_timeout_ms:
+        # explicit DB_CONNECT_ARGS win over the derived timeout arguments
+        for key, value in _statement_timeout_args(url, settings.db_statement_timeout_ms).items():
+            connect_args.setdefault(key, value)
+
+    options = {
+        "echo": settings.db_echo,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+    if is_memory_sqlite(url):
+        return options  # one shared connection, there's no pool to size
+    options.update({
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    })
+    return options
+
+
+# Engines and session factories are created on first use (or by the app's lifespan handler),
+# never at import time: importing the app costs no dotenv read and no connection pool.
+_engine: Engine | None = None
+_async_engine: AsyncEngine | None = None
+_session_factory: sessionmaker | None = None
+_async_session_factory: sessionmaker | None = None
+
+
+def async_url(url: str) -> str:
+    return url.replace("sqlite://", "sqlite+aiosqlite://")
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        _engine = create_engine(settings.db_url, **engine_options(settings.db_url, settings))
+        if _engine.dialect.name == "sqlite":
+            install_sqlite_pragmas(_engine, sqlite_pragmas(settings))
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        settings = get_settings()
+        url = async_url(settings.db_url)
+        _async_engine = create_async_engine(url, **engine_options(url, settings, is_async=True))
+        if _async_engine.dialect.name == "sqlite":
+            install_sqlite_pragmas(_async_engine.sync_engine, sqlite_pragmas(settings))
+    return _async_engine
+
+
+def session_factory() -> sessionmaker:
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=get_engine())
+    return _session_factory
+
+
+def async_session_factory() -> sessionmaker:
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = sessionmaker(
+            bind=get_async_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+            autocommit=False,
+        )
+    return _async_session_factory
+
+
+def created_engines() -> list[Engine | AsyncEngine]:
+    """The engines that exist so far (without creating any)."""
+    return [engine for engine in (_engine, _async_engine) if engine is not None]
+
+
+async def warm_up(connections: int) -> None:
+    """Opens `connections` pooled connections of the async engine up front, so first requests don't pay for them."""
+    engine = get_async_engine()
+
+    async def ping():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(connections)))
+
+
+async def dispose_engines() -> None:
+    """Closes every pooled connection and forgets the engines (they're re-created on next use)."""
+    global _engine, _async_engine, _session_factory, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+    _engine = _async_engine = _session_factory = _async_session_factory = None
+
+
+# The old module-level names keep working, created on first access:
+# `database.engine`, `database.async_engine`, `database.SessionLocal`, `database.AsyncSessionLocal`
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "async_engine": get_async_engine,
+    "SessionLocal": session_factory,
+    "AsyncSessionLocal": async_session_factory,
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,81 @@
+# Connection pools that measure themselves.
+#
+# TimedQueuePool / TimedAsyncAdaptedQueuePool are the default SQLAlchemy pools plus counters for how
+# long callers wait to check a connection out, how often they time out, and how saturated the pool is,
+# so pool_size / max_overflow can be tuned from numbers (see GET /db/pool/stats).
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_total += waited
+        if waited > self.wait_seconds_max:
+            self.wait_seconds_max = waited
+
+
+class _TimedPoolMixin:
+    # _do_get() is where a QueuePool blocks for a free connection (or opens an overflow one)
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+    @property
+    def metrics(self) -> PoolMetrics:
+        # pools are re-created by dispose()/recreate(), keep one set of counters per pool object
+        metrics = self.__dict__.get("_metrics")
+        if metrics is None:
+            metrics = self.__dict__["_metrics"] = PoolMetrics()
+        return metrics
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(pool: Pool) -> dict:
+    """Current occupancy of a pool, plus checkout wait counters for the timed pools."""
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "saturation": round(checked_out / capacity, 4) if capacity else 0.0,
+        })
+    if isinstance(pool, _TimedPoolMixin):
+        metrics = pool.metrics
+        stats.update({
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "wait_seconds_total": round(metrics.wait_seconds_total, 6),
+            "wait_seconds_max": round(metrics.wait_seconds_max, 6),
+            "wait_seconds_avg": round(metrics.wait_seconds_total / metrics.checkouts, 6) if metrics.checkouts else 0.0,
+        })
+    return stats
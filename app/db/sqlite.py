@@ -0,0 +1,67 @@
+# SQLite performance profiles: PRAGMAs applied to every new connection of an engine.
+#
+# SQLite's defaults (rollback journal, synchronous=FULL, 2 MB page cache) make every write lock
+# the whole file against readers. The "wal" profile switches to write-ahead logging, where readers
+# never block the writer and vice versa, and waits on locks instead of failing with "database is locked".
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import Settings
+
+# PRAGMA name -> value, in the order they're applied (busy_timeout first so the others wait for locks)
+SQLITE_PROFILES: dict[str, dict[str, str | int]] = {
+    # SQLite's own defaults, nothing is applied
+    "none": {},
+    "wal": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        # in WAL mode NORMAL is still corruption-safe, a power cut can only lose the last commits
+        "synchronous": "NORMAL",
+        "cache_size": -64_000,  # negative = KiB, i.e. 64 MB of page cache per connection
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    # "wal" without fsync at all: for bulk loads and benchmarks, an OS crash can lose recent commits
+    "wal-fast": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def sqlite_pragmas(settings: Settings) -> dict[str, str | int]:
+    """The SQLITE_PROFILE pragmas with the individual SQLITE_* overrides applied."""
+    if settings.sqlite_profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {settings.sqlite_profile!r}, expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[settings.sqlite_profile])
+    overrides = {
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "cache_size": -settings.sqlite_cache_size_kib if settings.sqlite_cache_size_kib is not None else None,
+        "mmap_size": settings.sqlite_mmap_size,
+        "temp_store": settings.sqlite_temp_store,
+    }
+    for name, value in overrides.items():
+        if value is not None:
+            pragmas[name] = value
+    return pragmas
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: dict[str, str | int]) -> None:
+    """Runs `pragmas` on every connection `engine` opens (pass async_engine.sync_engine for async engines)."""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
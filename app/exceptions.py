@@ -18,7 +18,7 @@ class AppBaseException(Exception):
             self.status_code = status_code
         if detail:
             self.detail = detail
-        logger.error(f"🚨 {self.__class__.__name__}: {self.detail}")  # Consistent message
+        logger.error("🚨 %s: %s", self.__class__.__name__, self.detail)  # Consistent message
 
 
 #  Domain-Specific Exceptions
@@ -54,11 +54,59 @@ class UserNotFoundException(AppBaseException):
         )
 
 
+class ImportJobNotFoundException(AppBaseException):
+    def __init__(self, import_id: str):
+        super().__init__(
+            status_code=404,
+            detail=f"Import '{import_id}' not found 📭"
+        )
+
+
+class PasswordHashingBusyException(AppBaseException):
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="Too many password operations in progress, try again shortly ⏳"
+        )
+
+
+class InvalidCursorException(AppBaseException):
+    def __init__(self, reason: str):
+        super().__init__(
+            status_code=400,
+            detail=f"Invalid pagination cursor: {reason} 🧭"
+        )
+
+
+class UnknownFieldsException(AppBaseException):
+    def __init__(self, fields: list[str], allowed: tuple[str, ...]):
+        super().__init__(
+            status_code=400,
+            detail=f"Unknown fields {', '.join(fields)}, pick from: {', '.join(allowed)} 🧩"
+        )
+
+
+class WriteConflictException(AppBaseException):
+    def __init__(self, reason: str):
+        super().__init__(
+            status_code=409,
+            detail=f"{reason}, try again 🔁"
+        )
+
+
+class QueryBudgetExceeded(AppBaseException):
+    def __init__(self, route: str, statements: int, budget: int):
+        super().__init__(
+            status_code=500,
+            detail=f"{route} ran {statements} SQL statements, over its budget of {budget} 🧮"
+        )
+
+
 # Add more here as needed later (e.g., AuthException, TokenExpiredException, etc.)
 
 # Custom Exception Handlers
 async def generic_app_exception_handler(request: Request, exc: AppBaseException):
-    logger.error(f"🚨 [{request.method}] {request.url} → {exc.__class__.__name__}: {exc.detail}")
+    logger.error("🚨 [%s] %s → %s: %s", request.method, request.url, exc.__class__.__name__, exc.detail)
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail}
@@ -66,7 +114,7 @@ async def generic_app_exception_handler(request: Request, exc: AppBaseException)
 
 
 async def http_exception_handler(request: Request, exc: HTTPException):
-    logger.warning(f"⚠️ HTTPException at [{request.method}] {request.url} → {exc.detail}")
+    logger.warning("⚠️ HTTPException at [%s] %s → %s", request.method, request.url, exc.detail)
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail}
@@ -74,7 +122,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 
 
 async def integrity_error_handler(request: Request, exc: IntegrityError):
-    logger.error(f"🚫 IntegrityError at [{request.method}] {request.url} → {str(exc)}")
+    logger.error("🚫 IntegrityError at [%s] %s → %s", request.method, request.url, exc)
     return JSONResponse(
         status_code=409,
         content={"detail": "Database integrity error. Possibly duplicate or invalid data."}
@@ -82,7 +130,7 @@ async def integrity_error_handler(request: Request, exc: IntegrityError):
 
 
 async def no_result_found_handler(request: Request, exc: NoResultFound):
-    logger.warning(f"🔍 NoResultFound at [{request.method}] {request.url}")
+    logger.warning("🔍 NoResultFound at [%s] %s", request.method, request.url)
     return JSONResponse(
         status_code=404,
         content={"detail": "Requested item not found in the database."}
@@ -90,7 +138,7 @@ async def no_result_found_handler(request: Request, exc: NoResultFound):
 
 
 async def validation_error_handler(request: Request, exc: ValidationError):
-    logger.warning(f"⚠️ ValidationError at [{request.method}] {request.url} → {exc.errors()}")
+    logger.warning("⚠️ ValidationError at [%s] %s → %s", request.method, request.url, exc.errors())
     return JSONResponse(
         status_code=422,
         content={"detail": exc.errors()}
@@ -98,7 +146,7 @@ async def validation_error_handler(request: Request, exc: ValidationError):
 
 
 async def fallback_exception_handler(request: Request, exc: Exception):
-    logger.exception(f"🔥 Unhandled exception at [{request.method}] {request.url} → {str(exc)}")
+    logger.exception("🔥 Unhandled exception at [%s] %s → %s", request.method, request.url, exc)
     return JSONResponse(
         status_code=500,
         content={"detail": f"Unexpected server error: {type(exc).__name__} - {str(exc)}"}
@@ -106,5 +154,5 @@ async def fallback_exception_handler(request: Request, exc: Exception):
 
 
 async def duplicate_field_handler(request: Request, exc: AppBaseException):
-    logger.error(f"Duplicate field error: {exc.detail}")
+    logger.error("Duplicate field error: %s", exc.detail)
     return JSONResponse(status_code=409, content={"detail": exc.detail})
@@ -1,9 +1,14 @@
 # Starts the app. Registers routes.
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.api.routes import job_routes, user_routes
-from app.db import engine
-from app.models import job_models
+from app.api.routes import job_routes, system_routes, user_routes
+from app.core.config import get_settings
+from app.core.logger import configure_logging, stop_logging
+from app.core.metrics import MetricsMiddleware, configure_metrics
+from app.core.security import shutdown_password_pool
+from app.db.database import dispose_engines, warm_up
 
 from sqlalchemy.exc import IntegrityError
 from fastapi.exceptions import RequestValidationError
@@ -19,10 +24,25 @@ from app.exceptions import (
     NoResultFound, no_result_found_handler,
 )
 
-app = FastAPI()
 
-# Create all tables in the DB based on models if they don’t exist.
-job_models.Base.metadata.create_all(bind=engine)
+# Startup starts the logging thread and opens a few pooled DB connections, shutdown closes them
+# (and the password hashing pool) and flushes the log queue.
+# The schema isn't created here: run `python -m app.cli create-schema` or the Alembic migrations.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    configure_logging(settings)
+    configure_metrics(settings)
+    await warm_up(settings.db_pool_warmup)
+    yield
+    await dispose_engines()
+    shutdown_password_pool()
+    stop_logging()
+
+
+app = FastAPI(lifespan=lifespan)
+# Wraps routing and the exception handlers, so handled errors are timed with their real status code
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
@@ -33,6 +53,7 @@ def read_root():
 # Include the job routes under /applications and under /users
 app.include_router(job_routes.router, prefix="/applications", tags=["Applications"])
 app.include_router(user_routes.router, prefix="/users", tags=["Users"])
+app.include_router(system_routes.router, tags=["System"])
 
 # Register custom exception handlers — order matters: specific first
 # duplicate data
@@ -1,7 +1,12 @@
 from .job_models import JobApplication
 from .user_models import User
+from .import_models import ImportJob
+from .stats_models import JobApplicationStat, JobApplicationRollup
 
 __all__ = [
     "JobApplication",
-    "User"
+    "User",
+    "ImportJob",
+    "JobApplicationStat",
+    "JobApplicationRollup",
 ]
\ No newline at end of file
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+
+from app.db import Base
+
+
+# Progress of one streamed import (POST /applications/import).
+# Updated in the same transaction as every chunk of inserted rows, so `rows_processed`
+# is exactly where an interrupted import resumes from.
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(String(36), primary_key=True, index=True)
+    format = Column(String(10), nullable=False)
+    status = Column(String(20), nullable=False, default="running")
+    # data rows (header excluded) handled and committed so far - a resumed upload skips these
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_inserted = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    # first few row errors, [{"index": ..., "errors": [...]}]
+    errors = Column(JSON, nullable=False, default=list)
+    detail = Column(String(500), nullable=True)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
@@ -2,7 +2,7 @@
 # The file is responsible for Object-Relational Mapping -
 # defining how Python classes = database tables.
 
-from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy import Column, Integer, String, Date, Index
 from app.db import Base
 from app.schemas import ApplicationStatus
 from sqlalchemy import Enum as SQLEnum
@@ -20,3 +20,17 @@ class JobApplication(Base):
     applied_date = Column(Date, nullable=False)
     link = Column(String(2048), nullable=True)
     notes = Column(String(500), nullable=True)
+    # Row version, bumped on every update (ORM updates do it via version_id_col, bulk updates by hand).
+    # GET /applications/{id} derives its ETag from it.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Composite index matching the /applications/filter shape "status = ? ORDER BY applied_date, id".
+    # The company filter is a substring match (ILIKE '%...%'), which no B-tree index can serve.
+    __table_args__ = (
+        Index("ix_job_applications_status_applied_date_id", "status", "applied_date", "id"),
+    )
+    __mapper_args__ = {"version_id_col": version}
+
+
+# Registers the full-text index DDL hooks on this table (imported last: app.search needs JobApplication)
+import app.search  # noqa: E402,F401
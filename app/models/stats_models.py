@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Date, String, Integer
+
+from app.db import Base
+
+
+# Precomputed job application counts for GET /applications/stats: one row per
+# (dimension, key), e.g. ("status", "applied"), ("company", "Google"), ("month", "2025-04").
+# Kept current by the job CRUD functions in the same transaction as each write,
+# and recomputed from scratch by `python -m app.cli rebuild-stats`.
+class JobApplicationStat(Base):
+    __tablename__ = "job_application_stats"
+
+    dimension = Column(String(20), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+# Daily rollups for GET /applications/timeseries, keyed by applied_date day:
+#   metric "status":     key = current status, count = applications applied that day with it
+#   metric "transition": key = "<old>><new>", count = status changes of applications applied that day
+# Week/month buckets are summed from the days. Status counts can be backfilled from job_applications
+# (`python -m app.cli backfill-rollups`), transitions are events and only exist from the moment they're recorded.
+class JobApplicationRollup(Base):
+    __tablename__ = "job_application_rollups"
+
+    day = Column(Date, primary_key=True)
+    metric = Column(String(12), primary_key=True)
+    key = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
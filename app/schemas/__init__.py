@@ -1,7 +1,14 @@
-from .job_schemas import JobAppBase, JobAppCreate, JobAppOut, JobAppUpdate, ApplicationStatus
+from .job_schemas import (
+    JobAppBase, JobAppCreate, JobAppOut, JobAppUpdate, ApplicationStatus,
+    BulkItemError, BulkCreatedItem, BulkCreateResult, JobAppFilter, BulkSelector, BulkUpdateRequest, BulkWriteResult,
+    JobAppStats, TimeseriesBucket, JobAppTimeseries,
+)
 from .user_schemas import UserRole
 
 __all__ = [
     "JobAppBase", "JobAppCreate", "JobAppOut",
-    "JobAppUpdate", "ApplicationStatus", "UserRole"
+    "JobAppUpdate", "ApplicationStatus", "UserRole",
+    "BulkItemError", "BulkCreatedItem", "BulkCreateResult", "JobAppFilter", "BulkSelector",
+    "BulkUpdateRequest", "BulkWriteResult", "JobAppStats",
+    "TimeseriesBucket", "JobAppTimeseries",
 ]
@@ -0,0 +1,36 @@
+from datetime import datetime
+from enum import Enum as PyEnum
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.schemas.job_schemas import BulkItemError
+
+
+class ImportFormat(str, PyEnum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ImportStatus(str, PyEnum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+# Progress/result of POST /applications/import, also served by GET /applications/import/{import_id}
+class ImportJobOut(BaseModel):
+    id: str
+    format: ImportFormat
+    status: ImportStatus
+    rows_processed: int
+    rows_inserted: int
+    rows_failed: int
+    errors: list[BulkItemError]
+    detail: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {
+        "from_attributes": True
+    }
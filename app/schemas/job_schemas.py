@@ -3,11 +3,14 @@
 # this file tells FastAPI how data should
 # be shaped for requests (input) and responses (output).
 
-from pydantic import BaseModel, AnyUrl, Field
+from pydantic import BaseModel, AnyUrl, ConfigDict, Field, create_model
 from datetime import date
+from functools import lru_cache
 from typing import Optional
 from enum import Enum as PyEnum
 
+from app.exceptions import UnknownFieldsException
+
 
 class ApplicationStatus(str, PyEnum):
     APPLIED = "applied"
@@ -43,6 +46,25 @@ class JobAppOut(JobAppBase):
     }
 
 
+# Sparse fieldsets: `?fields=id,company,status` asks for just those JobAppOut fields.
+# Returns them in JobAppOut's order (so equal sets share one model and one cache key), None for all fields.
+def parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested.difference(JobAppOut.model_fields))
+    if unknown:
+        raise UnknownFieldsException(unknown, tuple(JobAppOut.model_fields))
+    return tuple(name for name in JobAppOut.model_fields if name in requested) or None
+
+
+# The response model of a sparse fieldset: JobAppOut cut down to `fields`, built once per field set
+@lru_cache
+def job_app_fields_model(fields: tuple[str, ...]) -> type[BaseModel]:
+    definitions = {name: (info.annotation, info) for name, info in JobAppOut.model_fields.items() if name in fields}
+    return create_model(f"JobAppOut[{','.join(fields)}]", __config__=ConfigDict(from_attributes=True), **definitions)
+
+
 # For partial updates (PATCH/PUT)
 # This lets the user update only one field
 # without sending the whole object.
@@ -54,3 +76,76 @@ class JobAppUpdate(JobAppBase):
     applied_date: Optional[date] = None
     link: Optional[str] = None
     notes: Optional[str] = None
+
+
+# GET /applications/batch: the applications found, in the order asked for, and the ids that don't exist
+class JobAppBatch(BaseModel):
+    items: list[JobAppOut]
+    missing: list[int]
+
+
+# One rejected item of a bulk request: its position in the request and why it failed
+class BulkItemError(BaseModel):
+    index: int
+    errors: list[dict]
+
+
+# One written item of a bulk request: its position in the request and the id it was stored under
+class BulkCreatedItem(BaseModel):
+    index: int
+    id: int
+
+
+# Result of POST /applications/bulk - valid items are written even if others fail
+class BulkCreateResult(BaseModel):
+    created: list[BulkCreatedItem]
+    errors: list[BulkItemError]
+
+
+# The filter parameters of /applications/filter, reused to select rows for bulk writes
+class JobAppFilter(BaseModel):
+    company: Optional[str] = None
+    status: Optional[ApplicationStatus] = None
+    q: Optional[str] = Field(default=None, description="Full-text search, same as /applications/filter?q=")
+    applied_from: Optional[date] = None
+    applied_to: Optional[date] = None
+
+
+# Which rows a bulk update/delete touches: an explicit id list and/or a filter (both must match)
+class BulkSelector(BaseModel):
+    ids: Optional[list[int]] = Field(default=None, description="Only these application ids")
+    filter: Optional[JobAppFilter] = Field(default=None, description="Only applications matching this filter")
+    returning: bool = Field(default=False, description="Also return the ids of the affected rows")
+
+
+class BulkUpdateRequest(BulkSelector):
+    changes: JobAppUpdate
+
+
+# Result of PATCH/DELETE /applications/bulk
+class BulkWriteResult(BaseModel):
+    affected: int
+    ids: Optional[list[int]] = None
+
+
+# GET /applications/stats - the application funnel, read from precomputed counters
+class JobAppStats(BaseModel):
+    total: int
+    by_status: dict[str, int] = Field(description="Status value (or \"none\") -> count")
+    by_company: dict[str, int]
+    by_month: dict[str, int] = Field(description="Applied month as YYYY-MM -> count")
+
+
+# One bucket of GET /applications/timeseries: applications sent in [start, next bucket)
+class TimeseriesBucket(BaseModel):
+    start: date
+    applications: int = 0
+    by_status: dict[str, int] = Field(default_factory=dict, description="Current status -> count")
+    transitions: dict[str, int] = Field(
+        default_factory=dict, description="\"old>new\" status change -> count, for the applications of this bucket"
+    )
+
+
+class JobAppTimeseries(BaseModel):
+    bucket: str
+    buckets: list[TimeseriesBucket]
@@ -28,6 +28,12 @@ class User(UserBase):
     }
 
 
+# GET /users/batch: the users found, in the order asked for, and the ids that don't exist
+class UserBatch(BaseModel):
+    items: list[User]
+    missing: list[str]
+
+
 class UserCreate(UserBase):
     # plain password from frontend, will get hashed before saving into the DB as hashed_password
     password: str = Field(..., max_length=255, description="Password")
@@ -0,0 +1,37 @@
+# Full-text search for job applications, with one backend per database dialect.
+from sqlalchemy import event
+
+from app.models.job_models import JobApplication
+from app.search.base import SearchBackend, tokenize
+from app.search.like_backend import LikeSearchBackend
+from app.search.sqlite_fts import SqliteFtsBackend
+
+# dialect name -> backend. Register a backend here to give another dialect a real index;
+# anything not listed falls back to ILIKE scans.
+BACKENDS: dict[str, SearchBackend] = {
+    "sqlite": SqliteFtsBackend(),
+}
+FALLBACK_BACKEND = LikeSearchBackend()
+
+
+def get_search_backend(dialect_name: str) -> SearchBackend:
+    return BACKENDS.get(dialect_name, FALLBACK_BACKEND)
+
+
+# Keep the index structures in step with the table whenever it's created/dropped through the metadata
+# (tests, create_all). Migrations install them explicitly.
+@event.listens_for(JobApplication.__table__, "after_create")
+def _install_search_index(target, connection, **kw):
+    get_search_backend(connection.dialect.name).install(connection)
+
+
+@event.listens_for(JobApplication.__table__, "before_drop")
+def _uninstall_search_index(target, connection, **kw):
+    get_search_backend(connection.dialect.name).uninstall(connection)
+
+
+__all__ = [
+    "SearchBackend",
+    "get_search_backend",
+    "tokenize",
+]
@@ -0,0 +1,47 @@
+# Interface every full-text search backend implements.
+import re
+from abc import ABC, abstractmethod
+
+from sqlalchemy import Connection
+from sqlalchemy.sql import Subquery
+
+# Searchable text columns of job_applications, in index order
+SEARCH_COLUMNS = ("position", "company", "notes")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(search_query: str) -> list[str]:
+    """
+        Splits a user query into plain word tokens (punctuation and operators are dropped),
+        so user input can never be interpreted as backend query syntax.
+    """
+    return _TOKEN_RE.findall(search_query.lower())
+
+
+class SearchBackend(ABC):
+    """
+        A full-text search backend for job applications.
+
+        `install`, `uninstall` and `rebuild` manage the index structures and take a sync Connection
+        (use `await conn.run_sync(backend.rebuild)` from async code).
+        `matches` builds the query side: a subquery of (id, score) for the rows matching the search,
+        where a lower score means a better match.
+    """
+    name: str = "base"
+
+    def install(self, connection: Connection) -> None:
+        """Create the index structures (idempotent). Backends without any keep the default no-op."""
+
+    def uninstall(self, connection: Connection) -> None:
+        """Drop the index structures (idempotent)."""
+
+    def rebuild(self, connection: Connection) -> None:
+        """Re-index every row from job_applications."""
+
+    # True when `score` actually reflects relevance
+    supports_ranking: bool = False
+
+    @abstractmethod
+    def matches(self, search_query: str) -> Subquery:
+        """Subquery with `id` and `score` columns for the rows matching `search_query`."""
@@ -0,0 +1,23 @@
+# Fallback backend for dialects without a native full-text index: OR'ed ILIKE over the text columns.
+# Works everywhere but can't use an index, so every search is a full scan.
+from sqlalchemy import and_, literal, or_, select
+from sqlalchemy.sql import Subquery
+
+from app.models.job_models import JobApplication
+from app.search.base import SEARCH_COLUMNS, SearchBackend, tokenize
+
+
+class LikeSearchBackend(SearchBackend):
+    name = "like"
+
+    def matches(self, search_query: str) -> Subquery:
+        # every word must appear in at least one of the columns
+        conditions = [
+            or_(*(getattr(JobApplication, column).ilike(f"%{token}%") for column in SEARCH_COLUMNS))
+            for token in tokenize(search_query)
+        ]
+        return (
+            select(JobApplication.id.label("id"), literal(0).label("score"))
+            .where(and_(*conditions))
+            .subquery("search_matches")
+        )
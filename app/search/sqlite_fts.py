@@ -0,0 +1,77 @@
+# SQLite FTS5 backend.
+#
+# job_applications_fts is an *external content* FTS5 table: it stores only the index, the text itself
+# stays in job_applications (content_rowid = id). Triggers keep it in sync on every INSERT/UPDATE/DELETE,
+# so single-row CRUD, set-based updates and raw SQL writes are all indexed in the same transaction.
+from sqlalchemy import Connection, column, literal_column, select, table, text
+from sqlalchemy.sql import Subquery
+
+from app.search.base import SEARCH_COLUMNS, SearchBackend, tokenize
+
+FTS_TABLE = "job_applications_fts"
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{name}" for name in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{name}" for name in SEARCH_COLUMNS)
+
+INSTALL_DDL = (
+    # prefix='2 3' keeps extra prefix indexes so `term*` queries don't scan the whole term list
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_columns},
+        content='job_applications', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON job_applications BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON job_applications BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END""",
+    # only re-index when a searchable column changes (status updates don't touch the index)
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_columns} ON job_applications BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+)
+
+UNINSTALL_DDL = (
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+)
+
+fts_table = table(FTS_TABLE, column("rowid"), column("rank"))
+
+
+def to_match_expression(search_query: str) -> str:
+    """
+        Turns free text into an FTS5 query: every word quoted (so it's never parsed as an operator)
+        and used as a prefix, all words required. "back dev" -> '"back"* "dev"*'
+    """
+    return " ".join(f'"{token}"*' for token in tokenize(search_query))
+
+
+class SqliteFtsBackend(SearchBackend):
+    name = "sqlite-fts5"
+    supports_ranking = True
+
+    def install(self, connection: Connection) -> None:
+        for statement in INSTALL_DDL:
+            connection.execute(text(statement))
+
+    def uninstall(self, connection: Connection) -> None:
+        for statement in UNINSTALL_DDL:
+            connection.execute(text(statement))
+
+    def rebuild(self, connection: Connection) -> None:
+        self.install(connection)
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+    def matches(self, search_query: str) -> Subquery:
+        # `rank` is FTS5's bm25() score: more negative = more relevant
+        return (
+            select(fts_table.c.rowid.label("id"), fts_table.c.rank.label("score"))
+            .where(literal_column(FTS_TABLE).op("MATCH")(to_match_expression(search_query)))
+            .subquery("search_matches")
+        )
@@ -0,0 +1,41 @@
+# Rows per second: POST /applications/bulk's chunked multi-row INSERT vs. the create_job_app loop.
+#     python -m benchmarks.bench_bulk_create --rows 5000 --chunk-size 500
+import argparse
+import asyncio
+import logging
+
+from benchmarks.common import Timer, fake_job, temp_database
+
+from app.core.logger import logger
+from app.crud import job_crud
+from app.schemas import JobAppCreate
+
+
+async def run(rows: int, chunk_size: int) -> None:
+    logger.setLevel(logging.WARNING)  # keep per-row log lines out of the measurement
+    items = [fake_job(i) for i in range(rows)]
+
+    async with temp_database() as (_, session_factory):
+        async with session_factory() as db:
+            with Timer() as loop:
+                for item in items:
+                    await job_crud.create_job_app(db, JobAppCreate(**item))
+
+    async with temp_database() as (_, session_factory):
+        async with session_factory() as db:
+            with Timer() as bulk:
+                result = await job_crud.bulk_create_job_apps(db, items, chunk_size=chunk_size)
+            assert len(result.created) == rows, result.errors[:3]
+
+    print(f"rows={rows} chunk_size={chunk_size}")
+    print(f"create_job_app loop : {rows / loop.elapsed:>10,.0f} rows/s ({loop.elapsed:.2f}s)")
+    print(f"bulk_create_job_apps: {rows / bulk.elapsed:>10,.0f} rows/s ({bulk.elapsed:.2f}s)")
+    print(f"speedup             : {loop.elapsed / bulk.elapsed:>10.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.chunk_size))
@@ -0,0 +1,84 @@
+# Per-request latency with the logging pipeline in each configuration:
+#   direct - console + rotating file handlers on the logger, I/O on the event loop (the old setup)
+#   queue  - records queued, handlers run on the QueueListener thread (the current setup)
+#   off    - level WARNING, the INFO lines are skipped before any formatting
+# Console output goes to /dev/null and the log file to a temp dir, so only the pipeline differs.
+#     python -m benchmarks.bench_logging --requests 2000
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.common import fake_job, temp_database
+
+from httpx import ASGITransport, AsyncClient
+
+from app.api.deps import get_async_db
+from app.core.logger import console_handler, file_handler, logger, queue_handler, start_logging, stop_logging
+from app.crud import job_crud
+from app.main import app
+
+
+def _use(mode: str) -> None:
+    stop_logging()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    if mode == "direct":
+        logger.addHandler(console_handler)
+        logger.addHandler(file_handler)
+    else:
+        logger.addHandler(queue_handler)
+        start_logging()
+    logger.setLevel(logging.WARNING if mode == "off" else logging.INFO)
+
+
+async def run_mode(mode: str, client: AsyncClient, requests: int) -> list[float]:
+    _use(mode)
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        # every request logs a "Fetched jobs" line, every 10th an update (two more lines)
+        response = await client.get("/applications/", params={"limit": 20, "skip": i % 100})
+        if i % 10 == 0:
+            await client.put(f"/applications/{1 + i % 100}", json={"notes": f"note {i}"})
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    stop_logging()  # the queued records are part of the cost, drain them before the next mode
+    return latencies
+
+
+async def run(requests: int) -> None:
+    with tempfile.TemporaryDirectory() as log_dir, open(os.devnull, "w") as devnull:
+        console_handler.setStream(devnull)
+        file_handler.baseFilename = os.path.join(log_dir, "app.log")
+
+        async with temp_database() as (_, session_factory):
+            async with session_factory() as db:
+                await job_crud.bulk_create_job_apps(db, [fake_job(i) for i in range(200)])
+
+            async def override_get_async_db():
+                async with session_factory() as session:
+                    yield session
+
+            app.dependency_overrides[get_async_db] = override_get_async_db
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+                await run_mode("queue", client, requests // 10)  # warm up
+                print(f"requests={requests} (GET /applications/ + a PUT every 10th)")
+                for mode in ("direct", "queue", "off"):
+                    latencies = await run_mode(mode, client, requests)
+                    print(f"{mode:>6}: p50 {statistics.median(latencies) * 1e6:8.0f} µs   "
+                          f"p99 {statistics.quantiles(latencies, n=100)[-1] * 1e6:8.0f} µs   "
+                          f"mean {statistics.fmean(latencies) * 1e6:8.0f} µs")
+            app.dependency_overrides.clear()
+        file_handler.close()
+        _use("queue")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
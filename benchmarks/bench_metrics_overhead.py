@@ -0,0 +1,111 @@
+# Cost of the metrics instrumentation, isolated from everything else:
+#   middleware - a no-op ASGI app called directly, bare vs wrapped in MetricsMiddleware
+#                (the route label comes from scope["route"], set here the way the router sets it)
+#   db hooks   - the two cursor hooks called directly (their own cost), then `SELECT 1` on an in-memory
+#                SQLite connection with and without them (adds SQLAlchemy's event dispatch, and noise)
+# Each mode runs `--rounds` times and the best round is kept, so the numbers are per-call floors.
+#     python -m benchmarks.bench_metrics_overhead --calls 200000
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from benchmarks import common  # noqa: F401  (points the app at a throwaway database)
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+from app.core import metrics
+from app.core.metrics import MetricsMiddleware
+
+_ROUTE = SimpleNamespace(path="/applications/{id}")
+_START = {"type": "http.response.start", "status": 200, "headers": []}
+_BODY = {"type": "http.response.body", "body": b"{}"}
+
+
+async def _endpoint(scope, receive, send):
+    scope["route"] = _ROUTE
+    await send(_START)
+    await send(_BODY)
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _send(message):
+    pass
+
+
+async def _time_app(app, calls: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/applications/1"}
+    start = time.perf_counter()
+    for _ in range(calls):
+        await app(scope, _receive, _send)
+    return (time.perf_counter() - start) / calls
+
+
+def _time_hooks(calls: int) -> float:
+    context = SimpleNamespace()
+    start = time.perf_counter()
+    for _ in range(calls):
+        metrics._before_cursor_execute(None, None, "SELECT 1", (), context, False)
+        metrics._after_cursor_execute(None, None, "SELECT 1", (), context, False)
+    return (time.perf_counter() - start) / calls
+
+
+def _time_queries(connection, calls: int) -> float:
+    statement = text("SELECT 1")
+    start = time.perf_counter()
+    for _ in range(calls):
+        connection.execute(statement)
+    return (time.perf_counter() - start) / calls
+
+
+_HOOKS = (
+    ("before_cursor_execute", metrics._before_cursor_execute),
+    ("after_cursor_execute", metrics._after_cursor_execute),
+)
+
+
+def _set_hooks(enabled: bool) -> None:
+    for name, hook in _HOOKS:
+        if event.contains(Engine, name, hook) != enabled:
+            (event.listen if enabled else event.remove)(Engine, name, hook)
+
+
+async def run(calls: int, rounds: int) -> None:
+    wrapped = MetricsMiddleware(_endpoint)
+    bare = min([await _time_app(_endpoint, calls) for _ in range(rounds)])
+    instrumented = min([await _time_app(wrapped, calls) for _ in range(rounds)])
+    print(f"calls={calls} rounds={rounds}")
+    print(f"middleware: bare {bare * 1e6:6.2f} µs   instrumented {instrumented * 1e6:6.2f} µs   "
+          f"overhead {(instrumented - bare) * 1e6:5.2f} µs/request")
+
+    token = metrics.current_request.set(metrics.RequestStats())  # charge the statements to a request, as in the app
+    hooks = min(_time_hooks(calls) for _ in range(rounds))
+    print(f"  db hooks: {hooks * 1e6:5.2f} µs/statement (hook bodies)")
+
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        queries = calls // 4
+        without, with_hooks = [], []
+        for _ in range(rounds):  # interleaved, so drift hits both sides
+            _set_hooks(False)
+            without.append(_time_queries(connection, queries))
+            _set_hooks(True)
+            with_hooks.append(_time_queries(connection, queries))
+    engine.dispose()
+    metrics.current_request.reset(token)
+    without, with_hooks = min(without), min(with_hooks)
+    print(f" SELECT 1: without {without * 1e6:6.2f} µs   with {with_hooks * 1e6:6.2f} µs   "
+          f"overhead {(with_hooks - without) * 1e6:5.2f} µs/statement")
+    metrics.reset_metrics()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.rounds))
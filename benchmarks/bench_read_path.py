@@ -0,0 +1,109 @@
+# CPU cost of a list page, before and after the Core read path:
+#   orm  - select(JobApplication) hydrates ORM objects into the identity map, FastAPI validates each one
+#          into JobAppOut (from_attributes), dumps them back to dicts and json.dumps() those
+#   core - select(*JOB_COLUMNS) returns plain Rows, RowsJSONResponse validates once and writes JSON bytes
+# Both endpoints sit on a bare FastAPI app (no middleware, no caches) so only the read path differs; the
+# responses are checked to be identical first. Each path is timed with process_time() over --requests
+# pages of --limit rows, then run again under cProfile: the .pstats files and a top functions summary
+# go to benchmarks/results/profiles/ (python -m pstats <file> to dig in).
+#     python -m benchmarks.bench_read_path --jobs 5000 --limit 100 --requests 300
+import argparse
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import time
+
+from benchmarks import common
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, select
+
+from app.api.responses import RowsJSONResponse
+from app.crud.job_crud import JOB_COLUMNS
+from app.models import JobApplication
+from app.schemas import job_schemas
+from benchmarks.datagen import generate_jobs
+
+PROFILES_DIR = os.path.join(os.path.dirname(__file__), "results", "profiles")
+
+
+def build_app(session_factory) -> FastAPI:
+    app = FastAPI()
+
+    async def get_db():
+        async with session_factory() as session:
+            yield session
+
+    @app.get("/orm", response_model=list[job_schemas.JobAppOut])
+    async def orm_page(limit: int, db=Depends(get_db)):
+        result = await db.execute(select(JobApplication).order_by(JobApplication.id).limit(limit))
+        return result.scalars().all()
+
+    @app.get("/core", response_model=list[job_schemas.JobAppOut])
+    async def core_page(limit: int, db=Depends(get_db)):
+        result = await db.execute(select(*JOB_COLUMNS).order_by(JobApplication.id).limit(limit))
+        return RowsJSONResponse(result.all(), job_schemas.JobAppOut)
+
+    return app
+
+
+async def _pages(client: AsyncClient, path: str, limit: int, requests: int) -> float:
+    start = time.process_time()
+    for _ in range(requests):
+        response = await client.get(path, params={"limit": limit})
+        response.raise_for_status()
+    return (time.process_time() - start) / requests
+
+
+async def _profile(client: AsyncClient, path: str, limit: int, requests: int, name: str) -> str:
+    profiler = cProfile.Profile()
+    profiler.enable()
+    await _pages(client, path, limit, requests)
+    profiler.disable()
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    stats_path = os.path.join(PROFILES_DIR, f"read_path_{name}.pstats")
+    profiler.dump_stats(stats_path)
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(30)
+    with open(os.path.join(PROFILES_DIR, f"read_path_{name}.txt"), "w") as file:
+        file.write(summary.getvalue())
+    return stats_path
+
+
+async def run(jobs: int, limit: int, requests: int, rounds: int) -> None:
+    async with common.temp_database() as (engine, session_factory):
+        async with engine.begin() as connection:
+            await connection.execute(insert(JobApplication), list(generate_jobs(jobs)))
+
+        transport = ASGITransport(app=build_app(session_factory))
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            orm = await client.get("/orm", params={"limit": limit})
+            core = await client.get("/core", params={"limit": limit})
+            assert orm.json() == core.json(), "the two read paths disagree"
+            print(f"jobs={jobs} limit={limit} requests={requests} rounds={rounds} "
+                  f"(page: {len(core.content)} bytes)")
+
+            timings = {"orm": [], "core": []}
+            for _ in range(rounds):  # interleaved, so drift hits both sides
+                for name in timings:
+                    timings[name].append(await _pages(client, f"/{name}", limit, requests))
+            orm_cpu, core_cpu = min(timings["orm"]), min(timings["core"])
+            print(f"  orm: {orm_cpu * 1e3:7.3f} ms CPU/request")
+            print(f" core: {core_cpu * 1e3:7.3f} ms CPU/request   ({(orm_cpu - core_cpu) / orm_cpu * 100:.1f}% less)")
+
+            for name in timings:
+                stats_path = await _profile(client, f"/{name}", limit, requests, name)
+                print(f"profile: {stats_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.jobs, args.limit, args.requests, args.rounds))
@@ -0,0 +1,80 @@
+# Registration throughput under concurrent load, and how much it stalls other requests:
+# bcrypt inline on the event loop (the old behaviour) vs. the hashing worker pool.
+#     python -m benchmarks.bench_registration --users 40 --concurrency 20
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from benchmarks.common import Timer, temp_database
+
+from httpx import ASGITransport, AsyncClient
+
+from app.api.deps import get_async_db
+from app.core import security
+from app.core.logger import logger
+from app.crud import user_crud
+from app.main import app
+
+
+async def _inline_hash(password: str) -> str:
+    return security.hash_password(password)
+
+
+async def run_mode(mode: str, users: int, concurrency: int) -> None:
+    user_crud.hash_password_async = _inline_hash if mode == "inline" else security.hash_password_async
+
+    async with temp_database() as (_, session_factory):
+        async def override_get_async_db():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            semaphore = asyncio.Semaphore(concurrency)
+            done = False
+
+            async def register(i: int) -> None:
+                async with semaphore:
+                    response = await client.post("/users/register", json={
+                        "email": f"{mode}{i}@example.com", "username": f"{mode}{i}", "password": "hunter2hunter2"
+                    })
+                    assert response.status_code == 201, response.text
+
+            # a cheap request fired every 10ms while registrations run: its latency is the loop stall
+            async def probe(latencies: list[float]) -> None:
+                while not done:
+                    start = time.perf_counter()
+                    await client.get("/")
+                    latencies.append(time.perf_counter() - start)
+                    await asyncio.sleep(0.01)
+
+            latencies: list[float] = []
+            probe_task = asyncio.create_task(probe(latencies))
+            with Timer() as timer:
+                await asyncio.gather(*(register(i) for i in range(users)))
+            done = True
+            await probe_task
+
+    app.dependency_overrides.clear()
+    print(f"{mode:>6}: {users / timer.elapsed:6.1f} registrations/s | "
+          f"GET / latency p50 {statistics.median(latencies) * 1000:7.1f} ms, "
+          f"max {max(latencies) * 1000:7.1f} ms")
+
+
+async def run(users: int, concurrency: int) -> None:
+    logger.setLevel(logging.WARNING)
+    print(f"users={users} concurrency={concurrency} workers={security.get_settings().password_hash_workers}")
+    await run_mode("inline", users, concurrency)
+    await run_mode("pool", users, concurrency)
+    security.shutdown_password_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.concurrency))
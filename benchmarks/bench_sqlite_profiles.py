@@ -0,0 +1,81 @@
+# Mixed read/write throughput of the SQLite PRAGMA profiles (app/db/sqlite.py).
+# Writers create applications while readers page through them, each on its own connection.
+#     python -m benchmarks.bench_sqlite_profiles --writers 4 --readers 8 --seconds 5
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from benchmarks.common import Timer, fake_job, temp_database
+
+from app.core.logger import logger
+from app.crud import job_crud
+from app.db.sqlite import SQLITE_PROFILES
+from app.exceptions import AppBaseException
+from app.schemas import JobAppCreate
+
+
+async def _worker(session_factory, write: bool, deadline: float, latencies: list, errors: list, offset: int) -> None:
+    i = offset
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            async with session_factory() as db:
+                if write:
+                    await job_crud.create_job_app(db, JobAppCreate(**fake_job(i)))
+                else:
+                    await job_crud.get_job_apps(db, skip=i % 1000, limit=50)
+        except AppBaseException:
+            errors.append(1)  # "database is locked" surfaces as a 500
+        else:
+            latencies.append(time.perf_counter() - start)
+        i += 1
+
+
+async def run_profile(profile: str, writers: int, readers: int, seconds: float, seed_rows: int) -> dict:
+    async with temp_database(SQLITE_PROFILES[profile]) as (_, session_factory):
+        async with session_factory() as db:
+            await job_crud.bulk_create_job_apps(db, [fake_job(i) for i in range(seed_rows)], chunk_size=1000)
+
+        write_latencies, read_latencies, write_errors, read_errors = [], [], [], []
+        deadline = time.perf_counter() + seconds
+        with Timer() as timer:
+            await asyncio.gather(
+                *(_worker(session_factory, True, deadline, write_latencies, write_errors, n * 1_000_000)
+                  for n in range(writers)),
+                *(_worker(session_factory, False, deadline, read_latencies, read_errors, n) for n in range(readers)),
+            )
+
+    def p95(values):
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) >= 2 else float("nan")
+
+    return {
+        "profile": profile,
+        "writes_per_s": len(write_latencies) / timer.elapsed,
+        "reads_per_s": len(read_latencies) / timer.elapsed,
+        "write_p95_ms": p95(write_latencies),
+        "read_p95_ms": p95(read_latencies),
+        "errors": len(write_errors) + len(read_errors),
+    }
+
+
+async def run(profiles: list[str], writers: int, readers: int, seconds: float, seed_rows: int) -> None:
+    logger.setLevel(logging.CRITICAL)  # lock errors are counted, not logged
+    print(f"writers={writers} readers={readers} seconds={seconds} seed_rows={seed_rows}")
+    print(f"{'profile':<10} {'writes/s':>9} {'reads/s':>9} {'write p95':>10} {'read p95':>10} {'errors':>7}")
+    for profile in profiles:
+        r = await run_profile(profile, writers, readers, seconds, seed_rows)
+        print(f"{r['profile']:<10} {r['writes_per_s']:>9,.0f} {r['reads_per_s']:>9,.0f} "
+              f"{r['write_p95_ms']:>8.1f}ms {r['read_p95_ms']:>8.1f}ms {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PROFILES), choices=list(SQLITE_PROFILES))
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--seed-rows", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.profiles, args.writers, args.readers, args.seconds, args.seed_rows))
@@ -0,0 +1,68 @@
+# Worker cold start: time to import app.main, run the lifespan startup and answer the first request,
+# each measured in a fresh interpreter.
+#     python -m benchmarks.bench_startup --runs 10
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_PROBE = """
+import asyncio, json, time
+from httpx import ASGITransport, AsyncClient
+
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def main():
+    application = app.main.app
+    async with application.router.lifespan_context(application):
+        started = time.perf_counter()
+        async with AsyncClient(transport=ASGITransport(app=application), base_url="http://bench") as client:
+            response = await client.get("/applications/?limit=1")
+        answered = time.perf_counter()
+        assert response.status_code == 200, response.text
+    print(json.dumps({
+        "import_s": imported - start,
+        "startup_s": started - imported,
+        "first_request_s": answered - started,
+    }))
+
+asyncio.run(main())
+"""
+
+
+def run(runs: int) -> None:
+    handle, path = tempfile.mkstemp(suffix=".db", prefix="jat_bench_startup_")
+    os.close(handle)
+    env = {**os.environ, "DB_URL": f"sqlite:///{path}", "PYTHONPATH": os.getcwd()}
+    try:
+        subprocess.run([sys.executable, "-m", "app.cli", "create-schema"], env=env, check=True, capture_output=True)
+        samples = []
+        for _ in range(runs):
+            spawned = time.perf_counter()
+            result = subprocess.run([sys.executable, "-c", _PROBE], env=env, check=True, capture_output=True, text=True)
+            sample = json.loads(result.stdout.strip().splitlines()[-1])
+            sample["process_s"] = time.perf_counter() - spawned
+            samples.append(sample)
+    finally:
+        for leftover in (path, f"{path}-wal", f"{path}-shm"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    print(f"runs={runs}")
+    for key, label in (("import_s", "import app.main"), ("startup_s", "lifespan startup"),
+                       ("first_request_s", "first request"), ("process_s", "whole process")):
+        values = [sample[key] * 1000 for sample in samples]
+        print(f"{label:<17}: median {statistics.median(values):>8.1f} ms   min {min(values):>8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    run(args.runs)
@@ -0,0 +1,45 @@
+# GET /applications/stats: reading the maintained counters vs. a GROUP BY over every application.
+#     python -m benchmarks.bench_stats --rows 100000 --repeat 20
+import argparse
+import asyncio
+import logging
+
+from benchmarks.common import Timer, fake_job, temp_database
+
+from app.core.logger import logger
+from app.crud import job_crud, stats_crud
+
+
+async def run(rows: int, repeat: int) -> None:
+    logger.setLevel(logging.WARNING)
+
+    async with temp_database() as (_, session_factory):
+        async with session_factory() as db:
+            with Timer() as seed:
+                await job_crud.bulk_create_job_apps(db, [fake_job(i) for i in range(rows)], chunk_size=1000)
+
+            with Timer() as live:
+                for _ in range(repeat):
+                    live_counts = await stats_crud.count_live(db)
+            with Timer() as counters:
+                for _ in range(repeat):
+                    stats = await stats_crud.get_stats(db)
+
+    assert stats.total == rows
+    # count_live() also has the daily rollup keys (metric, day, key): /stats only reads the 2-tuple counters
+    assert stats == stats_crud.to_stats(
+        (*counter, count) for counter, count in live_counts.items() if len(counter) == 2
+    )
+
+    print(f"rows={rows} repeat={repeat} (seeded in {seed.elapsed:.1f}s, counters maintained on insert)")
+    print(f"GROUP BY on the fly: {live.elapsed / repeat * 1000:>9.2f} ms/request")
+    print(f"summary table      : {counters.elapsed / repeat * 1000:>9.2f} ms/request")
+    print(f"speedup            : {live.elapsed / counters.elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
@@ -0,0 +1,62 @@
+# Shared helpers for the benchmark scripts.
+# Import this module *before* anything from `app`, it points the app at a throwaway database.
+import contextlib
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("DB_URL", f"sqlite:///{tempfile.gettempdir()}/jat_bench_default.db")
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.db import Base  # noqa: E402
+from app.db.sqlite import install_sqlite_pragmas  # noqa: E402
+
+COMPANIES = ["Google", "Amazon", "Meta", "Netflix", "Stripe", "Linear", "Intercom", "Workday"]
+STATUSES = ["applied", "interviewing", "offered", "rejected", "withdrawn"]
+
+
+def fake_job(i: int) -> dict:
+    """A realistic-looking JobAppCreate payload, deterministic for a given i."""
+    return {
+        "company": COMPANIES[i % len(COMPANIES)],
+        "position": f"Software Engineer {i}",
+        "location": "Remote" if i % 3 else "Dublin",
+        "status": STATUSES[i % len(STATUSES)],
+        "applied_date": (date(2023, 1, 1) + timedelta(days=i % 730)).isoformat(),
+        "link": f"https://jobs.example.com/{i}",
+        "notes": "Referred by a friend" if i % 7 == 0 else None,
+    }
+
+
+@contextlib.asynccontextmanager
+async def temp_database(pragmas: dict | None = None):
+    """
+        Fresh file-backed SQLite database with the full schema, its connections set up with `pragmas`.
+        Yields (engine, session factory) and deletes the file (and any WAL files) afterwards.
+    """
+    handle, path = tempfile.mkstemp(suffix=".db", prefix="jat_bench_")
+    os.close(handle)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    install_sqlite_pragmas(engine.sync_engine, pragmas or {})
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield engine, async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    finally:
+        await engine.dispose()
+        for leftover in (path, f"{path}-wal", f"{path}-shm"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+class Timer:
+    """`with Timer() as t: ...` then read t.elapsed (seconds)."""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
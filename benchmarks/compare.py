@@ -0,0 +1,48 @@
+# Side by side view of benchmarks.loadtest result files, the first one being the baseline.
+#     python -m benchmarks.compare benchmarks/results/reads-20250601-101500.json benchmarks/results/reads-*.json
+import argparse
+import json
+
+_METRICS = [
+    ("throughput req/s", lambda result: result["throughput_rps"], True),
+    ("p50 ms", lambda result: result["latency_ms"]["p50"], False),
+    ("p95 ms", lambda result: result["latency_ms"]["p95"], False),
+    ("p99 ms", lambda result: result["latency_ms"]["p99"], False),
+    ("errors", lambda result: result["errors"], False),
+    ("peak rss MB", lambda result: result["memory_mb"]["peak_rss"], False),
+]
+
+
+def _change(baseline: float, value: float, higher_is_better: bool) -> str:
+    if not baseline:
+        return ""
+    change = (value - baseline) / baseline * 100
+    better = change > 0 if higher_is_better else change < 0
+    return f" ({change:+.1f}%{' better' if better and abs(change) >= 1 else ''})"
+
+
+def compare(results: list[dict]) -> str:
+    baseline = results[0]
+    lines = [f"{'':<18}" + "".join(f"{result.get('git_commit') or '?':>26}" for result in results)]
+    lines.append(f"{'scenario':<18}" + "".join(f"{result['scenario']:>26}" for result in results))
+    for name, read, higher_is_better in _METRICS:
+        cells = []
+        for result in results:
+            value = read(result)
+            cell = f"{value:.2f}" if isinstance(value, float) else str(value)
+            if result is not baseline:
+                cell += _change(read(baseline), value, higher_is_better)
+            cells.append(f"{cell:>26}")
+        lines.append(f"{name:<18}" + "".join(cells))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="+", help="loadtest JSON results, the first one is the baseline")
+    args = parser.parse_args()
+    loaded = []
+    for path in args.files:
+        with open(path) as file:
+            loaded.append(json.load(file))
+    print(compare(loaded))
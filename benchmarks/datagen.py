@@ -0,0 +1,191 @@
+# Synthetic dataset generator: millions of job applications and thousands of users in a SQLite file,
+# shaped like real data rather than fake_job()'s round robin:
+#   - companies follow a long tail (a few big employers get most applications, ~400 in total)
+#   - applied dates cover the last three years, weighted towards recent months and weekdays
+#   - statuses depend on age: recent applications are mostly "applied", old ones mostly settled
+#   - links on ~85% of rows, notes of varying length on ~30%
+# Rows are written with multi-row executemany in chunked transactions, with the full-text triggers
+# dropped during the load and the index rebuilt once at the end, then the stats counters and
+# timeseries rollups are recomputed. Deterministic for a given --seed.
+#     python -m benchmarks.datagen --jobs 1000000 --users 5000 --db /tmp/jat_bench.db
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from itertools import accumulate, islice
+from typing import Iterator
+
+from benchmarks import common  # noqa: F401  (points the app at a throwaway database)
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.crud import stats_crud
+from app.db import Base
+from app.db.sqlite import SQLITE_PROFILES, install_sqlite_pragmas
+from app.models import JobApplication, User
+from app.schemas import ApplicationStatus, UserRole
+from app.search import get_search_backend
+
+_COMPANY_STEMS = [
+    "Google", "Amazon", "Meta", "Microsoft", "Apple", "Netflix", "Stripe", "Shopify", "Spotify", "Atlassian",
+    "Intercom", "Workday", "Salesforce", "Oracle", "IBM", "Intel", "Nvidia", "Adobe", "Airbnb", "Uber",
+    "Datadog", "Cloudflare", "GitLab", "HubSpot", "Zendesk", "Twilio", "Snowflake", "Linear", "Figma", "Notion",
+]
+_COMPANY_SUFFIXES = ["", " Labs", " Cloud", " Systems", " Health", " Analytics", " Payments", " Digital",
+                     " Robotics", " Security", " Media", " Games", " Bio"]
+_LEVELS = ["Junior", "", "", "Senior", "Senior", "Staff", "Lead", "Principal"]
+_ROLES = ["Backend Engineer", "Frontend Engineer", "Full Stack Developer", "Software Engineer", "Data Engineer",
+          "Data Analyst", "DevOps Engineer", "Site Reliability Engineer", "Machine Learning Engineer",
+          "Mobile Developer", "QA Engineer", "Security Engineer", "Platform Engineer", "Product Engineer"]
+_LOCATIONS = ["Remote", "Remote", "Remote", "Dublin", "Cork", "London", "Berlin", "Amsterdam", "Paris",
+              "Lisbon", "Barcelona", "New York", "San Francisco", "Toronto", None]
+_NOTE_WORDS = ("referred by a friend recruiter reached out on linkedin take home assignment sent "
+               "second round booked salary range discussed hybrid three days office follow up next "
+               "week visa sponsorship available team lead seemed great stack python fastapi postgres").split()
+_FIRST_NAMES = ["Aoife", "Sean", "Priya", "Chen", "Maria", "Tom", "Fatima", "Lukas", "Sofia", "Kenji",
+                "Amara", "Diego", "Niamh", "Omar", "Elena", "Jonas", "Mei", "Ravi", "Zoe", "Ivan"]
+_LAST_NAMES = ["Murphy", "Kelly", "Sharma", "Wang", "Garcia", "Smith", "Khan", "Muller", "Rossi", "Tanaka",
+               "Okafor", "Lopez", "Byrne", "Haddad", "Petrova", "Berg", "Lin", "Patel", "Brown", "Novak"]
+
+# (status, weight) once an application is older than the given number of days
+_STATUS_BY_AGE = [
+    (14, [(ApplicationStatus.APPLIED, 85), (ApplicationStatus.INTERVIEWING, 10), (ApplicationStatus.REJECTED, 5)]),
+    (60, [(ApplicationStatus.APPLIED, 40), (ApplicationStatus.INTERVIEWING, 20), (ApplicationStatus.REJECTED, 30),
+          (ApplicationStatus.WITHDRAWN, 6), (ApplicationStatus.OFFERED, 4)]),
+    (None, [(ApplicationStatus.APPLIED, 15), (ApplicationStatus.INTERVIEWING, 3), (ApplicationStatus.REJECTED, 62),
+            (ApplicationStatus.WITHDRAWN, 12), (ApplicationStatus.OFFERED, 8)]),
+]
+
+# A valid bcrypt hash of "benchmark-password", shared by every generated user (hashing thousands is minutes)
+PASSWORD_HASH = "$2b$12$Vy.Y7XVXFfV3prfaMjdfSOPycWv3PFWaUiCXGK8FN/35vSgPRIDja"
+
+
+def _cumulative(weights: list[float]) -> list[float]:
+    return list(accumulate(weights))
+
+
+def companies() -> list[str]:
+    return [stem + suffix for suffix in _COMPANY_SUFFIXES for stem in _COMPANY_STEMS]
+
+
+def generate_jobs(count: int, seed: int = 42, today: date | None = None, years: int = 3) -> Iterator[dict]:
+    """Job application rows (column -> value, ready for a Core insert)."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    names = companies()
+    # Zipf-like: the company at rank r gets weight 1/r
+    company_weights = _cumulative([1 / rank for rank in range(1, len(names) + 1)])
+    days = years * 365
+    # twice as many applications a day now as `days` ago
+    day_weights = _cumulative([1 + age / days for age in range(days, 0, -1)])
+    status_tables = [(limit, [status for status, _ in table], _cumulative([weight for _, weight in table]))
+                     for limit, table in _STATUS_BY_AGE]
+
+    for i in range(count):
+        age = days - rng.choices(range(days), cum_weights=day_weights)[0]
+        applied = today - timedelta(days=age)
+        if applied.weekday() >= 5 and rng.random() < 0.7:  # fewer applications at the weekend
+            applied -= timedelta(days=applied.weekday() - 4)
+            age = (today - applied).days
+        statuses, status_weights = next((s, w) for limit, s, w in status_tables if limit is None or age < limit)
+        company = rng.choices(names, cum_weights=company_weights)[0]
+        level = rng.choice(_LEVELS)
+        yield {
+            "company": company,
+            "position": f"{level} {rng.choice(_ROLES)}".strip(),
+            "location": rng.choice(_LOCATIONS),
+            "status": rng.choices(statuses, cum_weights=status_weights)[0],
+            "applied_date": applied,
+            "link": f"https://jobs.example.com/{company.lower().replace(' ', '-')}/{i}" if rng.random() < 0.85 else None,
+            "notes": " ".join(rng.choices(_NOTE_WORDS, k=rng.randint(3, 60)))[:500] if rng.random() < 0.3 else None,
+            "version": 1,
+        }
+
+
+def generate_users(count: int, seed: int = 42, now: datetime | None = None) -> Iterator[dict]:
+    """User rows with unique usernames and emails; about 2% admins, 70% have logged in."""
+    rng = random.Random(seed + 1)
+    now = now or datetime.now().replace(microsecond=0)
+    for i in range(count):
+        first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+        created = now - timedelta(seconds=rng.randint(0, 3 * 365 * 86400))
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "email": f"{first.lower()}.{last.lower()}{i}@example.com",
+            "username": f"{first.lower()}{last.lower()}{i}",
+            "full_name": f"{first} {last}",
+            "role": UserRole.ADMIN if rng.random() < 0.02 else UserRole.USER,
+            "hashed_password": PASSWORD_HASH,
+            "created_at": created,
+            "last_login": created + timedelta(seconds=rng.randint(0, int((now - created).total_seconds())))
+            if rng.random() < 0.7 else None,
+        }
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def populate(engine: Engine, jobs: int, users: int, seed: int = 42, chunk_size: int = 10_000) -> dict:
+    """Creates the schema if needed and appends the generated rows. Returns timings and row counts."""
+    Base.metadata.create_all(engine)
+    search = get_search_backend(engine.dialect.name)
+    timings = {}
+
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        search.uninstall(connection)  # one index rebuild at the end beats a trigger per row
+    for chunk in _chunks(generate_jobs(jobs, seed), chunk_size):
+        with engine.begin() as connection:
+            connection.execute(insert(JobApplication), chunk)
+    for chunk in _chunks(generate_users(users, seed), chunk_size):
+        with engine.begin() as connection:
+            connection.execute(insert(User), chunk)
+    timings["insert_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        search.rebuild(connection)
+    timings["search_index_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        stats_crud.rebuild_stats(connection)
+        stats_crud.backfill_rollups(connection)
+    timings["counters_s"] = time.perf_counter() - start
+
+    with engine.connect() as connection:
+        timings["job_applications"] = connection.execute(select(func.count()).select_from(JobApplication)).scalar()
+        timings["users"] = connection.execute(select(func.count()).select_from(User)).scalar()
+    return timings
+
+
+def create_dataset(path: str, jobs: int, users: int, seed: int = 42, chunk_size: int = 10_000) -> dict:
+    """A fresh SQLite file at `path` (anything there is replaced) with the generated dataset."""
+    for leftover in (path, f"{path}-wal", f"{path}-shm"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    engine = create_engine(f"sqlite:///{path}")
+    install_sqlite_pragmas(engine, SQLITE_PROFILES["wal-fast"])
+    try:
+        return populate(engine, jobs, users, seed, chunk_size)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="/tmp/jat_bench.db", help="SQLite file to (re)create")
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+    result = create_dataset(args.db, args.jobs, args.users, args.seed, args.chunk_size)
+    print(f"{args.db}: {result['job_applications']} applications, {result['users']} users "
+          f"(insert {result['insert_s']:.1f}s, search index {result['search_index_s']:.1f}s, "
+          f"counters {result['counters_s']:.1f}s)")
@@ -0,0 +1,305 @@
+# Load test: drives the whole app in-process through httpx.ASGITransport (routing, validation, DB,
+# serialization - no network, no server) with `--concurrency` requests in flight, against a dataset
+# from benchmarks.datagen. Reports throughput, p50/p95/p99 latency (overall and per endpoint) and
+# memory, and writes it all to a JSON file so runs can be compared (python -m benchmarks.compare).
+#     python -m benchmarks.datagen --jobs 1000000 --users 5000 --db /tmp/jat_bench.db
+#     python -m benchmarks.loadtest --db /tmp/jat_bench.db --scenario reads --concurrency 32 --requests 5000
+# Without --db a temporary dataset of --jobs/--users rows is generated first.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+from httpx import ASGITransport, AsyncClient
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# A request builder gets (rng, dataset) and returns (endpoint label, method, url, keyword arguments for httpx)
+RequestBuilder = Callable[[random.Random, dict], tuple[str, str, str, dict]]
+
+
+def list_page(rng, data):
+    return "GET /applications/", "GET", "/applications/", {"params": {"limit": 50, "skip": rng.randrange(0, 5000)}}
+
+
+def get_job(rng, data):
+    return "GET /applications/{id}", "GET", f"/applications/{rng.randint(1, data['max_job_id'])}", {}
+
+
+def filter_status(rng, data):
+    params = {"status": rng.choice(["applied", "interviewing", "rejected", "offered"]), "limit": 50}
+    return "GET /applications/filter?status", "GET", "/applications/filter", {"params": params}
+
+
+def filter_company(rng, data):
+    params = {"company": rng.choice(data["companies"]), "limit": 50, "sort_by": "applied_date"}
+    return "GET /applications/filter?company", "GET", "/applications/filter", {"params": params}
+
+
+def filter_dates(rng, data):
+    start = date.today() - timedelta(days=rng.randrange(30, 1000))
+    params = {"applied_from": start.isoformat(), "applied_to": (start + timedelta(days=30)).isoformat(), "limit": 50}
+    return "GET /applications/filter?dates", "GET", "/applications/filter", {"params": params}
+
+
+def search(rng, data):
+    params = {"q": rng.choice(["backend", "senior eng", "data", "remote", "python", "platform"]), "limit": 20}
+    return "GET /applications/filter?q", "GET", "/applications/filter", {"params": params}
+
+
+def stats(rng, data):
+    return "GET /applications/stats", "GET", "/applications/stats", {}
+
+
+def timeseries(rng, data):
+    params = {"bucket": rng.choice(["day", "week", "month"]),
+              "applied_from": (date.today() - timedelta(days=365)).isoformat()}
+    return "GET /applications/timeseries", "GET", "/applications/timeseries", {"params": params}
+
+
+def get_user(rng, data):
+    return "GET /users/{user_id}", "GET", f"/users/{rng.choice(data['user_ids'])}", {}
+
+
+def list_users(rng, data):
+    return "GET /users/", "GET", "/users/", {"params": {"limit": 50, "skip": rng.randrange(0, 1000)}}
+
+
+def batch_jobs(rng, data):
+    ids = ",".join(str(rng.randint(1, data["max_job_id"])) for _ in range(50))
+    return "GET /applications/batch", "GET", "/applications/batch", {"params": {"ids": ids}}
+
+
+def create_job(rng, data):
+    payload = {
+        "company": rng.choice(data["companies"]),
+        "position": "Load Test Engineer",
+        "location": "Remote",
+        "status": "applied",
+        "applied_date": date.today().isoformat(),
+        "link": "https://jobs.example.com/load-test",
+        "notes": None,
+    }
+    return "POST /applications/", "POST", "/applications/", {"json": payload}
+
+
+def update_job(rng, data):
+    payload = {"status": rng.choice(["interviewing", "rejected", "offered"]), "notes": f"load test {rng.random()}"}
+    return "PUT /applications/{id}", "PUT", f"/applications/{rng.randint(1, data['max_job_id'])}", {"json": payload}
+
+
+_READS = [(3, list_page), (4, get_job), (2, filter_status), (2, filter_company), (1, filter_dates), (1, search),
+          (1, stats)]
+
+# scenario -> (weight, request builder) pairs
+SCENARIOS: dict[str, list[tuple[int, RequestBuilder]]] = {
+    "list": [(1, list_page)],
+    "detail": [(1, get_job)],
+    # a saved list of 50 applications in one call (compare with 50 "detail" requests)
+    "batch": [(1, batch_jobs)],
+    "filter": [(3, filter_status), (3, filter_company), (1, filter_dates)],
+    "search": [(1, search)],
+    "stats": [(3, stats), (1, timeseries)],
+    "users": [(3, get_user), (1, list_users)],
+    "reads": _READS,
+    # ~10% writes
+    "mixed": _READS + [(1, create_job), (1, update_job)],
+}
+
+
+def load_dataset_info(db_path: str, sample_users: int = 1000) -> dict:
+    """What the request builders pick ids and filter values from (read straight from the file)."""
+    with sqlite3.connect(db_path) as connection:
+        max_job_id = connection.execute("SELECT COALESCE(MAX(id), 0) FROM job_applications").fetchone()[0]
+        jobs = connection.execute("SELECT COUNT(*) FROM job_applications").fetchone()[0]
+        users = connection.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        companies = [row[0] for row in connection.execute(
+            "SELECT key FROM job_application_stats WHERE dimension = 'company' ORDER BY count DESC LIMIT 50")]
+        user_ids = [row[0] for row in connection.execute("SELECT id FROM users LIMIT ?", (sample_users,))]
+    if not max_job_id:
+        raise SystemExit(f"{db_path} has no job applications, generate a dataset with benchmarks.datagen first")
+    return {"max_job_id": max_job_id, "job_applications": jobs, "users": users,
+            "companies": companies or ["Google"], "user_ids": user_ids or ["00000000-0000-0000-0000-000000000000"]}
+
+
+def percentiles(latencies: list[float]) -> dict:
+    """p50/p95/p99/max/mean in milliseconds."""
+    if len(latencies) < 2:
+        value = latencies[0] * 1000 if latencies else 0.0
+        return {"p50": value, "p95": value, "p99": value, "max": value, "mean": value}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50": cuts[49] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": max(latencies) * 1000,
+        "mean": statistics.fmean(latencies) * 1000,
+    }
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process."""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def drive(client: AsyncClient, builders: list[tuple[int, RequestBuilder]], data: dict, requests: int,
+                concurrency: int, duration: float | None, seed: int) -> dict:
+    """Runs `requests` requests (or as many as fit in `duration` seconds) from `concurrency` workers."""
+    weights = [weight for weight, _ in builders]
+    samples: dict[str, list[float]] = {}
+    status_codes: dict[int, int] = {}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker(worker_id: int):
+        nonlocal issued
+        rng = random.Random(seed * 1000 + worker_id)
+        while (deadline is None and issued < requests) or (deadline is not None and time.perf_counter() < deadline):
+            issued += 1
+            builder = rng.choices(builders, weights=weights)[0][1]
+            label, method, url, kwargs = builder(rng, data)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+            samples.setdefault(label, []).append(time.perf_counter() - start)
+            status_codes[response.status_code] = status_codes.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"elapsed": elapsed, "samples": samples, "status_codes": status_codes}
+
+
+async def run(args, db_path: str) -> dict:
+    # imported here: the environment must point at the dataset before the app reads its settings
+    from app.main import app
+
+    data = load_dataset_info(db_path)
+    builders = SCENARIOS[args.scenario]
+    rss_start = rss_mb()
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+            if args.warmup:
+                await drive(client, builders, data, args.warmup, args.concurrency, None, args.seed + 1)
+            if args.tracemalloc:
+                tracemalloc.start()
+            outcome = await drive(client, builders, data, args.requests, args.concurrency, args.duration, args.seed)
+            traced_peak = tracemalloc.get_traced_memory()[1] / 2 ** 20 if args.tracemalloc else None
+            tracemalloc.stop()
+
+    every = [latency for latencies in outcome["samples"].values() for latency in latencies]
+    errors = sum(count for status, count in outcome["status_codes"].items() if status >= 500)
+    return {
+        "scenario": args.scenario,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "dataset": {"db": db_path, "job_applications": data["job_applications"], "users": data["users"]},
+        "config": {"concurrency": args.concurrency, "requests": args.requests, "duration": args.duration,
+                   "warmup": args.warmup, "seed": args.seed, "caches": not args.no_cache,
+                   "log_level": args.log_level},
+        "requests": len(every),
+        "errors": errors,
+        "status_codes": {str(status): count for status, count in sorted(outcome["status_codes"].items())},
+        "duration_s": outcome["elapsed"],
+        "throughput_rps": len(every) / outcome["elapsed"] if outcome["elapsed"] else 0.0,
+        "latency_ms": percentiles(every),
+        "endpoints": {label: {"requests": len(latencies), **percentiles(latencies)}
+                      for label, latencies in sorted(outcome["samples"].items())},
+        "memory_mb": {"rss_start": rss_start, "rss_end": rss_mb(), "peak_rss": peak_rss_mb(),
+                      "tracemalloc_peak": traced_peak},
+    }
+
+
+def print_report(result: dict) -> None:
+    latency = result["latency_ms"]
+    print(f"{result['scenario']}: {result['requests']} requests in {result['duration_s']:.1f}s at concurrency "
+          f"{result['config']['concurrency']} -> {result['throughput_rps']:.0f} req/s, {result['errors']} errors")
+    print(f"  latency ms: p50 {latency['p50']:.2f}  p95 {latency['p95']:.2f}  p99 {latency['p99']:.2f}  "
+          f"max {latency['max']:.2f}")
+    for label, endpoint in result["endpoints"].items():
+        print(f"  {label:<36} {endpoint['requests']:>7}  p50 {endpoint['p50']:8.2f}  p95 {endpoint['p95']:8.2f}  "
+              f"p99 {endpoint['p99']:8.2f}")
+    memory = result["memory_mb"]
+    traced = f", tracemalloc peak {memory['tracemalloc_peak']:.1f}" if memory["tracemalloc_peak"] is not None else ""
+    print(f"  memory MB: rss {memory['rss_start']:.1f} -> {memory['rss_end']:.1f}, "
+          f"peak rss {memory['peak_rss']:.1f}{traced}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="reads")
+    parser.add_argument("--db", help="SQLite dataset from benchmarks.datagen (default: generate a temporary one)")
+    parser.add_argument("--jobs", type=int, default=100_000, help="rows of the temporary dataset")
+    parser.add_argument("--users", type=int, default=1_000, help="users of the temporary dataset")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--duration", type=float, help="run for this many seconds instead of --requests")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-cache", action="store_true", help="disable the entity and query caches")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--tracemalloc", action="store_true", help="also trace Python allocations (slower)")
+    parser.add_argument("--output", help="JSON result file (default: benchmarks/results/<scenario>-<time>.json)")
+    args = parser.parse_args(argv)
+
+    temp_dir = None
+    db_path = args.db
+    if db_path is None:
+        from benchmarks.datagen import create_dataset
+
+        temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(temp_dir.name, "jat_loadtest.db")
+        print(f"Generating {args.jobs} applications and {args.users} users...", file=sys.stderr)
+        create_dataset(db_path, args.jobs, args.users, args.seed)
+
+    os.environ["DB_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ["LOG_LEVEL"] = args.log_level
+    if args.no_cache:
+        os.environ["ENTITY_CACHE_ENABLED"] = os.environ["QUERY_CACHE_ENABLED"] = "false"
+    os.environ.setdefault("DB_POOL_SIZE", str(max(args.concurrency, 5)))
+
+    try:
+        result = asyncio.run(run(args, db_path))
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    print_report(result)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{args.scenario}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(result, file, indent=2)
+    print(f"  saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,20 @@
 # Create fresh DB(mock) for testing (Shared Test Setup)
 import datetime  # Import Python's date class to pass a date object instead of a string
+import os
+
 import pytest  # Pytest framework for writing and managing tests
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
-from app.api.deps import get_async_db  # The FastAPI dependency I override in tests
+# A route running more SQL statements than its query_budget() fails the test that called it
+os.environ.setdefault("QUERY_BUDGET_ACTION", "raise")
+
+from app.core.cache import clear_caches
+from app.api.deps import get_async_db, get_async_sessionmaker  # The FastAPI dependencies I override in tests
 from app.db import Base  # SQLAlchemy models’ Base (used to create/drop tables)
 from app.main import app  # The actual FastAPI app object being tested
-from app.models import JobApplication, User  # import JobApplication and User DB models
+from app.models import JobApplication, User, ImportJob, JobApplicationStat, JobApplicationRollup  # import the DB models
 
 # Use separate SQLite DB for testing separately from prod one
 SQLALCHEMY_TEST_DB_URL = "sqlite+aiosqlite:///:memory:"
@@ -42,6 +48,8 @@ async def override_get_async_db():
 @pytest.fixture(scope="module", autouse=True)
 async def set_dependency_override():
     app.dependency_overrides[get_async_db] = override_get_async_db
+    # streaming endpoints open their own sessions from this factory
+    app.dependency_overrides[get_async_sessionmaker] = lambda: AsyncTestingSessionLocal
 
 
 # 🏗️ Create schema for testing -  Create + Drop tables before/after test session
@@ -61,7 +69,12 @@ async def db_session():
         # Clear tables for test isolation
         await session.execute(delete(JobApplication))
         await session.execute(delete(User))
+        await session.execute(delete(ImportJob))
+        await session.execute(delete(JobApplicationStat))
+        await session.execute(delete(JobApplicationRollup))
         await session.commit()
+        # rows were removed behind the CRUD layer's back, so drop anything it cached
+        clear_caches()
         yield session
 
 
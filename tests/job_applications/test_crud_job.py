@@ -1,12 +1,20 @@
 # unit tests for database logic
 # CRUD Logic (No FastAPI involved)
+import dataclasses
+import datetime
+
 import pytest
-from sqlalchemy import delete
+from sqlalchemy import delete, func, insert, select, text, update
+from sqlalchemy.exc import DBAPIError
 
-from app.crud import job_crud
+from app.core import metrics
+from app.core.cache import clear_caches
+from app.core.config import get_settings
+from app.crud import batch, counting, job_crud, import_crud, stats_crud
 from app.models import job_models
 from app.schemas import job_schemas
-from app.exceptions import JobApplicationNotFoundException, ValidationError, AppBaseException
+from app.exceptions import JobApplicationNotFoundException, ValidationError, AppBaseException, WriteConflictException
+from tests.conftest import AsyncTestingSessionLocal
 
 
 @pytest.mark.anyio
@@ -41,18 +49,16 @@ async def test_get_job_app_by_id_raises_404(db_session):
 @pytest.mark.anyio
 async def test_delete_nonexistent_job(db_session):
     job_id = 9999
-    with pytest.raises(AppBaseException) as ex_info:
+    with pytest.raises(JobApplicationNotFoundException) as ex_info:
         await job_crud.delete_job(db_session, job_id)
-    assert ex_info.value.status_code == 500
-    assert f'Unexpected error during deletion.' in str(ex_info.value.detail)
+    assert ex_info.value.status_code == 404
 
 
 # integration test
 @pytest.mark.anyio
 async def test_delete_nonexistent_job_endpoint(async_client):
     response = await async_client.delete("/applications/999")
-    assert response.status_code == 500
-    assert response.json() == {'detail': 'Unexpected error during deletion.'}
+    assert response.status_code == 404
 
 
 @pytest.mark.anyio
@@ -84,3 +90,437 @@ async def test_feed_schema_invalid_status(db_session):
     errors = ex_info.value.errors()
     assert errors[0]["loc"] == ("status",)
     assert "Input should be" in errors[0]["msg"]
+
+
+@pytest.mark.anyio
+async def test_status_date_filter_uses_composite_index(db_session):
+    query = (
+        select(job_models.JobApplication)
+        .where(*job_crud.filter_conditions(status="applied", applied_from=datetime.date(2025, 1, 1)))
+        .order_by(job_models.JobApplication.applied_date)
+    )
+    compiled = query.compile(db_session.bind, compile_kwargs={"literal_binds": True})
+    plan = (await db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))).all()
+    assert any("ix_job_applications_status_applied_date_id" in row[-1] for row in plan)
+
+
+@pytest.mark.anyio
+async def test_search_matches_word_prefixes(db_session, sample_applications):
+    results = await job_crud.filter_job_apps(db_session, search_query="devel")
+    assert [job.company for job in results] == ["TestCompany"]
+
+
+@pytest.mark.anyio
+async def test_search_index_follows_updates_and_deletes(db_session, sample_applications):
+    google = sample_applications[1]
+    await job_crud.update_job(db_session, google.id, job_schemas.JobAppUpdate(notes="Recruiter ghosted me"))
+
+    assert [job.id for job in await job_crud.filter_job_apps(db_session, search_query="ghosted")] == [google.id]
+    assert await job_crud.filter_job_apps(db_session, search_query="oof") == []
+
+    await db_session.execute(delete(job_models.JobApplication).where(job_models.JobApplication.id == google.id))
+    await db_session.commit()
+    clear_caches()  # the raw delete bypasses the CRUD layer's cache invalidation
+    assert await job_crud.filter_job_apps(db_session, search_query="ghosted") == []
+
+
+@pytest.mark.anyio
+async def test_search_ranks_by_relevance(db_session, sample_applications):
+    await job_crud.create_job_app(db_session, job_schemas.JobAppCreate(
+        company="Interview Inc",
+        position="Interview Coach",
+        applied_date="2025-04-10",
+        notes="Interview prep, interview practice"
+    ))
+    results = await job_crud.filter_job_apps(db_session, search_query="interview", sort_by="relevance")
+    assert [job.company for job in results][0] == "Interview Inc"
+    assert {job.company for job in results} == {"Interview Inc", "Amazon", "Netflix"}
+
+
+@pytest.mark.anyio
+async def test_search_ignores_query_syntax(db_session, sample_applications):
+    # FTS operators / quotes in user input are treated as plain words
+    results = await job_crud.filter_job_apps(db_session, search_query='"Google" OR NOT')
+    assert results == []
+    assert await job_crud.filter_job_apps(db_session, search_query='google"') != []
+
+
+@pytest.mark.anyio
+async def test_rebuild_search_index(db_session, sample_applications):
+    backend = job_crud.search_backend_for(db_session)
+    connection = await db_session.connection()
+    await connection.run_sync(backend.rebuild)
+    await db_session.commit()
+
+    results = await job_crud.filter_job_apps(db_session, search_query="amazon devops")
+    assert [job.company for job in results] == ["Amazon"]
+
+
+@pytest.mark.anyio
+async def test_bulk_create_reports_invalid_items(db_session):
+    items = [
+        {"company": f"Company {i}", "position": "Engineer", "applied_date": "2025-05-01"}
+        for i in range(5)
+    ]
+    items.insert(2, {"company": "No date", "position": "Engineer"})
+
+    result = await job_crud.bulk_create_job_apps(db_session, items, chunk_size=2)
+
+    assert [item.index for item in result.created] == [0, 1, 3, 4, 5]
+    assert len({item.id for item in result.created}) == 5
+    assert [error.index for error in result.errors] == [2]
+    assert result.errors[0].errors[0]["loc"] == ("applied_date",)
+
+
+@pytest.mark.anyio
+async def test_bulk_insert_isolates_rows_failing_in_db(db_session):
+    good = {"company": "Good", "position": "Engineer", "applied_date": datetime.date(2025, 5, 1)}
+    bad = {"company": None, "position": "Engineer", "applied_date": datetime.date(2025, 5, 1)}  # NOT NULL
+
+    created, errors = await job_crud.insert_job_rows(db_session, [(0, good), (1, bad), (2, good)], chunk_size=10)
+
+    assert [index for index, _ in created] == [0, 2]
+    assert [error.index for error in errors] == [1]
+    count = await db_session.scalar(select(func.count()).select_from(job_models.JobApplication))
+    assert count == 2
+
+
+@pytest.mark.anyio
+async def test_stream_job_apps_in_small_batches(db_session, sample_applications):
+    jobs = [job async for job in job_crud.stream_job_apps(AsyncTestingSessionLocal, status="rejected", batch_size=2)]
+    assert [job.company for job in jobs] == ["Google"]
+
+    jobs = [job async for job in job_crud.stream_job_apps(AsyncTestingSessionLocal, batch_size=2)]
+    assert [job.id for job in jobs] == sorted(job.id for job in sample_applications)
+
+
+@pytest.mark.anyio
+async def test_import_resumes_after_last_committed_chunk(db_session, monkeypatch):
+    settings = dataclasses.replace(get_settings(), import_chunk_size=2)
+    monkeypatch.setattr(import_crud, "get_settings", lambda: settings)
+    records = [
+        {"company": f"Company {i}", "position": "Engineer", "applied_date": "2025-06-01"}
+        for i in range(5)
+    ]
+
+    async def upload(fail_at: int | None = None):
+        for index, record in enumerate(records):
+            if index == fail_at:
+                raise ConnectionError("client went away")
+            yield record
+
+    with pytest.raises(AppBaseException) as exc_info:
+        await import_crud.run_import(db_session, upload(fail_at=3), "ndjson", "resume-me")
+    assert "import_id=resume-me" in exc_info.value.detail
+
+    failed = await import_crud.get_import_job(db_session, "resume-me")
+    assert (failed.status, failed.rows_processed, failed.rows_inserted) == ("failed", 2, 2)
+
+    done = await import_crud.run_import(db_session, upload(), "ndjson", "resume-me")
+    assert (done.status, done.rows_processed, done.rows_inserted) == ("completed", 5, 5)
+
+    companies = (await db_session.execute(select(job_models.JobApplication.company))).scalars().all()
+    assert sorted(companies) == [f"Company {i}" for i in range(5)]
+
+
+@pytest.mark.anyio
+async def test_import_counts_a_chunk_once_when_its_commit_fails(db_session, monkeypatch):
+    records = [
+        {"company": f"Company {i}", "position": "Engineer", "applied_date": "2025-06-01"}
+        for i in range(3)
+    ]
+
+    async def upload():
+        for record in records:
+            yield record
+
+    commit, commits = db_session.commit, []
+
+    async def flaky_commit():
+        commits.append(1)
+        if len(commits) == 2:  # the first one starts the import, the second covers the whole chunk
+            raise DBAPIError("COMMIT", {}, Exception("disk I/O error"))
+        await commit()
+
+    monkeypatch.setattr(db_session, "commit", flaky_commit)
+    done = await import_crud.run_import(db_session, upload(), "ndjson", "flaky-commit")
+
+    # the chunk was retried row by row, and only those commits count
+    assert (done.status, done.rows_processed, done.rows_inserted, done.rows_failed) == ("completed", 3, 3, 0)
+    assert await db_session.scalar(select(func.count()).select_from(job_models.JobApplication)) == 3
+
+
+@pytest.mark.anyio
+async def test_get_job_by_id_is_cached_and_written_through(db_session, sample_applications):
+    job_id = sample_applications[0].id
+    cache = job_crud.job_cache()
+    hits = cache.hits
+
+    await job_crud.get_job_app_by_id(db_session, job_id)
+    cached = await job_crud.get_job_app_by_id(db_session, job_id)
+    assert cache.hits == hits + 1
+    assert cached.company == "TestCompany"
+
+    await job_crud.update_job(db_session, job_id, job_schemas.JobAppUpdate(company="Renamed"))
+    assert (await job_crud.get_job_app_by_id(db_session, job_id)).company == "Renamed"
+
+    await job_crud.delete_job(db_session, job_id)
+    with pytest.raises(JobApplicationNotFoundException):
+        await job_crud.get_job_app_by_id(db_session, job_id)
+
+
+@pytest.mark.anyio
+async def test_read_in_flight_during_a_write_does_not_cache_its_older_row(db_session, sample_applications, monkeypatch):
+    job_id = sample_applications[0].id
+    fetch_one, paused = job_crud.fetch_one, []
+
+    async def read_then_let_an_update_in(db, stmt):
+        job = await fetch_one(db, stmt)
+        if not paused:
+            paused.append(job_id)
+            async with AsyncTestingSessionLocal() as other:
+                await job_crud.update_job(other, job_id, job_schemas.JobAppUpdate(company="Renamed"))
+        return job
+
+    monkeypatch.setattr(job_crud, "fetch_one", read_then_let_an_update_in)
+    assert (await job_crud.get_job_app_by_id(db_session, job_id)).company == "TestCompany"
+    assert (await job_crud.get_job_app_by_id(db_session, job_id)).company == "Renamed"
+    assert [job["company"] for job in (await job_crud.get_job_apps_by_ids(db_session, [job_id]))[0]] == ["Renamed"]
+
+
+@pytest.mark.anyio
+async def test_sparse_fieldsets_narrow_the_select(db_session, sample_applications):
+    rows = await job_crud.get_job_apps(db_session, fields=("company", "status"))
+    assert rows[0]._fields == ("id", "company", "status")
+
+    # The keyset cursor needs the sort column, so it's read even when not asked for
+    rows = await job_crud.filter_job_apps(db_session, sort_by="applied_date", fields=("position",))
+    assert rows[0]._fields == ("id", "position", "applied_date")
+
+    clear_caches()
+    job = await job_crud.get_job_app_by_id(db_session, sample_applications[0].id, fields=("notes",))
+    assert job._fields == ("id", "notes", "version")
+
+
+@pytest.mark.anyio
+async def test_writes_return_their_rows_without_extra_selects(db_session, sample_applications):
+    job_id = sample_applications[0].id
+    stats = metrics.RequestStats()
+    token = metrics.current_request.set(stats)
+    try:
+        # notes isn't a stats column: a single UPDATE ... RETURNING
+        updated = await job_crud.update_job(db_session, job_id, job_schemas.JobAppUpdate(notes="Second round"))
+        assert (stats.queries, updated.notes, updated.version) == (1, "Second round", 2)
+
+        # status is: the old values are read first, then both counter tables move
+        stats.queries = 0
+        updated = await job_crud.update_job(db_session, job_id, job_schemas.JobAppUpdate(status="offered"))
+        assert (stats.queries, updated.status, updated.version) == (4, "offered", 3)
+    finally:
+        metrics.current_request.reset(token)
+
+    with pytest.raises(JobApplicationNotFoundException):
+        await job_crud.update_job(db_session, 999_999, job_schemas.JobAppUpdate(notes="ghost"))
+
+
+@pytest.mark.anyio
+async def test_fetch_by_ids_reads_in_chunks(db_session, sample_applications):
+    ids = [job.id for job in sample_applications] + [999_998, 999_999]
+    stats = metrics.RequestStats()
+    token = metrics.current_request.set(stats)
+    try:
+        found = await batch.fetch_by_ids(
+            db_session, job_crud.JOB_COLUMNS, job_models.JobApplication.id, ids, chunk_size=3
+        )
+    finally:
+        metrics.current_request.reset(token)
+    assert stats.queries == 3
+    assert sorted(found) == sorted(job.id for job in sample_applications)
+    assert found[ids[0]]["company"] == "TestCompany"
+
+
+@pytest.mark.anyio
+async def test_get_job_apps_by_ids_uses_the_entity_cache(db_session, sample_applications):
+    job_id = sample_applications[0].id
+    await job_crud.get_job_apps_by_ids(db_session, [job_id])
+    hits = job_crud.job_cache().hits
+    items, missing = await job_crud.get_job_apps_by_ids(db_session, [999_999, job_id, job_id])
+    assert job_crud.job_cache().hits == hits + 1
+    assert [item["id"] for item in items] == [job_id]
+    assert missing == [999_999]
+
+
+@pytest.mark.anyio
+async def test_count_within_gives_up_after_its_budget(db_session):
+    endless = text("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 100000000) "
+                   "SELECT count(*) FROM n")
+    started = datetime.datetime.now()
+    assert await counting.count_within(db_session, endless, budget_seconds=0.05) is None
+    assert datetime.datetime.now() - started < datetime.timedelta(seconds=2)
+    # The connection is still usable, and no longer has a deadline
+    assert await counting.count_within(db_session, select(func.count()).select_from(job_models.JobApplication), 0.05) == 0
+
+
+@pytest.mark.anyio
+async def test_count_job_apps_falls_back_to_an_estimate(db_session, sample_applications, monkeypatch):
+    await db_session.run_sync(lambda session: stats_crud.rebuild_stats(session.connection()))
+    await db_session.commit()
+    assert await job_crud.count_job_apps(db_session) == (5, True)
+    assert await job_crud.count_job_apps(db_session, status="applied") == (1, True)
+    assert await job_crud.count_job_apps(db_session, company="goo") == (1, True)
+    # Dates (and a status) are summed from the daily rollups, never estimated
+    await db_session.run_sync(lambda session: stats_crud.backfill_rollups(session.connection()))
+    await db_session.commit()
+    assert await job_crud.count_job_apps(db_session, applied_from=datetime.date(2025, 4, 2)) == (4, True)
+    assert await job_crud.count_job_apps(
+        db_session, status="rejected", applied_to=datetime.date(2025, 4, 2)
+    ) == (1, True)
+
+    async def over_budget(db, query, budget_seconds):
+        return None
+
+    monkeypatch.setattr(job_crud, "count_within", over_budget)
+    # A small table fits in the sample entirely, so the estimate comes out exact
+    assert await job_crud.count_job_apps(db_session, company="o", applied_from=datetime.date(2025, 4, 2)) == (2, False)
+
+
+@pytest.mark.anyio
+async def test_stats_counters_follow_every_write(db_session):
+    def payload(company, status, applied_date):
+        return {"company": company, "position": "Dev", "status": status, "applied_date": applied_date}
+
+    created = await job_crud.create_job_app(db_session, job_schemas.JobAppCreate(**payload("Google", "applied", "2025-04-02")))
+    await job_crud.bulk_create_job_apps(db_session, [
+        payload("Google", "interviewing", "2025-04-10"),
+        payload("Meta", "applied", "2025-05-01"),
+        payload("Stripe", "rejected", "2025-05-03"),
+    ])
+    await job_crud.update_job(db_session, created.id, job_schemas.JobAppUpdate(status="offered"))
+    await job_crud.bulk_update_jobs(db_session, job_schemas.BulkUpdateRequest(
+        filter=job_schemas.JobAppFilter(company="Meta"), changes=job_schemas.JobAppUpdate(applied_date="2025-06-01")
+    ))
+    await job_crud.bulk_delete_jobs(db_session, job_schemas.BulkSelector(filter=job_schemas.JobAppFilter(company="Stripe")))
+
+    stats = await stats_crud.get_stats(db_session)
+    assert stats.total == 3
+    assert stats.by_status == {"applied": 1, "interviewing": 1, "offered": 1}
+    assert stats.by_company == {"Google": 2, "Meta": 1}
+    assert stats.by_month == {"2025-04": 2, "2025-06": 1}
+    assert await stats_crud.count_live(db_session) == stats_crud.stat_deltas(
+        added=[{"company": c, "status": s, "applied_date": d} for c, s, d in
+               (await db_session.execute(select(
+                   job_models.JobApplication.company, job_models.JobApplication.status,
+                   job_models.JobApplication.applied_date
+               ))).all()]
+    )
+
+
+# Writes another request commits while `db_session` is between its pre-read and its write
+async def _concurrent_write(statement):
+    async with AsyncTestingSessionLocal() as other:
+        await other.execute(statement)
+        await other.commit()
+
+
+@pytest.mark.anyio
+async def test_update_conflicting_with_a_concurrent_write_is_a_409(db_session, monkeypatch):
+    job_id = (await job_crud.create_job_app(db_session, job_schemas.JobAppCreate(
+        company="Google", position="Dev", status="applied", applied_date="2025-04-02"
+    ))).id
+    original_execute = db_session.execute
+
+    async def execute_then_interfere(statement, *args, **kwargs):
+        result = await original_execute(statement, *args, **kwargs)
+        monkeypatch.setattr(db_session, "execute", original_execute)  # only after the pre-read
+        await _concurrent_write(
+            update(job_models.JobApplication).values(status="rejected", version=job_models.JobApplication.version + 1)
+        )
+        return result
+
+    monkeypatch.setattr(db_session, "execute", execute_then_interfere)
+    with pytest.raises(WriteConflictException):
+        await job_crud.update_job(db_session, job_id, job_schemas.JobAppUpdate(status="offered"))
+    assert await job_crud.get_job_version(db_session, job_id) == 2
+    # Nothing was counted for the rejected write
+    assert (await stats_crud.get_stats(db_session)).by_status == {"applied": 1}
+
+
+@pytest.mark.anyio
+async def test_bulk_write_conflicting_with_a_concurrent_insert_is_a_409(db_session, monkeypatch):
+    await job_crud.create_job_app(db_session, job_schemas.JobAppCreate(
+        company="Meta", position="Dev", status="applied", applied_date="2025-04-02"
+    ))
+    stat_groups = job_crud._stat_groups
+
+    async def groups_then_insert(db, conditions):
+        groups = await stat_groups(db, conditions)
+        await _concurrent_write(insert(job_models.JobApplication).values(
+            company="Meta", position="Late", status="applied", applied_date=datetime.date(2025, 4, 3)
+        ))
+        return groups
+
+    monkeypatch.setattr(job_crud, "_stat_groups", groups_then_insert)
+    with pytest.raises(WriteConflictException):
+        await job_crud.bulk_update_jobs(db_session, job_schemas.BulkUpdateRequest(
+            filter=job_schemas.JobAppFilter(company="Meta"), changes=job_schemas.JobAppUpdate(status="rejected")
+        ))
+    live = await db_session.scalar(select(func.count()).select_from(job_models.JobApplication).where(
+        job_models.JobApplication.status == "rejected"
+    ))
+    assert live == 0
+
+
+@pytest.mark.anyio
+async def test_rebuild_stats_reconciles_counters(db_session, sample_applications):
+    # The fixture inserts rows behind the CRUD layer's back, so nothing is counted yet
+    assert (await stats_crud.get_stats(db_session)).total == 0
+
+    total = await db_session.run_sync(lambda session: stats_crud.rebuild_stats(session.connection()))
+    await db_session.commit()
+
+    stats = await stats_crud.get_stats(db_session)
+    assert total == stats.total == 5
+    assert stats.by_month == {"2025-04": 5}
+    assert stats.by_status["rejected"] == 1
+
+
+@pytest.mark.anyio
+async def test_timeseries_rollups_follow_writes(db_session):
+    def payload(status, applied_date):
+        return {"company": "Google", "position": "Dev", "status": status, "applied_date": applied_date}
+
+    first = await job_crud.create_job_app(db_session, job_schemas.JobAppCreate(**payload("applied", "2025-03-31")))
+    await job_crud.bulk_create_job_apps(db_session, [
+        payload("applied", "2025-04-01"),
+        payload("applied", "2025-04-02"),
+        payload("rejected", "2025-04-15"),
+    ])
+    await job_crud.update_job(db_session, first.id, job_schemas.JobAppUpdate(status="interviewing"))
+    await job_crud.bulk_update_jobs(db_session, job_schemas.BulkUpdateRequest(
+        filter=job_schemas.JobAppFilter(applied_from="2025-04-01", applied_to="2025-04-02"),
+        changes=job_schemas.JobAppUpdate(status="interviewing")
+    ))
+
+    weekly = await stats_crud.get_timeseries(db_session, "week")
+    assert [(b.start, b.applications) for b in weekly.buckets] == [
+        (datetime.date(2025, 3, 31), 3), (datetime.date(2025, 4, 14), 1)
+    ]
+    assert weekly.buckets[0].by_status == {"interviewing": 3}
+    assert weekly.buckets[0].transitions == {"applied>interviewing": 3}
+
+    monthly = await stats_crud.get_timeseries(db_session, "month", date_from=datetime.date(2025, 4, 1))
+    assert [(b.start, b.applications) for b in monthly.buckets] == [(datetime.date(2025, 4, 1), 3)]
+    assert monthly.buckets[0].by_status == {"interviewing": 2, "rejected": 1}
+
+
+@pytest.mark.anyio
+async def test_backfill_rollups_counts_existing_rows(db_session, sample_applications):
+    assert (await stats_crud.get_timeseries(db_session)).buckets == []
+
+    counted = await db_session.run_sync(lambda session: stats_crud.backfill_rollups(session.connection()))
+    await db_session.commit()
+
+    daily = await stats_crud.get_timeseries(db_session, "day")
+    assert counted == 5
+    assert [b.applications for b in daily.buckets] == [1, 1, 1, 1, 1]
+    assert daily.buckets[1].by_status == {"rejected": 1}
@@ -1,6 +1,11 @@
 # Route Testing with FastAPIs TestClient
+import csv
+import io
+import json
+
 import pytest
 
+from app.crud import stats_crud
 from app.models.job_models import JobApplication
 import datetime
 from sqlalchemy import select
@@ -169,3 +174,356 @@ async def test_filter_jobs_by_search_query(async_client, sample_applications):
     assert all("google" in app["company"].lower() or "google" in app["position"].lower() or "google" in app.get("notes",
                                                                                                                 "").lower()
                for app in data)
+
+
+@pytest.mark.anyio
+async def test_cursor_pagination_walks_all_pages(async_client, sample_applications):
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "sort_by": "applied_date", "order": "desc"}
+        if cursor:
+            params["cursor"] = cursor
+        response = await async_client.get("/applications/filter", params=params)
+        assert response.status_code == 200
+        seen.extend(job["applied_date"] for job in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == len(sample_applications)
+    assert seen == sorted(seen, reverse=True)
+
+
+@pytest.mark.anyio
+async def test_cursor_pagination_by_status_has_no_gaps(async_client, sample_applications):
+    first = await async_client.get("/applications/filter?sort_by=status&order=asc&limit=3")
+    cursor = first.headers["X-Next-Cursor"]
+    second = await async_client.get(f"/applications/filter?sort_by=status&order=asc&limit=3&cursor={cursor}")
+
+    ids = [job["id"] for job in first.json() + second.json()]
+    assert sorted(ids) == sorted(job.id for job in sample_applications)
+    assert "X-Next-Cursor" not in second.headers
+
+
+@pytest.mark.anyio
+async def test_cursor_pagination_on_list_route(async_client, sample_applications):
+    first = await async_client.get("/applications/?limit=4")
+    assert [job["id"] for job in first.json()] == sorted(job.id for job in sample_applications)[:4]
+
+    second = await async_client.get(f"/applications/?limit=4&cursor={first.headers['X-Next-Cursor']}")
+    assert len(second.json()) == 1
+
+
+# The list routes serialize Rows themselves (RowsJSONResponse), they must match the detail route's JSON
+@pytest.mark.anyio
+async def test_list_pages_serialize_like_the_detail_route(async_client, sample_applications):
+    for url in ("/applications/?limit=10", "/applications/filter?limit=10&order=asc"):
+        response = await async_client.get(url)
+        assert response.headers["content-type"] == "application/json"
+        for job in response.json():
+            assert job == (await async_client.get(f"/applications/{job['id']}")).json()
+
+
+@pytest.mark.anyio
+async def test_sparse_fieldsets(async_client, sample_applications):
+    fields = "id,company,position,status,applied_date"
+    listed = await async_client.get(f"/applications/?limit=2&fields={fields}")
+    assert [set(job) for job in listed.json()] == [set(fields.split(","))] * 2
+
+    first = await async_client.get("/applications/filter?limit=3&order=asc&fields=company")
+    assert [set(job) for job in first.json()] == [{"company"}] * 3
+    second = await async_client.get(
+        f"/applications/filter?limit=3&order=asc&fields=company&cursor={first.headers['X-Next-Cursor']}"
+    )
+    assert len(first.json() + second.json()) == len(sample_applications)
+
+    job_id = sample_applications[0].id
+    detail = await async_client.get(f"/applications/{job_id}?fields=status,notes")
+    assert detail.json() == {"status": "applied", "notes": "Excited for this role"}
+    assert detail.headers["ETag"] == (await async_client.get(f"/applications/{job_id}")).headers["ETag"]
+
+    unknown = await async_client.get("/applications/?fields=company,salary")
+    assert unknown.status_code == 400
+    assert "salary" in unknown.json()["detail"]
+
+
+@pytest.mark.anyio
+async def test_batch_fetch_keeps_order_and_reports_missing(async_client, sample_applications):
+    first, second, third = (job.id for job in sample_applications[:3])
+    response = await async_client.get(f"/applications/batch?ids={third},9999,{first}&ids={third},{second}")
+    assert response.status_code == 200
+    data = response.json()
+    assert [job["id"] for job in data["items"]] == [third, first, second]
+    assert data["items"][1] == (await async_client.get(f"/applications/{first}")).json()
+    assert data["missing"] == [9999]
+
+    assert (await async_client.get("/applications/batch?ids=1,two")).status_code == 400
+    too_many = ",".join(str(i) for i in range(1001))
+    assert (await async_client.get(f"/applications/batch?ids={too_many}")).status_code == 413
+
+
+@pytest.mark.anyio
+async def test_invalid_cursor_returns_400(async_client):
+    response = await async_client.get("/applications/filter?cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert "Invalid pagination cursor" in response.json()["detail"]
+
+
+@pytest.mark.anyio
+async def test_cursor_from_another_sort_is_rejected(async_client, sample_applications):
+    first = await async_client.get("/applications/filter?sort_by=applied_date&limit=2")
+    cursor = first.headers["X-Next-Cursor"]
+    response = await async_client.get(f"/applications/filter?sort_by=status&limit=2&cursor={cursor}")
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_filter_by_applied_date_range(async_client, sample_applications):
+    response = await async_client.get(
+        "/applications/filter?applied_from=2025-04-02&applied_to=2025-04-04&order=asc"
+    )
+    assert response.status_code == 200
+    dates = [job["applied_date"] for job in response.json()]
+    assert dates == ["2025-04-02", "2025-04-03", "2025-04-04"]
+
+
+@pytest.mark.anyio
+async def test_search_relevance_sort_pages_with_skip(async_client, sample_applications):
+    response = await async_client.get("/applications/filter?q=interview&sort_by=relevance&limit=1")
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_conditional_get_by_id(async_client, sample_applications):
+    job_id = sample_applications[0].id
+    first = await async_client.get(f"/applications/{job_id}")
+    etag = first.headers["ETag"]
+
+    unchanged = await async_client.get(f"/applications/{job_id}", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert unchanged.headers["ETag"] == etag
+
+    await async_client.put(f"/applications/{job_id}", json={"notes": "Follow up"})
+    changed = await async_client.get(f"/applications/{job_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+    # Bulk updates bump the row version too
+    etag = changed.headers["ETag"]
+    await async_client.patch("/applications/bulk", json={"ids": [job_id], "changes": {"status": "offered"}})
+    after_bulk = await async_client.get(f"/applications/{job_id}", headers={"If-None-Match": etag})
+    assert after_bulk.status_code == 200
+    assert after_bulk.json()["status"] == "offered"
+
+
+@pytest.mark.anyio
+async def test_conditional_get_on_filter(async_client, sample_applications):
+    first = await async_client.get("/applications/filter?status=applied")
+    etag = first.headers["ETag"]
+
+    unchanged = await async_client.get("/applications/filter?status=applied", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    other_query = await async_client.get("/applications/filter?status=offered", headers={"If-None-Match": etag})
+    assert other_query.status_code == 200
+
+    await async_client.post("/applications/", json={
+        "company": "Stripe", "position": "Dev", "status": "applied", "applied_date": "2025-06-01"
+    })
+    changed = await async_client.get("/applications/filter?status=applied", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert "Stripe" in {job["company"] for job in changed.json()}
+
+
+@pytest.mark.anyio
+async def test_filter_total_count(async_client, db_session, sample_applications):
+    # Unfiltered totals come from the stats counters, which the fixture's rows bypassed
+    await db_session.run_sync(lambda session: stats_crud.rebuild_stats(session.connection()))
+    await db_session.commit()
+
+    plain = await async_client.get("/applications/filter?limit=1")
+    assert "X-Total-Count" not in plain.headers
+
+    everything = await async_client.get("/applications/filter?limit=2&include_total=true")
+    assert everything.headers["X-Total-Count"] == str(len(sample_applications))
+    assert everything.headers["X-Total-Count-Exact"] == "true"
+    # A cached page without the total must not satisfy a request for it
+    with_total = await async_client.get("/applications/filter?limit=1&include_total=true",
+                                        headers={"If-None-Match": plain.headers["ETag"]})
+    assert with_total.status_code == 200
+
+    by_company = await async_client.get("/applications/filter?company=google&status=rejected&include_total=true")
+    assert (by_company.headers["X-Total-Count"], by_company.headers["X-Total-Count-Exact"]) == ("1", "true")
+
+    await db_session.run_sync(lambda session: stats_crud.backfill_rollups(session.connection()))
+    await db_session.commit()
+    by_date = await async_client.get("/applications/filter?applied_from=2025-04-04&include_total=true")
+    assert (by_date.headers["X-Total-Count"], by_date.headers["X-Total-Count-Exact"]) == ("2", "true")
+
+    await async_client.post("/applications/", json={
+        "company": "Google", "position": "Dev", "status": "rejected", "applied_date": "2025-06-01"
+    })
+    by_company = await async_client.get("/applications/filter?company=google&status=rejected&include_total=true")
+    assert by_company.headers["X-Total-Count"] == "2"
+
+
+@pytest.mark.anyio
+async def test_stats_route(async_client, db_session):
+    for status in ("applied", "applied", "rejected"):
+        await async_client.post("/applications/", json={
+            "company": "Linear", "position": "Dev", "status": status, "applied_date": "2025-03-15"
+        })
+
+    response = await async_client.get("/applications/stats")
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 3,
+        "by_status": {"applied": 2, "rejected": 1},
+        "by_company": {"Linear": 3},
+        "by_month": {"2025-03": 3},
+    }
+
+
+@pytest.mark.anyio
+async def test_timeseries_route(async_client, db_session):
+    for applied_date in ("2025-01-10", "2025-01-20", "2025-02-03"):
+        await async_client.post("/applications/", json={
+            "company": "Linear", "position": "Dev", "status": "applied", "applied_date": applied_date
+        })
+
+    response = await async_client.get("/applications/timeseries", params={"bucket": "month"})
+    assert response.status_code == 200
+    assert [(b["start"], b["applications"]) for b in response.json()["buckets"]] == [
+        ("2025-01-01", 2), ("2025-02-01", 1)
+    ]
+
+    response = await async_client.get("/applications/timeseries", params={"bucket": "year"})
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_bulk_create_applications(async_client, db_session):
+    payload = [
+        {"company": "Stripe", "position": "Backend Engineer", "status": "applied", "applied_date": "2025-06-01"},
+        {"company": "Ghost", "position": "Engineer", "status": "ghosted", "applied_date": "2025-06-01"},
+        {"company": "Linear", "position": "Product Engineer", "applied_date": "2025-06-02",
+         "link": "https://linear.app/careers"},
+    ]
+    response = await async_client.post("/applications/bulk", json=payload)
+    assert response.status_code == 201, response.text
+
+    data = response.json()
+    assert [item["index"] for item in data["created"]] == [0, 2]
+    assert [error["index"] for error in data["errors"]] == [1]
+
+    for item, company in zip(data["created"], ["Stripe", "Linear"]):
+        detail = await async_client.get(f"/applications/{item['id']}")
+        assert detail.json()["company"] == company
+
+
+@pytest.mark.anyio
+async def test_bulk_update_by_filter(async_client, sample_applications):
+    response = await async_client.patch("/applications/bulk", json={
+        "filter": {"status": "applied", "applied_to": "2025-04-30"},
+        "changes": {"status": "withdrawn"},
+        "returning": True
+    })
+    assert response.status_code == 200, response.text
+    assert response.json() == {"affected": 1, "ids": [sample_applications[0].id]}
+
+    withdrawn = await async_client.get("/applications/filter?status=withdrawn")
+    assert {job["company"] for job in withdrawn.json()} == {"TestCompany", "Netflix"}
+
+
+@pytest.mark.anyio
+async def test_bulk_delete_by_ids(async_client, sample_applications):
+    ids = [job.id for job in sample_applications[:3]]
+    response = await async_client.request("DELETE", "/applications/bulk", json={"ids": ids + [9999]})
+    assert response.status_code == 200
+    assert response.json() == {"affected": 3, "ids": None}
+
+    remaining = await async_client.get("/applications/")
+    assert {job["company"] for job in remaining.json()} == {"Meta", "Netflix"}
+
+
+@pytest.mark.anyio
+async def test_bulk_write_requires_a_selector(async_client, sample_applications):
+    response = await async_client.patch("/applications/bulk", json={"changes": {"status": "withdrawn"}})
+    assert response.status_code == 400
+
+    response = await async_client.request("DELETE", "/applications/bulk", json={"filter": {}})
+    assert response.status_code == 400
+
+    remaining = await async_client.get("/applications/")
+    assert len(remaining.json()) == len(sample_applications)
+
+
+@pytest.mark.anyio
+async def test_export_ndjson(async_client, sample_applications):
+    response = await async_client.get("/applications/export?format=ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["company"] for row in rows] == [job.company for job in sample_applications]
+
+
+@pytest.mark.anyio
+async def test_export_csv_with_filters(async_client, sample_applications):
+    response = await async_client.get("/applications/export?format=csv&applied_from=2025-04-04")
+    assert response.status_code == 200
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["company"] for row in rows] == ["Meta", "Netflix"]
+    assert rows[0]["applied_date"] == "2025-04-04"
+    assert rows[0]["status"] == "offered"
+
+
+@pytest.mark.anyio
+async def test_import_csv(async_client, db_session):
+    body = (
+        "company,position,status,applied_date,notes\r\n"
+        "Stripe,Backend Engineer,applied,2025-06-01,\r\n"
+        'Linear,Product Engineer,interviewing,2025-06-02,"Two rounds,\nthen a take-home"\r\n'
+        "Ghost,Engineer,ghosted,2025-06-03,\r\n"
+    )
+    response = await async_client.post(
+        "/applications/import?import_id=csv-import-1",
+        content=body.encode(),
+        headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["status"] == "completed"
+    assert (data["rows_processed"], data["rows_inserted"], data["rows_failed"]) == (3, 2, 1)
+    assert data["errors"][0]["index"] == 2
+
+    linear = await async_client.get("/applications/filter?company=Linear")
+    assert linear.json()[0]["notes"] == "Two rounds,\nthen a take-home"
+
+    progress = await async_client.get("/applications/import/csv-import-1")
+    assert progress.json()["rows_inserted"] == 2
+
+
+@pytest.mark.anyio
+async def test_import_ndjson_reports_bad_lines(async_client, db_session):
+    lines = [
+        json.dumps({"company": "Stripe", "position": "Engineer", "applied_date": "2025-06-01"}),
+        "{not json",
+        json.dumps({"company": "Linear", "position": "Engineer", "applied_date": "2025-06-02"}),
+    ]
+    response = await async_client.post("/applications/import?format=ndjson", content="\n".join(lines).encode())
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["rows_inserted"], data["rows_failed"]) == (2, 1)
+    assert "Invalid JSON" in data["errors"][0]["errors"][0]["msg"]
+
+
+@pytest.mark.anyio
+async def test_import_needs_a_known_format(async_client):
+    response = await async_client.post("/applications/import", content=b"a,b\n", headers={"Content-Type": "text/plain"})
+    assert response.status_code == 415
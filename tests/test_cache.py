@@ -0,0 +1,88 @@
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import LRUCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache("test", max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now the most recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = LRUCache("test", max_entries=10, ttl_seconds=5)
+    cache.set("a", 1)
+
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_byte_budget_and_counters():
+    cache = LRUCache("test", max_entries=100, ttl_seconds=60, max_bytes=250)
+    cache.set("a", "x", size=100)
+    cache.set("b", "y", size=100)
+    cache.set("c", "z", size=100)  # over budget: "a" goes
+    cache.set("huge", "w", size=1000)  # bigger than the whole budget: not stored
+
+    assert cache.get("a") is None
+    assert cache.get("huge") is None
+    assert cache.get("b") == "y"
+    stats = cache.stats()
+    assert stats["bytes"] == 200
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_disabled_cache_stores_nothing():
+    cache = LRUCache("test", max_entries=0, ttl_seconds=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+@pytest.mark.anyio
+async def test_filter_results_are_cached_until_a_job_write(async_client, db_session):
+    payload = {"company": "CacheCo", "position": "Dev", "status": "applied", "applied_date": "2024-01-01"}
+    await async_client.post("/applications/", json=payload)
+    hits = (await async_client.get("/cache/stats")).json()["caches"]["filter_results"]["hits"]
+
+    first = await async_client.get("/applications/filter", params={"company": "cacheco"})
+    second = await async_client.get("/applications/filter", params={"company": "CACHECO"})
+    assert first.json() == second.json()
+    stats = (await async_client.get("/cache/stats")).json()
+    assert stats["caches"]["filter_results"]["hits"] == hits + 1
+
+    # Any job write bumps the generation, so the next filter sees the new row
+    await async_client.post("/applications/", json={**payload, "position": "Lead"})
+    third = await async_client.get("/applications/filter", params={"company": "CacheCo"})
+    assert len(third.json()) == 2
+    stats = (await async_client.get("/cache/stats")).json()
+    assert stats["generations"]["job_applications"] >= 2
+
+
+def test_fill_skips_keys_written_since_its_token():
+    cache = LRUCache("test", max_entries=2, ttl_seconds=60)
+    token = cache.write_token()
+    cache.set("a", {"version": 2})
+    assert not cache.fill("a", {"version": 1}, token)
+    assert cache.get("a") == {"version": 2}
+
+    token = cache.write_token()
+    cache.delete("b")
+    assert not cache.fill("b", {"version": 1}, token)
+    assert cache.fill("c", {"version": 1}, token)
+    assert not cache.fill("a", {"version": 1}, cache.write_token(), version_field="version")
+
+    token = cache.write_token()
+    cache.clear()
+    assert not cache.fill("c", {"version": 1}, token)
@@ -0,0 +1,164 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core import config
+from app.core.config import Settings, get_settings
+from app.db import database
+from app.db.database import engine_options
+from app.main import app
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, pool_stats
+from app.db.sqlite import install_sqlite_pragmas, sqlite_pragmas
+
+
+def test_settings_parse_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "")
+    monkeypatch.setenv("DB_CONNECT_ARGS", '{"timeout": 10}')
+    settings = Settings.from_env()
+    assert settings.db_pool_pre_ping is False
+    assert settings.db_statement_timeout_ms is None
+    assert settings.db_connect_args == {"timeout": 10}
+
+
+def test_query_cache_defaults_to_off_with_several_workers(monkeypatch):
+    monkeypatch.delenv("QUERY_CACHE_ENABLED", raising=False)
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert Settings.from_env().query_cache_enabled is False
+    monkeypatch.setenv("QUERY_CACHE_ENABLED", "true")
+    assert Settings.from_env().query_cache_enabled is True
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    monkeypatch.delenv("QUERY_CACHE_ENABLED")
+    assert Settings.from_env().query_cache_enabled is True
+
+
+def test_app_env_file_overrides_base_env_file(monkeypatch, tmp_path):
+    (tmp_path / ".env").write_text("DB_POOL_SIZE=3\nDB_MAX_OVERFLOW=7\n")
+    (tmp_path / ".env.staging").write_text("DB_POOL_SIZE=20\n")
+    monkeypatch.setattr(config, "find_dotenv", lambda filename: str(tmp_path / filename))
+    monkeypatch.setenv("APP_ENV", "staging")
+    for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW"):
+        monkeypatch.setenv(name, "")
+        monkeypatch.delenv(name)  # load_dotenv exports them, the monkeypatch undo removes them again
+    get_settings.cache_clear()
+    try:
+        settings = get_settings()
+        assert (settings.db_pool_size, settings.db_max_overflow) == (20, 7)
+    finally:
+        get_settings.cache_clear()
+
+
+def test_engine_options_per_backend():
+    settings = Settings(db_pool_size=8, db_statement_timeout_ms=5000, db_connect_args={"connect_timeout": 3})
+
+    memory = engine_options("sqlite://", settings)
+    assert "pool_size" not in memory
+    assert memory["connect_args"] == {"connect_timeout": 3, "check_same_thread": False}
+
+    sqlite_file = engine_options("sqlite+aiosqlite:////tmp/app.db", settings, is_async=True)
+    assert sqlite_file["poolclass"] is TimedAsyncAdaptedQueuePool
+    assert (sqlite_file["pool_size"], sqlite_file["pool_pre_ping"]) == (8, True)
+
+    postgres = engine_options("postgresql://db/app", settings)
+    assert postgres["poolclass"] is TimedQueuePool
+    assert postgres["connect_args"]["options"] == "-c statement_timeout=5000"
+    asyncpg = engine_options("postgresql+asyncpg://db/app", settings, is_async=True)
+    assert asyncpg["connect_args"]["server_settings"] == {"statement_timeout": "5000"}
+
+
+def test_timed_pool_reports_waits_and_saturation(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db", poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    try:
+        with engine.connect():
+            stats = pool_stats(engine.pool)
+            assert (stats["checked_out"], stats["saturation"]) == (1, 1.0)
+
+            # the only connection is taken: a second checkout waits pool_timeout and gives up
+            errors = []
+            worker = threading.Thread(target=lambda: errors.append(_try_connect(engine)))
+            worker.start()
+            worker.join()
+            assert errors == [True]
+
+        stats = pool_stats(engine.pool)
+        assert (stats["checkouts"], stats["timeouts"], stats["checked_out"]) == (1, 1, 0)
+        assert stats["wait_seconds_max"] >= 0.05
+    finally:
+        engine.dispose()
+
+
+def _try_connect(engine) -> bool:
+    try:
+        engine.connect().close()
+    except PoolTimeoutError:
+        return True
+    return False
+
+
+def test_sqlite_profile_with_overrides():
+    pragmas = sqlite_pragmas(Settings(sqlite_profile="wal", sqlite_synchronous="FULL", sqlite_cache_size_kib=1024))
+    assert pragmas["journal_mode"] == "WAL"
+    assert (pragmas["synchronous"], pragmas["cache_size"]) == ("FULL", -1024)
+    assert sqlite_pragmas(Settings(sqlite_profile="none")) == {}
+    with pytest.raises(ValueError):
+        sqlite_pragmas(Settings(sqlite_profile="turbo"))
+
+
+def test_pragmas_are_applied_to_new_connections(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/pragmas.db")
+    install_sqlite_pragmas(engine, sqlite_pragmas(Settings(sqlite_profile="wal")))
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert connection.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def app_database(monkeypatch, tmp_path):
+    """Points the app's own engines at a throwaway SQLite file, disposing them afterwards."""
+    monkeypatch.setenv("DB_URL", f"sqlite:///{tmp_path}/app.db")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_importing_the_app_creates_no_engine_and_no_log_dir(tmp_path):
+    code = (
+        "import os, app.main, app.db.database as database;"
+        "assert database.created_engines() == [], database.created_engines();"
+        "assert not os.path.exists('logs')"
+    )
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    env.pop("DB_URL", None)  # not needed until a connection is made
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_importing_the_app_reads_no_settings(tmp_path):
+    code = (
+        "import app.main; from app.core.config import get_settings;"
+        "assert get_settings.cache_info().currsize == 0, 'settings were read at import time'"
+    )
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.anyio
+async def test_lifespan_warms_and_disposes_the_pool(app_database, async_client):
+    async with app.router.lifespan_context(app):
+        assert [type(engine).__name__ for engine in database.created_engines()] == ["AsyncEngine"]
+        response = await async_client.get("/db/pool/stats")
+        assert response.json()["async"]["checked_in"] == 1
+    assert database.created_engines() == []
@@ -0,0 +1,67 @@
+import logging
+import threading
+
+from app.core import logger as logger_module
+from app.core.logger import SamplingFilter, logger, read_logger, stop_logging
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.getMessage(), threading.current_thread().name))
+
+
+def _capture_listener(monkeypatch) -> _Capture:
+    capture = _Capture()
+    stop_logging()
+    monkeypatch.setattr(logger_module._listener, "handlers", (capture,))
+    return capture
+
+
+def test_records_are_written_on_the_listener_thread(monkeypatch):
+    capture = _capture_listener(monkeypatch)
+    logger.info("✅ Created job application: %s at %s", 7, "Google")
+    stop_logging()  # drains the queue
+
+    assert capture.records[0][0] == "✅ Created job application: 7 at Google"
+    assert capture.records[0][1] != threading.current_thread().name
+
+
+def test_disabled_levels_skip_formatting():
+    class Expensive:
+        calls = 0
+
+        def __str__(self):
+            Expensive.calls += 1
+            return "expensive"
+
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        logger.info("value: %s", Expensive())
+    finally:
+        logger.setLevel(level)
+    assert Expensive.calls == 0
+
+
+def test_read_lines_are_sampled(monkeypatch):
+    capture = _capture_listener(monkeypatch)
+    monkeypatch.setattr(logger_module.read_sampler, "every", 3)
+    monkeypatch.setattr(logger_module.read_sampler, "_seen", 0)
+    for i in range(7):
+        read_logger.info("📄 Fetched jobs: %s", i)
+    logger.info("not sampled")
+    stop_logging()
+
+    assert [message for message, _ in capture.records] == [
+        "📄 Fetched jobs: 0", "📄 Fetched jobs: 3", "📄 Fetched jobs: 6", "not sampled"
+    ]
+
+
+def test_sampling_filter_extremes():
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None)
+    assert all(SamplingFilter(1).filter(record) for _ in range(5))
+    assert not any(SamplingFilter(0).filter(record) for _ in range(5))
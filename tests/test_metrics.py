@@ -0,0 +1,165 @@
+import re
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, text, update
+
+from app.api.deps import query_budget
+from app.core import metrics
+from app.core.config import Settings
+from app.core.metrics import Histogram, MetricsMiddleware, configure_metrics, render_prometheus, reset_metrics
+from app.exceptions import QueryBudgetExceeded
+from app.models import User
+from tests.conftest import engine
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    series = name
+    if labels:
+        series += "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{series} not in output"
+    return float(match.group(1))
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.count == 4 and histogram.total == 3.65
+
+
+@pytest.mark.anyio
+async def test_requests_are_labelled_by_route_template(async_client, sample_applications):
+    reset_metrics()
+    job_id = sample_applications[0].id
+    await async_client.get(f"/applications/{job_id}")
+    await async_client.get(f"/applications/{job_id}")
+    await async_client.get("/applications/999999")
+    await async_client.get("/no/such/page")
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    route = {"method": "GET", "route": "/applications/{id}"}
+    assert _sample(text, "http_requests_total", **route, status=200) == 2
+    assert _sample(text, "http_requests_total", **route, status=404) == 1
+    assert _sample(text, "http_requests_total", method="GET", route="unmatched", status=404) == 1
+    assert _sample(text, "http_request_duration_seconds_count", **route) == 3
+    assert _sample(text, "http_request_duration_seconds_bucket", **route, le="+Inf") == 3
+    assert f"/applications/{job_id}" not in text  # ids never become labels
+
+    # the repeated lookup is served by the entity cache without touching the DB
+    assert _sample(text, "http_request_db_queries_bucket", **route, le="0.0") == 1
+    assert _sample(text, "http_request_db_queries_sum", **route) >= 2
+    assert _sample(text, "http_request_db_seconds_total", **route) > 0
+    assert _sample(text, "db_query_duration_seconds_count") >= 2
+
+
+@pytest.mark.anyio
+async def test_unhandled_errors_count_as_500():
+    async def broken_app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    reset_metrics()
+    client = AsyncClient(transport=ASGITransport(app=MetricsMiddleware(broken_app), raise_app_exceptions=False),
+                         base_url="http://test")
+    async with client:
+        await client.get("/anything")
+    assert _sample(render_prometheus(), "http_requests_total", method="GET", route="unmatched", status=500) == 1
+    assert metrics.current_request.get() is None
+
+
+def test_pool_gauges_are_rendered():
+    text = render_prometheus({"async": {"pool": "TimedAsyncAdaptedQueuePool", "checked_out": 2, "saturation": 0.5}})
+    assert "# TYPE db_pool_checked_out gauge" in text
+    assert _sample(text, "db_pool_checked_out", engine="async") == 2
+    assert "db_pool_pool" not in text
+
+
+def _budget_app(budget: int, statements: int) -> MetricsMiddleware:
+    # a route running `statements` statements against the test database under query_budget(budget)
+    api = FastAPI()
+
+    @api.get("/work", dependencies=[Depends(query_budget(budget))])
+    async def work():
+        async with engine.connect() as connection:
+            for _ in range(statements):
+                await connection.execute(text("SELECT 1"))
+        return {"ok": True}
+
+    return MetricsMiddleware(api)
+
+
+@pytest.mark.anyio
+async def test_going_over_the_query_budget_fails_in_raise_mode():
+    configure_metrics(Settings(query_budget_action="raise"))
+    try:
+        async with AsyncClient(transport=ASGITransport(app=_budget_app(2, 2)), base_url="http://test") as client:
+            assert (await client.get("/work")).status_code == 200
+
+        async with AsyncClient(transport=ASGITransport(app=_budget_app(2, 3)), base_url="http://test") as client:
+            with pytest.raises(QueryBudgetExceeded) as error:
+                await client.get("/work")
+    finally:
+        configure_metrics()
+    assert error.value.detail == "GET /work ran 3 SQL statements, over its budget of 2 🧮"
+
+
+@pytest.mark.anyio
+async def test_going_over_the_query_budget_warns_by_default(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(metrics.logger, "warning", lambda message, *args: warnings.append(message % args))
+    configure_metrics(Settings(query_budget_action="warn"))
+    try:
+        async with AsyncClient(transport=ASGITransport(app=_budget_app(1, 2)), base_url="http://test") as client:
+            assert (await client.get("/work")).status_code == 200
+    finally:
+        configure_metrics()
+    assert warnings == ["🧮 GET /work ran 2 SQL statements, over its budget of 1"]
+
+
+@pytest.mark.anyio
+async def test_slow_queries_are_logged_with_sql_and_params(monkeypatch):
+    lines = []
+    monkeypatch.setattr(metrics.slow_query_logger, "warning", lambda message, *args: lines.append(message % args))
+    configure_metrics(Settings(db_slow_query_ms=0, db_slow_query_max_param_chars=20))
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT\n    :value"), {"value": "x" * 50})
+    finally:
+        configure_metrics()
+
+    assert len(lines) == 1
+    assert lines[0].startswith("🐢 Slow query (")
+    assert "outside a request): SELECT ? | params: ('xxxxxxxxxxxxxxxxxx... (" in lines[0]
+
+
+@pytest.mark.anyio
+async def test_slow_query_log_redacts_credentials(monkeypatch, db_session):
+    lines = []
+    monkeypatch.setattr(metrics.slow_query_logger, "warning", lambda message, *args: lines.append(message % args))
+    configure_metrics(Settings(db_slow_query_ms=0))
+    users = [
+        {"id": f"redact-{i}", "email": f"redact{i}@example.com", "username": f"redact{i}",
+         "hashed_password": f"$2b$h{i}"}
+        for i in range(2)
+    ]
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(insert(User), users)
+            await connection.execute(insert(User).values(
+                id="redact-2", email="redact2@example.com", username="redact2", hashed_password="$2b$h2"
+            ))
+            await connection.execute(update(User).where(User.id == "redact-0").values(hashed_password="$2b$new"))
+            await connection.execute(text("DELETE FROM users WHERE id LIKE 'redact-%'"))
+    finally:
+        configure_metrics()
+
+    logged = "\n".join(lines)
+    assert "$2b$" not in logged
+    assert "<redacted>" in logged and "redact1@example.com" in logged and "redact-0" in logged
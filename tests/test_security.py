@@ -0,0 +1,44 @@
+import asyncio
+import dataclasses
+
+import pytest
+
+from app.core import security
+from app.core.config import get_settings
+from app.exceptions import PasswordHashingBusyException
+
+
+@pytest.mark.anyio
+async def test_async_hash_and_verify_round_trip():
+    hashed = await security.hash_password_async("s3cret-pass")
+    assert hashed != "s3cret-pass"
+    assert await security.verify_password_async("s3cret-pass", hashed)
+    assert not await security.verify_password_async("wrong-pass", hashed)
+
+
+@pytest.mark.anyio
+async def test_hashing_does_not_block_the_event_loop():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await asyncio.gather(*(security.hash_password_async(f"pass-{i}") for i in range(4)))
+    task.cancel()
+    # the loop kept running while bcrypt worked in the pool
+    assert ticks > 0
+
+
+@pytest.mark.anyio
+async def test_full_queue_is_rejected(monkeypatch):
+    settings = dataclasses.replace(get_settings(), password_hash_workers=1, password_hash_queue_depth=1)
+    monkeypatch.setattr(security, "get_settings", lambda: settings)
+    monkeypatch.setattr(security, "_in_flight", 2)
+
+    with pytest.raises(PasswordHashingBusyException) as exc_info:
+        await security.hash_password_async("one-too-many")
+    assert exc_info.value.status_code == 503
@@ -6,6 +6,7 @@ import pytest
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
+from app.core.security import verify_password_async
 from app.crud import user_crud
 from app.exceptions import (UserNotFoundException, DuplicateEmailException,
                             DuplicateUsernameException, AppBaseException)
@@ -209,6 +210,8 @@ async def test_update_user_integrity_error():
     # db session needs async-mocking
     db = MagicMock()
     db.commit = AsyncMock(side_effect=IntegrityError('mock', 'mock', 'mock'))
+    # UPDATE ... RETURNING surfaces the error on the statement itself
+    db.scalar = AsyncMock(side_effect=IntegrityError('mock', 'mock', 'mock'))
     db.rollback = AsyncMock()
     db.refresh = AsyncMock()
 
@@ -242,9 +245,67 @@ async def test_create_user_with_duplicate_data(db_session):
     # Mock db_session.commit() on the session instance passed as 'db_session'
     db_mock = MagicMock(wraps=db_session)
     db_mock.commit.side_effect = IntegrityError("duplicate key", None, None)
+    # INSERT ... RETURNING surfaces the error on the statement itself
+    db_mock.scalar.side_effect = IntegrityError("duplicate key", None, None)
 
     with pytest.raises(AppBaseException) as exc_info:
         await user_crud.create_user(db_mock, user)
 
     assert exc_info.value.status_code == 409
     assert "Database integrity error" in exc_info.value.detail
+
+
+@pytest.mark.anyio
+async def test_update_user_rehashes_password(db_session):
+    user = await user_crud.create_user(db_session, user_schemas.UserCreate(
+        email="rehash@gmail.com",
+        username="rehash",
+        password="oldpass"
+    ))
+    old_hash = user.hashed_password
+
+    updated = await user_crud.update_user(db_session, user.id, user_schemas.UserUpdate(password="newpass123"))
+
+    assert updated.hashed_password != old_hash
+    assert await verify_password_async("newpass123", updated.hashed_password)
+
+
+@pytest.mark.anyio
+async def test_username_cache_follows_renames(db_session):
+    user = await user_crud.create_user(db_session, user_schemas.UserCreate(
+        email="rename@gmail.com",
+        username="before",
+        password="password123"
+    ))
+    assert (await user_crud.get_user_by_username(db_session, "before")).id == user.id
+
+    await user_crud.update_user(db_session, user.id, user_schemas.UserUpdate(username="after"))
+
+    with pytest.raises(UserNotFoundException):
+        await user_crud.get_user_by_username(db_session, "before")
+    assert (await user_crud.get_user_by_id(db_session, user.id)).username == "after"
+
+
+@pytest.mark.anyio
+async def test_read_in_flight_during_a_user_update_does_not_cache_its_older_row(db_session, monkeypatch):
+    user = await user_crud.create_user(db_session, user_schemas.UserCreate(
+        email="inflight@gmail.com",
+        username="inflight",
+        full_name="Before",
+        password="password123"
+    ))
+    user_crud.user_cache().clear()
+    fetch_user, paused = user_crud.fetch_user, []
+
+    async def read_then_let_an_update_in(db, stmt):
+        found = await fetch_user(db, stmt)
+        if not paused:
+            paused.append(user.id)
+            async with AsyncTestingSessionLocal() as other:
+                await user_crud.update_user(other, user.id, user_schemas.UserUpdate(full_name="After"))
+        return found
+
+    monkeypatch.setattr(user_crud, "fetch_user", read_then_let_an_update_in)
+    assert (await user_crud.get_user_by_username(db_session, "inflight")).full_name == "Before"
+    assert (await user_crud.get_user_by_username(db_session, "inflight")).full_name == "After"
+    assert (await user_crud.get_user_by_id(db_session, user.id)).full_name == "After"
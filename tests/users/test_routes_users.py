@@ -147,3 +147,62 @@ async def test_delete_user(async_client, db_session):
     # Confirm it's deleted
     get_response = await async_client.get(f"{USER_PREFIX}/{user.id}")
     assert get_response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_get_users_cursor_pagination(async_client, db_session):
+    for i in range(3):
+        db_session.add(User(
+            id=str(uuid4()),
+            email=f"page{i}@example.com",
+            username=f"pageuser{i}",
+            hashed_password="hash",
+            created_at=datetime.now()
+        ))
+    await db_session.commit()
+
+    first = await async_client.get(f"{USER_PREFIX}/?limit=2")
+    assert len(first.json()) == 2
+    second = await async_client.get(f"{USER_PREFIX}/?limit=2&cursor={first.headers['X-Next-Cursor']}")
+    assert len(second.json()) == 1
+    assert "X-Next-Cursor" not in second.headers
+
+    usernames = {user["username"] for user in first.json() + second.json()}
+    assert usernames == {"pageuser0", "pageuser1", "pageuser2"}
+
+
+@pytest.mark.anyio
+async def test_delete_nonexistent_user(async_client, db_session):
+    response = await async_client.delete(f"{USER_PREFIX}/{uuid4()}")
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_update_nonexistent_user(async_client, db_session):
+    response = await async_client.put(f"{USER_PREFIX}/{uuid4()}", json={"username": "ghost"})
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_get_users_batch(async_client, db_session):
+    ids = [str(uuid4()) for _ in range(3)]
+    for i, user_id in enumerate(ids):
+        db_session.add(User(
+            id=user_id,
+            email=f"batch{i}@example.com",
+            username=f"batchuser{i}",
+            hashed_password="hash",
+            created_at=datetime.now()
+        ))
+    await db_session.commit()
+
+    ghost = str(uuid4())
+    response = await async_client.get(f"{USER_PREFIX}/batch", params={"ids": f"{ids[2]},{ghost},{ids[0]},{ids[2]}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert [user["username"] for user in data["items"]] == ["batchuser2", "batchuser0"]
+    assert data["missing"] == [ghost]
+    assert "hashed_password" not in data["items"][0]
+
+    invalid = await async_client.get(f"{USER_PREFIX}/batch?ids=not-a-uuid")
+    assert invalid.status_code == 400